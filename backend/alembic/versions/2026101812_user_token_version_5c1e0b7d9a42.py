@@ -0,0 +1,27 @@
+"""User token version
+
+Revision ID: 5c1e0b7d9a42
+Revises: 1be94e8acb6e
+Create Date: 2026-10-18 09:12:04.118311
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5c1e0b7d9a42"
+down_revision = "1be94e8acb6e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "user",
+        sa.Column("token_version", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_column("user", "token_version")
@@ -0,0 +1,38 @@
+"""Refresh session
+
+Revision ID: 9e3f4a61c2d8
+Revises: 5c1e0b7d9a42
+Create Date: 2026-10-18 09:27:41.503927
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9e3f4a61c2d8"
+down_revision = "5c1e0b7d9a42"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "refresh_session",
+        sa.Column("id", sa.UUID(as_uuid=False), nullable=False),
+        sa.Column("user_id", sa.UUID(as_uuid=False), nullable=False),
+        sa.Column("generation", sa.Integer(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["user_id"], ["user.id"], onupdate="CASCADE", ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_refresh_session_user_id"), "refresh_session", ["user_id"], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_refresh_session_user_id"), table_name="refresh_session")
+    op.drop_table("refresh_session")
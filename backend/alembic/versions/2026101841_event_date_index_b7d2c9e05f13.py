@@ -0,0 +1,23 @@
+"""Event date index
+
+Revision ID: b7d2c9e05f13
+Revises: 9e3f4a61c2d8
+Create Date: 2026-10-18 09:41:17.260554
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b7d2c9e05f13"
+down_revision = "9e3f4a61c2d8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(op.f("ix_event_date"), "event", ["date"], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f("ix_event_date"), table_name="event")
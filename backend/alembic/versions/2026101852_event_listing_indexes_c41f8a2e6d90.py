@@ -0,0 +1,40 @@
+"""Event listing indexes
+
+Revision ID: c41f8a2e6d90
+Revises: b7d2c9e05f13
+Create Date: 2026-10-18 10:52:08.913402
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c41f8a2e6d90"
+down_revision = "b7d2c9e05f13"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ix_event_date stays for the day filter of /schedule and the date ranges
+    op.create_index("ix_event_date_id", "event", ["date", "id"], unique=False)
+    op.create_index(
+        "ix_event_type_date_id", "event", ["type", "date", "id"], unique=False
+    )
+    op.create_index(
+        "ix_event_venue_date_id", "event", ["venue", "date", "id"], unique=False
+    )
+    op.create_index(
+        "ix_event_name_lower",
+        "event",
+        [sa.text("lower(name) text_pattern_ops")],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_event_name_lower", table_name="event")
+    op.drop_index("ix_event_venue_date_id", table_name="event")
+    op.drop_index("ix_event_type_date_id", table_name="event")
+    op.drop_index("ix_event_date_id", table_name="event")
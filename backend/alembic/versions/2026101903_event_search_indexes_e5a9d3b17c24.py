@@ -0,0 +1,54 @@
+"""Event search indexes
+
+Revision ID: e5a9d3b17c24
+Revises: c41f8a2e6d90
+Create Date: 2026-10-19 11:03:44.120587
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e5a9d3b17c24"
+down_revision = "c41f8a2e6d90"
+branch_labels = None
+depends_on = None
+
+# must stay identical to app.core.search.POSTGRES_DOCUMENT for the planner to
+# use the index
+DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(type, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(\"desc\", '')), 'C')"
+)
+
+
+def upgrade():
+    op.create_index(
+        "ix_event_search_document",
+        "event",
+        [sa.text(DOCUMENT)],
+        unique=False,
+        postgresql_using="gin",
+    )
+    # pg_trgm may not be installable (managed databases without superuser);
+    # such deployments run with EVENT_SEARCH_BACKEND=memory
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            CREATE EXTENSION IF NOT EXISTS pg_trgm;
+            CREATE INDEX ix_event_name_trgm ON event
+                USING gin (lower(name) gin_trgm_ops);
+        EXCEPTION WHEN OTHERS THEN
+            RAISE NOTICE 'pg_trgm unavailable, skipping ix_event_name_trgm: %', SQLERRM;
+        END
+        $$;
+        """
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_event_name_trgm")
+    op.drop_index("ix_event_search_document", table_name="event")
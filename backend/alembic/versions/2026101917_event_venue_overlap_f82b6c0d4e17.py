@@ -0,0 +1,29 @@
+"""Event venue overlap exclusion
+
+Revision ID: f82b6c0d4e17
+Revises: e5a9d3b17c24
+Create Date: 2026-10-19 11:17:26.402915
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "f82b6c0d4e17"
+down_revision = "e5a9d3b17c24"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # fails if the table already holds overlapping events of the same venue,
+    # move or delete those first
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.execute(
+        "ALTER TABLE event ADD CONSTRAINT ex_event_venue_overlap "
+        "EXCLUDE USING gist (venue WITH =, tsrange(date, date + duration) WITH &&)"
+    )
+
+
+def downgrade():
+    op.drop_constraint("ex_event_venue_overlap", "event")
@@ -0,0 +1,46 @@
+"""Event seat counters
+
+Revision ID: 3a7c1e9b2f60
+Revises: f82b6c0d4e17
+Create Date: 2026-10-19 11:35:52.774130
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3a7c1e9b2f60"
+down_revision = "f82b6c0d4e17"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "event_seat",
+        sa.Column("event_id", sa.UUID(as_uuid=False), nullable=False),
+        sa.Column("capacity", sa.Integer(), nullable=False),
+        sa.Column("remaining", sa.Integer(), nullable=False),
+        sa.CheckConstraint("remaining >= 0", name="ck_event_seat_remaining"),
+        sa.ForeignKeyConstraint(
+            ["event_id"], ["event.id"], onupdate="CASCADE", ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("event_id"),
+    )
+    # events held in a venue start limited to the venue capacity
+    op.execute(
+        """
+        INSERT INTO event_seat (event_id, capacity, remaining)
+        SELECT event.id, venue.capacity,
+               GREATEST(venue.capacity - COUNT(registration.user_id), 0)
+        FROM event
+        JOIN venue ON venue.name = event.venue
+        LEFT JOIN registration ON registration.event_id = event.id
+        GROUP BY event.id, venue.capacity
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("event_seat")
@@ -0,0 +1,46 @@
+"""Waitlist
+
+Revision ID: 8d4b2f7a1c39
+Revises: 3a7c1e9b2f60
+Create Date: 2026-10-19 11:48:05.331629
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8d4b2f7a1c39"
+down_revision = "3a7c1e9b2f60"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "event_seat",
+        sa.Column("waitlist_tail", sa.BigInteger(), server_default="0", nullable=False),
+    )
+    op.create_table(
+        "waitlist",
+        sa.Column("event_id", sa.UUID(as_uuid=False), nullable=False),
+        sa.Column("user_id", sa.UUID(as_uuid=False), nullable=False),
+        sa.Column("ticket", sa.BigInteger(), nullable=False),
+        sa.Column("reg_time", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["event_id"], ["event.id"], onupdate="CASCADE", ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"], ["user.id"], onupdate="CASCADE", ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("event_id", "user_id"),
+    )
+    op.create_index(
+        "ix_waitlist_event_ticket", "waitlist", ["event_id", "ticket"], unique=True
+    )
+
+
+def downgrade():
+    op.drop_index("ix_waitlist_event_ticket", table_name="waitlist")
+    op.drop_table("waitlist")
+    op.drop_column("event_seat", "waitlist_tail")
@@ -0,0 +1,44 @@
+"""Idempotency key
+
+Revision ID: 5e2b8c4d9a71
+Revises: 8d4b2f7a1c39
+Create Date: 2026-10-19 12:01:37.904215
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5e2b8c4d9a71"
+down_revision = "8d4b2f7a1c39"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "idempotency_key",
+        sa.Column("user_id", sa.UUID(as_uuid=False), nullable=False),
+        sa.Column("key", sa.String(length=255), nullable=False),
+        sa.Column("fingerprint", sa.String(length=64), nullable=False),
+        sa.Column("status_code", sa.Integer(), nullable=True),
+        sa.Column("headers", sa.JSON(), nullable=True),
+        sa.Column("body", sa.LargeBinary(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["user_id"], ["user.id"], onupdate="CASCADE", ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("user_id", "key"),
+    )
+    op.create_index(
+        op.f("ix_idempotency_key_created_at"),
+        "idempotency_key",
+        ["created_at"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_idempotency_key_created_at"), table_name="idempotency_key")
+    op.drop_table("idempotency_key")
@@ -0,0 +1,163 @@
+"""Event role
+
+Replaces the COUNT based stu_as_vol / vol_as_par triggers installed by
+`initial_data.create_triggers` with an `event_role` table whose primary key
+allows one role per user and event.
+
+Revision ID: 7c3e1a9f5b28
+Revises: 5e2b8c4d9a71
+Create Date: 2026-10-19 12:14:52.118630
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "7c3e1a9f5b28"
+down_revision = "5e2b8c4d9a71"
+branch_labels = None
+depends_on = None
+
+
+CLAIM_EVENT_ROLE = """
+CREATE OR REPLACE FUNCTION claim_event_role() RETURNS TRIGGER AS $$
+DECLARE
+    uid UUID;
+    held VARCHAR;
+BEGIN
+    IF TG_TABLE_NAME = 'registration' THEN
+        uid := NEW.user_id;
+    ELSE
+        uid := NEW.id;
+    END IF;
+    -- waits for a concurrent claim of the same pair to commit or roll back
+    INSERT INTO event_role (event_id, user_id, role)
+    VALUES (NEW.event_id, uid, TG_ARGV[0])
+    ON CONFLICT DO NOTHING;
+    IF NOT FOUND THEN
+        SELECT role INTO held FROM event_role
+        WHERE event_id = NEW.event_id AND user_id = uid;
+        RAISE EXCEPTION 'Already registered as % for this event', held;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+RELEASE_EVENT_ROLE = """
+CREATE OR REPLACE FUNCTION release_event_role() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'registration' THEN
+        DELETE FROM event_role
+        WHERE event_id = OLD.event_id AND user_id = OLD.user_id;
+    ELSE
+        DELETE FROM event_role
+        WHERE event_id = OLD.event_id AND user_id = OLD.id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+STU_AS_VOL_CHECK = """
+CREATE OR REPLACE FUNCTION stu_as_vol_check() RETURNS TRIGGER AS $$
+DECLARE
+cnt INTEGER DEFAULT 0;
+BEGIN
+SELECT COUNT(user_id) INTO cnt
+FROM registration
+WHERE registration.user_id = NEW.id AND registration.event_id = NEW.event_id;
+IF cnt <> 0 THEN
+    RAISE EXCEPTION 'Already registered as participant for this event';
+END IF;
+RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+VOL_AS_PAR_CHECK = """
+CREATE OR REPLACE FUNCTION vol_as_par_check() RETURNS TRIGGER AS $$
+DECLARE
+cnt INTEGER DEFAULT 0;
+BEGIN
+SELECT COUNT(id) INTO cnt
+FROM volunteer
+WHERE volunteer.event_id = NEW.event_id and volunteer.id = NEW.user_id;
+IF cnt <> 0 THEN
+    RAISE EXCEPTION 'Already registered as volunteer for this event';
+END IF;
+RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade():
+    op.create_table(
+        "event_role",
+        sa.Column("event_id", sa.UUID(as_uuid=False), nullable=False),
+        sa.Column("user_id", sa.UUID(as_uuid=False), nullable=False),
+        sa.Column("role", sa.String(length=30), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["event_id"], ["event.id"], onupdate="CASCADE", ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"], ["user.id"], onupdate="CASCADE", ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("event_id", "user_id"),
+    )
+    # participation wins should the old triggers have let both in
+    op.execute(
+        "INSERT INTO event_role (event_id, user_id, role) "
+        "SELECT event_id, user_id, 'participant' FROM registration"
+    )
+    op.execute(
+        "INSERT INTO event_role (event_id, user_id, role) "
+        "SELECT event_id, id, 'volunteer' FROM volunteer ON CONFLICT DO NOTHING"
+    )
+
+    op.execute("DROP TRIGGER IF EXISTS stu_as_vol_trigger ON volunteer")
+    op.execute("DROP TRIGGER IF EXISTS vol_as_par_trigger ON registration")
+    op.execute("DROP FUNCTION IF EXISTS stu_as_vol_check()")
+    op.execute("DROP FUNCTION IF EXISTS vol_as_par_check()")
+
+    op.execute(CLAIM_EVENT_ROLE)
+    op.execute(RELEASE_EVENT_ROLE)
+    op.execute(
+        "CREATE TRIGGER registration_claim_role AFTER INSERT ON registration "
+        "FOR EACH ROW EXECUTE FUNCTION claim_event_role('participant')"
+    )
+    op.execute(
+        "CREATE TRIGGER registration_release_role AFTER DELETE ON registration "
+        "FOR EACH ROW EXECUTE FUNCTION release_event_role()"
+    )
+    op.execute(
+        "CREATE TRIGGER volunteer_claim_role AFTER INSERT ON volunteer "
+        "FOR EACH ROW EXECUTE FUNCTION claim_event_role('volunteer')"
+    )
+    op.execute(
+        "CREATE TRIGGER volunteer_release_role AFTER DELETE ON volunteer "
+        "FOR EACH ROW EXECUTE FUNCTION release_event_role()"
+    )
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS volunteer_release_role ON volunteer")
+    op.execute("DROP TRIGGER IF EXISTS volunteer_claim_role ON volunteer")
+    op.execute("DROP TRIGGER IF EXISTS registration_release_role ON registration")
+    op.execute("DROP TRIGGER IF EXISTS registration_claim_role ON registration")
+    op.execute("DROP FUNCTION IF EXISTS release_event_role()")
+    op.execute("DROP FUNCTION IF EXISTS claim_event_role()")
+    op.drop_table("event_role")
+
+    op.execute(STU_AS_VOL_CHECK)
+    op.execute(VOL_AS_PAR_CHECK)
+    op.execute(
+        "CREATE TRIGGER stu_as_vol_trigger BEFORE INSERT ON volunteer "
+        "FOR EACH ROW EXECUTE FUNCTION stu_as_vol_check()"
+    )
+    op.execute(
+        "CREATE TRIGGER vol_as_par_trigger BEFORE INSERT ON registration "
+        "FOR EACH ROW EXECUTE FUNCTION vol_as_par_check()"
+    )
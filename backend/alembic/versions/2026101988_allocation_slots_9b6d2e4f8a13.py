@@ -0,0 +1,122 @@
+"""Allocation slots
+
+Replaces the reg_check trigger installed by `initial_data.create_triggers`,
+which decremented `capacity` of the roomiest accomodation and mess on every
+participant insert, with one slot row per bed and mess seat.
+
+Revision ID: 9b6d2e4f8a13
+Revises: 7c3e1a9f5b28
+Create Date: 2026-10-19 12:28:40.563217
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9b6d2e4f8a13"
+down_revision = "7c3e1a9f5b28"
+branch_labels = None
+depends_on = None
+
+
+LEDGERS = [("accomodation", "accomodation_id"), ("mess", "mess_id")]
+
+REG_CHECK = """
+CREATE OR REPLACE FUNCTION reg_check() RETURNS TRIGGER AS $$
+DECLARE
+acid UUID;
+ac_avail INTEGER;
+mid UUID;
+m_avail INTEGER;
+BEGIN
+select id,capacity into acid,ac_avail from accomodation order by capacity desc limit 1;
+select id,capacity into mid,m_avail from mess order by capacity desc limit 1;
+IF (ac_avail = 0) THEN
+    acid = NULL;
+END IF;
+
+IF m_avail=0 THEN
+    mid = NULL;
+END IF;
+
+UPDATE accomodation SET capacity = capacity - 1 WHERE id = acid;
+UPDATE mess SET capacity = capacity - 1 WHERE id = mid;
+NEW.mess_id = mid;
+NEW.accomodation_id = acid;
+
+RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade():
+    op.execute("DROP TRIGGER IF EXISTS reg_check_trigger ON participant")
+    op.execute("DROP FUNCTION IF EXISTS reg_check()")
+
+    for table, column in LEDGERS:
+        op.create_table(
+            f"{table}_slot",
+            sa.Column(column, sa.UUID(as_uuid=False), nullable=False),
+            sa.Column("slot", sa.Integer(), nullable=False),
+            sa.Column("participant_id", sa.UUID(as_uuid=False), nullable=True),
+            sa.ForeignKeyConstraint(
+                [column], [f"{table}.id"], onupdate="CASCADE", ondelete="CASCADE"
+            ),
+            sa.ForeignKeyConstraint(
+                ["participant_id"],
+                ["participant.id"],
+                onupdate="CASCADE",
+                ondelete="SET NULL",
+            ),
+            sa.PrimaryKeyConstraint(column, "slot"),
+            sa.UniqueConstraint("participant_id"),
+        )
+        op.create_index(
+            f"ix_{table}_slot_free",
+            f"{table}_slot",
+            ["slot", column],
+            unique=False,
+            postgresql_where=sa.text("participant_id IS NULL"),
+        )
+        # capacity held what the trigger left over, give back what it took
+        op.execute(
+            f"UPDATE {table} SET capacity = GREATEST({table}.capacity, 0) + taken.n "
+            f"FROM (SELECT {column} AS id, COUNT(*) AS n FROM participant "
+            f"WHERE {column} IS NOT NULL GROUP BY {column}) AS taken "
+            f"WHERE {table}.id = taken.id"
+        )
+        op.execute(
+            f"INSERT INTO {table}_slot ({column}, slot) "
+            f"SELECT id, generate_series(0, capacity - 1) FROM {table}"
+        )
+        # current occupants keep their bed (seat)
+        op.execute(
+            f"UPDATE {table}_slot SET participant_id = occupant.id "
+            f"FROM (SELECT id, {column}, "
+            f"ROW_NUMBER() OVER (PARTITION BY {column} ORDER BY id) - 1 AS slot "
+            f"FROM participant WHERE {column} IS NOT NULL) AS occupant "
+            f"WHERE {table}_slot.{column} = occupant.{column} "
+            f"AND {table}_slot.slot = occupant.slot"
+        )
+
+
+def downgrade():
+    for table, column in LEDGERS:
+        # back to capacity meaning what is left
+        op.execute(
+            f"UPDATE {table} SET capacity = free.n "
+            f"FROM (SELECT {column} AS id, COUNT(*) FILTER "
+            f"(WHERE participant_id IS NULL) AS n FROM {table}_slot "
+            f"GROUP BY {column}) AS free "
+            f"WHERE {table}.id = free.id"
+        )
+        op.drop_index(f"ix_{table}_slot_free", table_name=f"{table}_slot")
+        op.drop_table(f"{table}_slot")
+
+    op.execute(REG_CHECK)
+    op.execute(
+        "CREATE TRIGGER reg_check_trigger BEFORE INSERT ON participant "
+        "FOR EACH ROW EXECUTE FUNCTION reg_check()"
+    )
@@ -1,6 +1,17 @@
 from fastapi import APIRouter
 
-from app.api.endpoints import auth, users, events, students, volunteers, participants, schedule
+from app.api.endpoints import (
+    admission,
+    auth,
+    events,
+    metrics,
+    participants,
+    schedule,
+    students,
+    users,
+    venues,
+    volunteers,
+)
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
@@ -12,3 +23,6 @@ api_router.include_router(
     participants.router, prefix="/participants", tags=["participants"]
 )
 api_router.include_router(schedule.router, prefix="/schedule", tags=["schedule"])
+api_router.include_router(venues.router, prefix="/venues", tags=["venues"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
+api_router.include_router(admission.router, prefix="/admission", tags=["admission"])
@@ -0,0 +1,25 @@
+"""Helpers for conditional GET (`ETag` / `If-None-Match`) responses."""
+
+from fastapi import Request, Response, status
+
+# browsers keep the body but must revalidate it; the ETag makes that a cheap 304
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+def cached_json_response(
+    request: Request, body: bytes, etag: str, headers: dict[str, str] | None = None
+) -> Response:
+    """Pre-serialized JSON body, or 304 if the client already has this version"""
+    headers = {"ETag": etag, **(headers or {})}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,17 +1,36 @@
-import time
 from collections.abc import AsyncGenerator
 
 import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy import select
+from pydantic import ValidationError
+from sqlalchemy import exists, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core import config, security
+from app.core import config, metrics, security
+from app.core.cache import TTLCache
+from app.core.replica import ReadSession, read_router
 from app.core.session import async_session
-from app.models import User
+from app.models import Manage, User
 from app.schemas.requests import BaseUser
 
+# user id -> current token version, lets requests carrying an up to date
+# access token skip the user table (and bcrypt) entirely
+token_versions = TTLCache(
+    maxsize=config.settings.AUTH_CACHE_MAXSIZE,
+    ttl=config.settings.AUTH_CACHE_TTL_SECONDS,
+)
+metrics.register("auth_cache", token_versions.stats)
+
+
+def invalidate_user_credentials(user_id: str) -> None:
+    """Forget the cached token version of a user whose password, role or row changed
+
+    Callers bump `User.token_version` (or delete the row) in the same
+    transaction, so tokens issued before the change stop validating.
+    """
+    token_versions.pop(str(user_id))
+
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session() as session:
@@ -20,41 +39,89 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
 
 async def get_current_user(
     token: str = Depends(OAuth2PasswordBearer(tokenUrl="token")),
-    session: AsyncSession = Depends(get_session)
-) -> User:
+    session: AsyncSession = Depends(get_session),
+) -> BaseUser:
     try:
         payload = jwt.decode(
             token, config.settings.SECRET_KEY, algorithms=[security.JWT_ALGORITHM]
         )
-        email: str = payload.get("email")
-        password: str = payload.get("password")
-        result = await session.execute(select(User).where(User.email == email))
-
-        # Password check
-        user = result.scalars().first()
-        if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-            )
-        if not security.verify_password(password, user.password):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials"
-            )
+        token_data = security.JWTTokenPayload(**payload)
+    except (jwt.PyJWTError, ValidationError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+        )
+    if token_data.refresh:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials, cannot use refresh token",
+        )
+
+    # Fast path, everything needed is in the verified claims
+    version = token_versions.get(token_data.sub)
+    if (
+        version is not None
+        and version == token_data.version
+        and token_data.role is not None
+    ):
         return BaseUser(
-            id=user.id,  
-            email=user.email, 
-            phone=user.phone if user.phone else "",
-            name=user.name, 
-            role=user.role, 
-            password=user.password
+            id=token_data.sub,
+            email=token_data.email,
+            phone=token_data.phone or "",
+            name=token_data.name,
+            role=token_data.role,
         )
 
-    except jwt.PyJWTError:
+    result = await session.execute(select(User).where(User.id == token_data.sub))
+    user = result.scalars().first()
+    if user is None:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials"
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
-    except Exception as e:
-        print(f"Error: {e}")
+    token_versions.set(user.id, user.token_version)
+    if token_data.version is not None and token_data.version != user.token_version:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Unknown error: {e}"
-        )
\ No newline at end of file
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials, token revoked",
+        )
+    return BaseUser(
+        id=user.id,
+        email=user.email,
+        phone=user.phone if user.phone else "",
+        name=user.name,
+        role=user.role,
+    )
+
+
+async def get_read_session(
+    current_user: BaseUser = Depends(get_current_user),
+) -> AsyncGenerator[ReadSession, None]:
+    """Session for endpoints that only read, on the replica if there is one
+
+    Connects on its first statement; see `app.core.replica` for when reads
+    stay on the primary.
+    """
+    session = ReadSession(read_router, current_user.id)
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+async def can_manage_event(
+    session: AsyncSession, event_id: str, current_user: BaseUser
+) -> bool:
+    """Admins and organizers of the event may see its registrants and staff"""
+    if current_user.role == "admin":
+        return True
+    if current_user.role != "organizer":
+        return False
+    return bool(
+        await session.scalar(
+            select(
+                exists().where(
+                    Manage.event_id == event_id, Manage.id == current_user.id
+                )
+            )
+        )
+    )
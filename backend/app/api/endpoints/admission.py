@@ -0,0 +1,28 @@
+from fastapi import APIRouter, HTTPException, status
+
+from app.core import admission
+from app.schemas.responses import QueuePositionResponse
+
+router = APIRouter()
+
+
+@router.get(
+    "/{ticket}", response_model=QueuePositionResponse, status_code=status.HTTP_200_OK
+)
+async def read_queue_position(ticket: str):
+    """Position of a queue ticket in its line
+
+    Tickets come with the 503 of an admission gate. Polling is cheap, no
+    authentication or database involved; retry the original request with the
+    ticket in `X-Queue-Ticket` once `retry_after` seconds have passed.
+    """
+    held = admission.read_ticket(ticket)
+    gate = admission.get_gate(held.gate) if held is not None else None
+    if gate is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Unknown or expired ticket"
+        )
+    position = gate.position(held.arrived_at)
+    return QueuePositionResponse(
+        position=position, retry_after=gate.retry_after(position)
+    )
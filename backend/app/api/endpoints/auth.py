@@ -1,22 +1,22 @@
+import datetime
 import time
 
 import jwt
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import ValidationError
-from sqlalchemy import select
+from sqlalchemy import delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
 from app.core import config, security
-from app.models import User
+from app.models import RefreshSession, User
 from app.schemas.requests import (
+    RefreshTokenRequest,
     UserCreateRequest,
+    UserLoginRequest,
 )
-from app.schemas.requests import UserLoginRequest
 from app.schemas.responses import AccessTokenResponse, UserResponse
-from app.core.security import get_password_hash
-from app.core.security import create_jwt_token
 
 router = APIRouter()
 
@@ -29,17 +29,20 @@ async def register_new_user(
     """Create new user"""
     result = await session.execute(select(User).where(User.email == new_user.email))
     if result.scalars().first() is not None:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Email already registered")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Email already registered"
+        )
     user = User(
         email=new_user.email,
-        password=get_password_hash(new_user.password),
+        password=await security.password_hasher.hash(new_user.password),
         phone=new_user.phone if new_user.phone else "",
         name=new_user.name,
         role=new_user.role,
     )
     session.add(user)
     await session.commit()
-    return UserResponse(status="success", token=security.create_jwt_token(new_user.email, new_user.password))
+    token, _, _ = security.create_access_token(user)
+    return UserResponse(status="success", token=token)
 
 
 @router.post("/login", response_model=UserResponse, status_code=200)
@@ -51,10 +54,137 @@ async def login_user(
     result = await session.execute(select(User).where(User.email == user.email))
     fetch_user = result.scalars().first()
     if fetch_user is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    if not security.verify_password(user.password, fetch_user.password):
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid password")
-    return UserResponse(status="success", token=security.create_jwt_token(user.email, user.password))
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+    if not await security.password_hasher.verify(user.password, fetch_user.password):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid password"
+        )
+    deps.token_versions.set(fetch_user.id, fetch_user.token_version)
+    token, _, _ = security.create_access_token(fetch_user)
+    return UserResponse(status="success", token=token)
+
+
+async def issue_token_pair(session: AsyncSession, user: User) -> AccessTokenResponse:
+    """Starts a new refresh token family for user, commits the session"""
+    now = datetime.datetime.now()
+    await session.execute(
+        delete(RefreshSession).where(
+            RefreshSession.user_id == user.id, RefreshSession.expires_at < now
+        )
+    )
+    refresh_session = RefreshSession(
+        user_id=user.id,
+        generation=0,
+        expires_at=now + datetime.timedelta(seconds=security.REFRESH_TOKEN_EXPIRE_SECS),
+    )
+    session.add(refresh_session)
+    await session.commit()
+    return token_pair_response(user, refresh_session.id, refresh_session.generation)
+
+
+def token_pair_response(
+    user: User, family: str, generation: int
+) -> AccessTokenResponse:
+    access_token, expires_at, issued_at = security.create_access_token(
+        user, security.PAIR_ACCESS_TOKEN_EXPIRE_SECS
+    )
+    (
+        refresh_token,
+        refresh_expires_at,
+        refresh_issued_at,
+    ) = security.create_refresh_token(user, family, generation)
+    return AccessTokenResponse(
+        token_type="Bearer",
+        access_token=access_token,
+        expires_at=expires_at,
+        issued_at=issued_at,
+        refresh_token=refresh_token,
+        refresh_token_expires_at=refresh_expires_at,
+        refresh_token_issued_at=refresh_issued_at,
+    )
+
+
+@router.post("/access-token", response_model=AccessTokenResponse)
+async def login_access_token(
+    session: AsyncSession = Depends(deps.get_session),
+    form_data: OAuth2PasswordRequestForm = Depends(),
+):
+    """OAuth2 compatible token, get an access token and a refresh token"""
+    result = await session.execute(select(User).where(User.email == form_data.username))
+    user = result.scalars().first()
+
+    if user is None or not await security.password_hasher.verify(
+        form_data.password, user.password
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Incorrect email or password",
+        )
+    deps.token_versions.set(user.id, user.token_version)
+    return await issue_token_pair(session, user)
+
+
+@router.post("/refresh", response_model=AccessTokenResponse)
+async def refresh_token(
+    input: RefreshTokenRequest,
+    session: AsyncSession = Depends(deps.get_session),
+):
+    """Rotate refresh token, get a new access token and refresh token
+
+    Each refresh token can be used once. Presenting an already rotated token
+    revokes the whole family, as it was most likely leaked.
+    """
+    try:
+        payload = jwt.decode(
+            input.refresh_token,
+            config.settings.SECRET_KEY,
+            algorithms=[security.JWT_ALGORITHM],
+        )
+        token_data = security.JWTTokenPayload(**payload)
+    except (jwt.PyJWTError, ValidationError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+        )
+    if not token_data.refresh or token_data.family is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials, cannot use access token",
+        )
+
+    now = datetime.datetime.now()
+    result = await session.execute(
+        update(RefreshSession)
+        .where(
+            RefreshSession.id == token_data.family,
+            RefreshSession.generation == token_data.generation,
+            RefreshSession.expires_at > now,
+        )
+        .values(
+            generation=RefreshSession.generation + 1,
+            expires_at=now
+            + datetime.timedelta(seconds=security.REFRESH_TOKEN_EXPIRE_SECS),
+        )
+        .returning(RefreshSession.generation)
+    )
+    generation = result.scalar_one_or_none()
+    user = await session.get(User, token_data.sub) if generation is not None else None
+
+    if user is None or user.token_version != token_data.version:
+        await session.execute(
+            delete(RefreshSession).where(RefreshSession.id == token_data.family)
+        )
+        await session.commit()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials, refresh token revoked",
+        )
+
+    await session.commit()
+    deps.token_versions.set(user.id, user.token_version)
+    return token_pair_response(user, token_data.family, generation)
 
 
 @router.get("/validate-token", response_model=UserResponse, status_code=200)
@@ -68,16 +198,15 @@ async def validate_token(
             token,
             config.settings.SECRET_KEY,
             algorithms=[security.JWT_ALGORITHM],
+            options={"verify_exp": False},
         )
-    except (jwt.DecodeError, ValidationError):
+        token_data = security.JWTTokenPayload(**payload)
+    except (jwt.PyJWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials, unknown error",
         )
 
-    # JWT guarantees payload will be unchanged (and thus valid), no errors here
-    token_data = security.JWTTokenPayload(**payload)
-
     now = int(time.time())
     if now < token_data.issued_at or now > token_data.expires_at:
         raise HTTPException(
@@ -85,10 +214,15 @@ async def validate_token(
             detail="Could not validate credentials, token expired or not yet valid",
         )
 
-    result = await session.execute(select(User).where(User.email == token_data.email))
+    result = await session.execute(select(User).where(User.id == token_data.sub))
     user = result.scalars().first()
 
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
+    if token_data.version is not None and token_data.version != user.token_version:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials, token revoked",
+        )
 
     return {"status": "success", "token": token}
@@ -1,70 +1,727 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+import csv
+import datetime
+import io
+import json
+import uuid
+from collections import defaultdict
+from collections.abc import Iterable
+from itertools import chain
+from typing import Literal, Optional, Union
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import (
+    column,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy import event as sa_event
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.exc import IntegrityError, DBAPIError
+from sqlalchemy.orm import Session
 
 from app.api import deps
-from app.models import Event, Manage, Participant, Prize, User, Registration
+from app.api.conditional import REVALIDATE_CACHE_CONTROL, cached_json_response
+from app.api.endpoints.schedule import schedule_snapshot
+from app.api.endpoints.venues import find_venue_conflict, naive_utc, occupies
+from app.api.idempotency import idempotency_store
+from app.api.pagination import (
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    decode_datetime,
+    encode_cursor,
+)
+from app.core import config, metrics, scheduler
+from app.core.admission import QUEUE_TICKET_HEADER, AdmissionGate
+from app.core.batching import MicroBatcher
+from app.core.cache import TTLCache
+from app.core.scheduler import Booking, EventDemand, Grid, VenueSpec
+from app.core.search import (
+    POSTGRES_DOCUMENT,
+    EventSearchIndex,
+    prefix_tsquery,
+    tokenize,
+)
+from app.core.session import async_session
+from app.core.snapshot import Snapshot, make_etag
+from app.models import (
+    Event,
+    EventRole,
+    EventSeat,
+    Participant,
+    Prize,
+    Registration,
+    Student,
+    User,
+    Venue,
+    Volunteer,
+    Waitlist,
+)
+from app.schemas.requests import (
+    AutoScheduleRequest,
+    BaseUser,
+    CancellationRequest,
+    EventCapacityRequest,
+    EventChangeRequest,
+)
 from app.schemas.responses import (
+    AutoScheduledEvent,
+    AutoScheduleQuality,
+    AutoScheduleResponse,
+    CancellationResponse,
+    EventCapacityResponse,
     EventListResponse,
-    List,
     EventSchema,
+    EventSearchResult,
+    EventSummaryListResponse,
+    EventSummarySchema,
+    QueueTicketResponse,
     RegistrationResponse,
+    UnscheduledEvent,
+    WaitlistResponse,
     WinnerResponse,
 )
-from app.schemas.requests import EventChangeRequest, BaseUser
-
 
 router = APIRouter()
 
+# requests turned away get a 503 with a queue ticket, see app.core.admission
+OVERLOADED = {status.HTTP_503_SERVICE_UNAVAILABLE: {"model": QueueTicketResponse}}
+
+catalog_gate = AdmissionGate(
+    "catalog",
+    max_in_flight=config.settings.ADMISSION_CATALOG_MAX_IN_FLIGHT,
+    max_waiting=config.settings.ADMISSION_MAX_WAITING,
+    max_wait=config.settings.ADMISSION_MAX_WAIT_SECONDS,
+    ticket_ttl=config.settings.ADMISSION_TICKET_TTL_SECONDS,
+)
+register_gate = AdmissionGate(
+    "register",
+    max_in_flight=config.settings.ADMISSION_REGISTER_MAX_IN_FLIGHT,
+    max_in_flight_per_key=config.settings.ADMISSION_REGISTER_MAX_IN_FLIGHT_PER_EVENT,
+    max_waiting=config.settings.ADMISSION_MAX_WAITING,
+    max_wait=config.settings.ADMISSION_MAX_WAIT_SECONDS,
+    ticket_ttl=config.settings.ADMISSION_TICKET_TTL_SECONDS,
+)
+
 
-@router.get("/all", response_model=EventListResponse, status_code=status.HTTP_200_OK)
+async def admit_catalog(request: Request):
+    async with catalog_gate.admit(
+        ticket=request.headers.get(QUEUE_TICKET_HEADER),
+        authorization=request.headers.get("Authorization"),
+    ):
+        yield
+
+
+async def admit_registration(event_id: str, request: Request):
+    async with register_gate.admit(
+        event_id,
+        ticket=request.headers.get(QUEUE_TICKET_HEADER),
+        authorization=request.headers.get("Authorization"),
+    ):
+        yield
+
+
+def event_schema(event) -> EventSchema:
+    return EventSchema(
+        id=event.id,
+        name=event.name,
+        type=event.type,
+        desc=event.desc,
+        date=event.date,
+        duration=event.duration,
+        venue=event.venue,
+    )
+
+
+async def build_catalog(session: AsyncSession) -> tuple[bytes, str]:
+    """The whole `/events/all` response, serialized once"""
+    result = await session.execute(select(Event).order_by(Event.date, Event.id))
+    catalog = EventListResponse(events=[event_schema(e) for e in result.scalars()])
+    body = catalog.model_dump_json().encode()
+    return body, make_etag(body)
+
+
+# rebuilt by create_event / update_event after they commit
+catalog_snapshot = Snapshot(
+    build_catalog, ttl=config.settings.EVENT_CATALOG_SNAPSHOT_TTL_SECONDS
+)
+metrics.register("event_catalog_snapshot", catalog_snapshot.stats)
+
+
+async def refresh_event_snapshots(session: AsyncSession) -> None:
+    await catalog_snapshot.refresh(session)
+    await schedule_snapshot.refresh(session)
+    if config.settings.EVENT_SEARCH_BACKEND == "memory":
+        await search_snapshot.refresh(session)
+
+
+def event_summary(event) -> EventSummarySchema:
+    return EventSummarySchema(
+        id=event.id,
+        name=event.name,
+        type=event.type,
+        date=event.date,
+        duration=event.duration,
+        venue=event.venue,
+    )
+
+
+@router.get(
+    "/all",
+    response_model=Union[EventListResponse, EventSummaryListResponse],
+    status_code=status.HTTP_200_OK,
+    responses=OVERLOADED,
+    dependencies=[Depends(admit_catalog)],
+)
 async def list_events(
+    request: Request,
+    response: Response,
+    type: Optional[str] = None,
+    venue: Optional[str] = None,
+    date_from: Optional[datetime.datetime] = None,
+    date_to: Optional[datetime.datetime] = None,
+    name: Optional[str] = Query(default=None, min_length=1),
+    view: Literal["full", "summary"] = "full",
+    limit: Optional[int] = Query(default=None, ge=1, le=1000),
+    cursor: Optional[str] = None,
     current_user: BaseUser = Depends(deps.get_current_user),
-    session: AsyncSession = Depends(deps.get_session),
+    session: AsyncSession = Depends(deps.get_read_session),
+    primary: AsyncSession = Depends(deps.get_session),
 ):
-    """List all events"""
-    result = await session.execute(select(Event))
-    events = result.scalars().all()
+    """List all events
+
+    Ordered by start time. Filters narrow the list to a type, a venue, events
+    starting in `[date_from, date_to)` and names starting with `name` (case
+    insensitive). `view=summary` leaves out the description. Paginated like
+    `/events/registrations`; the unfiltered full catalog is served from the
+    snapshot and supports `If-None-Match`. Behind the `catalog` admission gate.
+    """
+    filtered = any(
+        value is not None for value in (type, venue, date_from, date_to, name)
+    )
+    if not filtered and view == "full" and limit is None and cursor is None:
+        # shared by every reader until the next refresh, never from a replica
+        snapshot = await catalog_snapshot.get(primary)
+        if snapshot is not None:
+            return cached_json_response(
+                request,
+                *snapshot,
+                headers={
+                    "Cache-Control": REVALIDATE_CACHE_CONTROL,
+                    "X-Catalog-Version": str(catalog_snapshot.version),
+                },
+            )
 
-    all_events: List[EventSchema] = []
-    for event in events:
-        all_events.append(
-            EventSchema(
-                id=event.id,
-                name=event.name,
-                type=event.type,
-                desc=event.desc,
-                date=event.date,
-                duration=event.duration,
-                venue=event.venue,
+    columns = [
+        Event.id,
+        Event.name,
+        Event.type,
+        Event.date,
+        Event.duration,
+        Event.venue,
+    ]
+    if view == "full":
+        columns.append(Event.desc)
+    query = select(*columns).order_by(Event.date, Event.id)
+    if type is not None:
+        query = query.filter(Event.type == type)
+    if venue is not None:
+        query = query.filter(Event.venue == venue)
+    if date_from is not None:
+        query = query.filter(Event.date >= naive_utc(date_from))
+    if date_to is not None:
+        query = query.filter(Event.date < naive_utc(date_to))
+    if name is not None:
+        # served by ix_event_name_lower
+        query = query.filter(
+            func.lower(Event.name).startswith(name.lower(), autoescape=True)
+        )
+    if cursor is not None:
+        date, id = decode_cursor(cursor, 2)
+        query = query.filter(
+            tuple_(Event.date, Event.id)
+            > tuple_(
+                literal(decode_datetime(date), Event.date.type),
+                literal(id, Event.id.type),
             )
         )
-    return EventListResponse(events=all_events)
 
+    result = await session.execute(query.limit(limit + 1 if limit else None))
+    rows = result.all()
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].date, rows[-1].id)
+    if view == "summary":
+        return EventSummaryListResponse(events=[event_summary(row) for row in rows])
+    return EventListResponse(events=[event_schema(row) for row in rows])
+
+
+async def build_search_index(session: AsyncSession) -> EventSearchIndex:
+    result = await session.execute(
+        select(
+            Event.id,
+            Event.name,
+            Event.type,
+            Event.desc,
+            Event.date,
+            Event.duration,
+            Event.venue,
+        )
+    )
+    return EventSearchIndex(result.all())
+
+
+# only used with EVENT_SEARCH_BACKEND=memory, rebuilt with the catalog
+search_snapshot = Snapshot(
+    build_search_index, ttl=config.settings.EVENT_CATALOG_SNAPSHOT_TTL_SECONDS
+)
+metrics.register("event_search_snapshot", search_snapshot.stats)
+
+
+async def get_search_index(
+    primary: AsyncSession, session: AsyncSession
+) -> EventSearchIndex:
+    """The shared snapshot (built on the primary), or a one-off from `session`"""
+    return await search_snapshot.get(primary) or await build_search_index(session)
+
+
+@router.get(
+    "/search", response_model=list[EventSearchResult], status_code=status.HTTP_200_OK
+)
+async def search_events(
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=20, ge=1, le=100),
+    current_user: BaseUser = Depends(deps.get_current_user),
+    session: AsyncSession = Depends(deps.get_read_session),
+    primary: AsyncSession = Depends(deps.get_session),
+):
+    """Search events by name, type and description
+
+    Every word of `q` matches as a prefix, so partial input already finds
+    events. Name matches rank above type matches, which rank above the
+    description.
+    """
+    if not tokenize(q):
+        return []
+    if config.settings.EVENT_SEARCH_BACKEND == "memory":
+        index = await get_search_index(primary, session)
+        return [
+            EventSearchResult(**event_summary(row).model_dump(), rank=rank)
+            for row, rank in index.search(q, limit)
+        ]
+
+    document = literal_column(f"({POSTGRES_DOCUMENT})")
+    query = func.to_tsquery(literal_column("'simple'"), prefix_tsquery(q))
+    name = func.lower(Event.name)
+    # tsvector match served by ix_event_search_document, trigram similarity
+    # (typos in the name) by ix_event_name_trgm
+    rank = func.ts_rank(document, query) + func.similarity(name, q.lower())
+    result = await session.execute(
+        select(
+            Event.id,
+            Event.name,
+            Event.type,
+            Event.date,
+            Event.duration,
+            Event.venue,
+            rank.label("rank"),
+        )
+        .filter(or_(document.op("@@")(query), name.op("%")(q.lower())))
+        .order_by(rank.desc(), Event.date, Event.id)
+        .limit(limit)
+    )
+    return [
+        EventSearchResult(**event_summary(row).model_dump(), rank=row.rank)
+        for row in result
+    ]
+
+
+@router.get("/search/suggest", response_model=list[str], status_code=status.HTTP_200_OK)
+async def suggest_events(
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=10, ge=1, le=50),
+    current_user: BaseUser = Depends(deps.get_current_user),
+    session: AsyncSession = Depends(deps.get_read_session),
+    primary: AsyncSession = Depends(deps.get_session),
+):
+    """Autocomplete event names starting with `q`"""
+    if config.settings.EVENT_SEARCH_BACKEND == "memory":
+        index = await get_search_index(primary, session)
+        return index.suggest(q, limit)
+
+    name = func.lower(Event.name)
+    # served by ix_event_name_lower
+    result = await session.execute(
+        select(Event.name)
+        .filter(name.startswith(q.lower(), autoescape=True))
+        .order_by(name)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+
+async def hold_event(session: AsyncSession, event_id: str) -> bool:
+    """Key share lock on the event for a transaction that registers people
+
+    The lock the registration foreign key takes anyway, taken before the seat
+    row: `set_event_capacity` waits for it, so its count includes this
+    transaction, and both lock the event first. False if there is no event.
+    """
+    result = await session.execute(
+        select(Event.id)
+        .where(Event.id == event_id)
+        .with_for_update(read=True, key_share=True)
+    )
+    return result.scalar() is not None
+
+
+async def take_seat(session: AsyncSession, event_id: str) -> bool:
+    """Take one of the remaining seats, False if there is none to take"""
+    seat = await session.execute(
+        update(EventSeat)
+        .where(EventSeat.event_id == event_id, EventSeat.remaining > 0)
+        .values(remaining=EventSeat.remaining - 1)
+        .returning(EventSeat.remaining)
+    )
+    return seat.scalar() is not None
+
+
+async def draw_ticket(session: AsyncSession, event_id: str) -> Optional[int]:
+    """Next waitlist ticket of a full event, None if a seat freed up meanwhile"""
+    ticket = await session.execute(
+        update(EventSeat)
+        .where(EventSeat.event_id == event_id, EventSeat.remaining == 0)
+        .values(waitlist_tail=EventSeat.waitlist_tail + 1)
+        .returning(EventSeat.waitlist_tail)
+    )
+    return ticket.scalar()
+
+
+async def waitlist_position(
+    session: AsyncSession, event_id: str, user_id: str
+) -> Optional[int]:
+    """1 for the head of the queue
 
-@router.put("/register/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
+    Ticket distance to the head, both found through ix_waitlist_event_ticket.
+    Exact unless people ahead left the queue, then it overstates the wait.
+    """
+    head = (
+        select(func.min(Waitlist.ticket))
+        .where(Waitlist.event_id == event_id)
+        .scalar_subquery()
+    )
+    return await session.scalar(
+        select(Waitlist.ticket - head + 1).where(
+            Waitlist.event_id == event_id, Waitlist.user_id == user_id
+        )
+    )
+
+
+async def promote_waitlist(session: AsyncSession, event_id: str, seats: int) -> int:
+    """Move up to `seats` users from the head of the waitlist to registrations
+
+    One statement however many are promoted. Call with the event_seat row
+    locked; returns how many seats were filled.
+    """
+    if seats <= 0:
+        return 0
+    head = (
+        select(Waitlist.event_id, Waitlist.user_id)
+        .where(
+            Waitlist.event_id == event_id,
+            # volunteers of the event may not register, leave them queued
+            ~exists().where(
+                Volunteer.event_id == Waitlist.event_id,
+                Volunteer.id == Waitlist.user_id,
+            ),
+        )
+        .order_by(Waitlist.ticket)
+        .limit(seats)
+        .with_for_update(skip_locked=True)
+        .cte("head")
+    )
+    promoted = (
+        delete(Waitlist)
+        .where(Waitlist.event_id == head.c.event_id, Waitlist.user_id == head.c.user_id)
+        .returning(Waitlist.event_id, Waitlist.user_id)
+        .cte("promoted")
+    )
+    result = await session.execute(
+        insert(Registration)
+        .from_select(
+            ["event_id", "user_id", "reg_time"],
+            select(promoted.c.event_id, promoted.c.user_id, func.now()),
+        )
+        .returning(Registration.user_id)
+    )
+    return len(result.all())
+
+
+async def release_seats(session: AsyncSession, event_id: str, seats: int) -> int:
+    """Hand `seats` freed seats to the waitlist, the rest become remaining"""
+    if not await hold_event(session, event_id):
+        return 0
+    # the lock orders this against concurrent registrations
+    locked = await session.execute(
+        select(EventSeat.event_id)
+        .where(EventSeat.event_id == event_id)
+        .with_for_update()
+    )
+    if locked.scalar() is None:
+        return 0
+    promoted = await promote_waitlist(session, event_id, seats)
+    if seats > promoted:
+        await session.execute(
+            update(EventSeat)
+            .where(EventSeat.event_id == event_id)
+            .values(remaining=EventSeat.remaining + seats - promoted)
+        )
+    return promoted
+
+
+REGISTERED, DUPLICATE, LIMITED, VOLUNTEER, MISSING = (
+    "registered",
+    "duplicate",
+    "limited",
+    "volunteer",
+    "missing",
+)
+
+
+async def insert_registrations(batch: list[tuple[str, str]]) -> list[str]:
+    """Group commit of (event id, user id) registrations for unlimited events
+
+    One multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING for the whole
+    batch. Events with a seat counter are left out and reported LIMITED, the
+    caller takes the regular path for those. If the statement fails (unknown
+    event, volunteer trigger) every item is retried in its own savepoint.
+    """
+    rows = values(
+        column("event_id", Registration.event_id.type),
+        column("user_id", Registration.user_id.type),
+        name="batch",
+    ).data(batch)
+    statement = (
+        pg_insert(Registration)
+        .from_select(
+            ["event_id", "user_id", "reg_time"],
+            select(rows.c.event_id, rows.c.user_id, func.localtimestamp()).where(
+                ~exists().where(EventSeat.event_id == rows.c.event_id)
+            ),
+        )
+        .on_conflict_do_nothing()
+        .returning(Registration.event_id, Registration.user_id)
+    )
+    async with async_session() as session:
+        # see hold_event, a capacity set meanwhile is visible to the INSERT
+        await session.execute(
+            select(Event.id)
+            .where(Event.id.in_({event_id for event_id, _ in batch}))
+            .order_by(Event.id)
+            .with_for_update(read=True, key_share=True)
+        )
+        try:
+            inserted = set((await session.execute(statement)).tuples())
+        except DBAPIError:
+            await session.rollback()
+            return await insert_registrations_one_by_one(session, batch)
+        limited = set()
+        if len(inserted) < len(batch):
+            result = await session.execute(
+                select(EventSeat.event_id).where(
+                    EventSeat.event_id.in_({event_id for event_id, _ in batch})
+                )
+            )
+            limited = set(result.scalars())
+        await session.commit()
+
+    outcomes = []
+    for item in batch:
+        if item in inserted:
+            outcomes.append(REGISTERED)
+            # the same pair twice in one batch, only the first one inserted
+            inserted.discard(item)
+        elif item[0] in limited:
+            outcomes.append(LIMITED)
+        else:
+            outcomes.append(DUPLICATE)
+    return outcomes
+
+
+async def insert_registrations_one_by_one(
+    session: AsyncSession, batch: list[tuple[str, str]]
+) -> list[str]:
+    outcomes = []
+    for event_id, user_id in batch:
+        try:
+            async with session.begin_nested():
+                if not await hold_event(session, event_id):
+                    outcomes.append(MISSING)
+                    continue
+                seat = await session.scalar(
+                    select(EventSeat.event_id).where(EventSeat.event_id == event_id)
+                )
+                if seat is not None:
+                    outcomes.append(LIMITED)
+                    continue
+                inserted = await session.scalar(
+                    pg_insert(Registration)
+                    .values(event_id=event_id, user_id=user_id)
+                    .on_conflict_do_nothing()
+                    .returning(Registration.user_id)
+                )
+                outcomes.append(REGISTERED if inserted is not None else DUPLICATE)
+        except IntegrityError:
+            outcomes.append(MISSING)
+        except DBAPIError:
+            outcomes.append(VOLUNTEER)
+    await session.commit()
+    return outcomes
+
+
+registration_batcher = MicroBatcher(
+    insert_registrations,
+    max_size=config.settings.REGISTRATION_BATCH_MAX_SIZE,
+    max_delay=config.settings.REGISTRATION_BATCH_MAX_DELAY_MS / 1000,
+)
+metrics.register("registration_batcher", registration_batcher.stats)
+
+
+@router.put(
+    "/register/{event_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={status.HTTP_202_ACCEPTED: {"model": WaitlistResponse}, **OVERLOADED},
+    dependencies=[Depends(admit_registration)],
+)
 async def read_students(
     event_id: str,
+    request: Request,
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
     current_user: BaseUser = Depends(deps.get_current_user),
     session: AsyncSession = Depends(deps.get_session),
 ):
-    """Register for an event"""
+    """Register for an event
+
+    A capacity limited event takes one of its remaining seats with a single
+    conditional UPDATE; the row lock it holds until commit serializes
+    concurrent registrations, so the event is never oversold. When the event
+    is full the user joins its waitlist instead (202 with the position).
+
+    Goes through the `register` admission gate: past its limits the request
+    waits in line briefly, then gets a 503 with a queue ticket to retry with
+    in the `X-Queue-Ticket` header.
+
+    Retries sent with the same `Idempotency-Key` header get the first
+    response back without registering again.
+    """
+    return await idempotency_store.run(
+        request,
+        current_user.id,
+        idempotency_key,
+        lambda: register(session, event_id, current_user),
+    )
+
+
+async def register(
+    session: AsyncSession, event_id: str, current_user: BaseUser
+) -> Response:
     if current_user.role != "participant" and current_user.role != "student":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Not a participant"
         )
 
-    event = await session.execute(select(Event).filter(Event.id == event_id))
-    event = event.scalar_one()
-    if event is None:
+    if config.settings.REGISTRATION_BATCHING:
+        try:
+            # canonical form, the batch matches on what INSERT ... RETURNING gives back
+            event_id = str(uuid.UUID(event_id))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Event not found"
+            )
+        outcome = await registration_batcher.submit((event_id, current_user.id))
+        if outcome == REGISTERED:
+            return Response(status_code=status.HTTP_204_NO_CONTENT)
+        if outcome == DUPLICATE:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Already registered as Participant",
+            )
+        if outcome == VOLUNTEER:
+            raise HTTPException(
+                status_code=status.HTTP_406_NOT_ACCEPTABLE,
+                detail="Already registered as Volunteer",
+            )
+        if outcome == MISSING:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Event not found"
+            )
+        # LIMITED: seats and waitlist below
+
+    if not await hold_event(session, event_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Event not found"
         )
+    # a seat freed between the two updates sends us around once more
+    for _ in range(3):
+        if await take_seat(session, event_id):
+            break
+        # volunteers are never promoted, keep them out of the queue too
+        role = await session.scalar(
+            select(EventRole.role).where(
+                EventRole.event_id == event_id,
+                EventRole.user_id == current_user.id,
+            )
+        )
+        if role == "participant":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Already registered as Participant",
+            )
+        if role is not None:
+            raise HTTPException(
+                status_code=status.HTTP_406_NOT_ACCEPTABLE,
+                detail="Already registered as Volunteer",
+            )
+        ticket = await draw_ticket(session, event_id)
+        if ticket is not None:
+            return await join_waitlist(session, event_id, current_user.id, ticket)
+        # no seat row at all: unlimited
+        seat = await session.scalar(
+            select(EventSeat.event_id).where(EventSeat.event_id == event_id)
+        )
+        if seat is None:
+            break
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Event is full, try again",
+            headers={"Retry-After": "1"},
+        )
 
     try:
         registration = Registration(event_id=event_id, user_id=current_user.id)
         session.add(registration)
+        # a failed insert rolls the seat back with it
         await session.commit()
     except IntegrityError as e:
         print(e)
@@ -78,6 +735,80 @@ async def read_students(
             status_code=status.HTTP_406_NOT_ACCEPTABLE,
             detail="Already registered as Volunteer",
         )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+async def join_waitlist(
+    session: AsyncSession, event_id: str, user_id: str, ticket: int
+) -> JSONResponse:
+    try:
+        session.add(Waitlist(event_id=event_id, user_id=user_id, ticket=ticket))
+        await session.flush()
+        position = await waitlist_position(session, event_id, user_id)
+        await session.commit()
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Already on the waitlist"
+        )
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=WaitlistResponse(position=position).model_dump(),
+    )
+
+
+@router.delete("/register/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def deregister(
+    event_id: str,
+    current_user: BaseUser = Depends(deps.get_current_user),
+    session: AsyncSession = Depends(deps.get_session),
+):
+    """Cancel a registration, or leave the waitlist
+
+    The freed seat goes to the head of the waitlist in the same transaction.
+    """
+    result = await session.execute(
+        delete(Registration)
+        .where(
+            Registration.event_id == event_id,
+            Registration.user_id == current_user.id,
+        )
+        .returning(Registration.user_id)
+    )
+    if result.first() is not None:
+        await release_seats(session, event_id, 1)
+    else:
+        result = await session.execute(
+            delete(Waitlist)
+            .where(Waitlist.event_id == event_id, Waitlist.user_id == current_user.id)
+            .returning(Waitlist.user_id)
+        )
+        if result.first() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Not registered"
+            )
+    await session.commit()
+
+
+@router.get(
+    "/waitlist/{event_id}",
+    response_model=WaitlistResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def read_waitlist_position(
+    event_id: str,
+    current_user: BaseUser = Depends(deps.get_current_user),
+    session: AsyncSession = Depends(deps.get_session),
+):
+    """Position of the current user on the waitlist of an event"""
+    position = await waitlist_position(session, event_id, current_user.id)
+    if position is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Not on the waitlist"
+        )
+    return WaitlistResponse(position=position)
+
+
+WINNERS_CACHE_CONTROL = f"private, max-age={config.settings.WINNERS_CACHE_TTL_SECONDS}"
 
 
 def formatINR(number):
@@ -86,51 +817,188 @@ def formatINR(number):
     return "₹ " + "".join([r] + d)
 
 
+# event id -> winners, dropped when a transaction that flushed a Prize row
+# commits in this worker, and by `invalidate_winners`
+winners_cache = TTLCache(maxsize=1024, ttl=config.settings.WINNERS_CACHE_TTL_SECONDS)
+metrics.register("winners_cache", winners_cache.stats)
+ALL_WINNERS = "*"
+
+
+def invalidate_winners(event_ids: Optional[Iterable[str]] = None) -> None:
+    """Forget the cached winners of `event_ids`, of every event if None
+
+    For writes the flush listener below does not see: Core `update`/`delete`
+    statements on prizes and users, and the `SET NULL` on `Prize.winner_id`
+    when a user row goes away. Call it after the commit.
+    """
+    if event_ids is None:
+        winners_cache.clear()
+        return
+    for event_id in event_ids:
+        winners_cache.pop(str(event_id))
+    winners_cache.pop(ALL_WINNERS)
+
+
+FLUSHED_WINNERS = "flushed_winners"  # key in Session.info
+
+
+@sa_event.listens_for(Session, "after_flush")
+def note_flushed_winners(session, flush_context):
+    # evicting now would let a read before the commit refill the entry from
+    # the rows being replaced, note the events until the commit instead
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Prize):
+            session.info.setdefault(FLUSHED_WINNERS, set()).add(str(obj.event_id))
+
+
+@sa_event.listens_for(Session, "after_commit")
+def invalidate_flushed_winners(session):
+    flushed = session.info.pop(FLUSHED_WINNERS, None)
+    if flushed:
+        invalidate_winners(flushed)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def forget_flushed_winners(session):
+    session.info.pop(FLUSHED_WINNERS, None)
+
+
+async def events_won_by(session: AsyncSession, user_id: str) -> list[str]:
+    """Ids of the events `user_id` holds a prize of"""
+    result = await session.execute(
+        select(Prize.event_id).where(Prize.winner_id == user_id).distinct()
+    )
+    return [str(event_id) for event_id in result.scalars()]
+
+
+def winners_key(event_id: str) -> str:
+    """Canonical form of `event_id`, 404 if it is no event id at all"""
+    try:
+        return str(uuid.UUID(event_id))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Event not found"
+        )
+
+
+async def load_winners(
+    session: AsyncSession, event_ids: Optional[list[str]]
+) -> dict[str, list[WinnerResponse]]:
+    """Winners of the given events (all events with prizes if None) in one query"""
+    query = (
+        select(Prize.event_id, Prize.position, Prize.amount, User.name)
+        .outerjoin(User, User.id == Prize.winner_id)
+        .order_by(Prize.event_id, Prize.position)
+    )
+    if event_ids is not None:
+        query = query.filter(Prize.event_id.in_(event_ids))
+    result = await session.execute(query)
+
+    winners: dict[str, list[WinnerResponse]] = {
+        event_id: [] for event_id in event_ids or []
+    }
+    for row in result:
+        winners.setdefault(str(row.event_id), []).append(
+            WinnerResponse(
+                name=row.name if row.name is not None else "Not declared",
+                position=row.position,
+                prize=formatINR(row.amount),
+            )
+        )
+    return winners
+
+
+@router.get(
+    "/winners",
+    response_model=dict[str, list[WinnerResponse]],
+    status_code=status.HTTP_200_OK,
+)
+async def list_winners_batch(
+    response: Response,
+    event_id: Optional[list[str]] = Query(default=None),
+    current_user: BaseUser = Depends(deps.get_current_user),
+    session: AsyncSession = Depends(deps.get_session),
+):
+    """List winners of many events at once, keyed by event id
+
+    Without `event_id` query parameters, winners of every event with prizes
+    are returned.
+    """
+    response.headers["Cache-Control"] = WINNERS_CACHE_CONTROL
+    if event_id is None:
+        winners = winners_cache.get(ALL_WINNERS)
+        if winners is None:
+            winners = await load_winners(session, None)
+            winners_cache.set(ALL_WINNERS, winners)
+        return winners
+
+    winners = {}
+    missing = []
+    for id in dict.fromkeys(map(winners_key, event_id)):
+        cached = winners_cache.get(id)
+        if cached is None:
+            missing.append(id)
+        else:
+            winners[id] = cached
+    if missing:
+        loaded = await load_winners(session, missing)
+        for id, event_winners in loaded.items():
+            winners_cache.set(id, event_winners)
+        winners.update(loaded)
+    return winners
+
+
 @router.get(
     "/winners/{event_id}",
-    response_model=List[WinnerResponse],
+    response_model=list[WinnerResponse],
     status_code=status.HTTP_200_OK,
 )
 async def list_winners(
     event_id: str,
+    response: Response,
     current_user: BaseUser = Depends(deps.get_current_user),
     session: AsyncSession = Depends(deps.get_session),
 ):
     """List all winners for an event"""
-    try:
-        result = await session.execute(select(Prize).filter(Prize.event_id == event_id))
-        prizes = result.scalars().all()
-        if len(prizes) == 0:
-            return []
-    except Exception as e:
-        print(e)
-        return []
+    response.headers["Cache-Control"] = WINNERS_CACHE_CONTROL
+    event_id = winners_key(event_id)
+    winners = winners_cache.get(event_id)
+    if winners is None:
+        winners = (await load_winners(session, [event_id]))[event_id]
+        winners_cache.set(event_id, winners)
+    return winners
 
-    all_winners: List[WinnerResponse] = []
-    for prize in prizes:
-        if prize.winner_id is not None:
-            user = await session.execute(
-                select(User).filter(User.id == prize.winner_id)
-            )
-            user = user.scalar_one()
-            if user is None:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Inconsistent data",
-                )
-        all_winners.append(
-            WinnerResponse(
-                name=user.name if prize.winner_id is not None else "Not declared",
-                position=prize.position,
-                prize=formatINR(prize.amount),
-            )
+
+# ----------------------------- Restricted -----------------------------
+async def check_venue_free(
+    session: AsyncSession,
+    venue: Optional[str],
+    date: datetime.datetime,
+    duration: datetime.timedelta,
+    event_id: Optional[str] = None,
+) -> None:
+    conflict = await find_venue_conflict(session, venue, date, duration, event_id)
+    if conflict is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"{venue} is booked for {conflict} at that time",
         )
 
-    all_winners.sort(key=lambda x: x.position)
-    return all_winners
+
+async def commit_booking(session: AsyncSession) -> None:
+    """Commit an event write, a booking that raced past the check is a 409"""
+    try:
+        await session.commit()
+    except IntegrityError as e:
+        # exclusion_violation of ex_event_venue_overlap
+        if getattr(e.orig, "sqlstate", None) != "23P01":
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Venue is booked at that time",
+        )
 
 
-# ----------------------------- Restricted -----------------------------
 @router.post("/", response_model=EventSchema, status_code=201)
 async def create_event(
     event: EventSchema,
@@ -140,17 +1008,32 @@ async def create_event(
     """Create an event"""
     if current_user.role != "admin":
         raise HTTPException(status_code=401, detail="Unauthorized")
+    date = naive_utc(event.date)
+    await check_venue_free(session, event.venue, date, event.duration)
     new_event = Event(
         id=event.id,
         name=event.name,
         type=event.type,
         desc=event.desc,
-        date=event.date,
-        time=event.time,
+        date=date,
+        duration=event.duration,
         venue=event.venue,
     )
     session.add(new_event)
-    await session.commit()
+    if event.venue is not None:
+        # limited to the venue capacity until an admin says otherwise
+        await session.execute(
+            insert(EventSeat).from_select(
+                ["event_id", "capacity", "remaining"],
+                select(
+                    literal(event.id, EventSeat.event_id.type),
+                    Venue.capacity,
+                    Venue.capacity,
+                ).where(Venue.name == event.venue),
+            )
+        )
+    await commit_booking(session)
+    await refresh_event_snapshots(session)
     return new_event
 
 
@@ -168,64 +1051,418 @@ async def update_event(
     event = result.scalars().first()
     if event is None:
         raise HTTPException(status_code=404, detail="Event not found")
+    date = naive_utc(new_event.date) if new_event.date else event.date
+    duration = new_event.duration if new_event.duration else event.duration
+    venue = new_event.venue if new_event.venue else event.venue
+    if (date, duration, venue) != (event.date, event.duration, event.venue):
+        await check_venue_free(session, venue, date, duration, event.id)
     event.name = new_event.name if new_event.name else event.name
     event.type = new_event.type if new_event.type else event.type
     event.desc = new_event.desc if new_event.desc else event.desc
-    event.date = new_event.date if new_event.date else event.date
-    event.time = new_event.time if new_event.time else event.time
-    event.venue = new_event.venue if new_event.venue else event.venue
+    event.date = date
+    event.duration = duration
+    if venue != event.venue:
+        event.venue = venue
+        await limit_to_venue(session, event.id, venue)
+    await commit_booking(session)
+    await refresh_event_snapshots(session)
+    return event_schema(event)
+
+
+async def set_event_capacity(
+    session: AsyncSession, event_id: str, capacity: Optional[int]
+) -> Optional[EventCapacityResponse]:
+    """Set or lift the limit in the session's transaction, None without an event
+
+    FOR UPDATE on the event waits for the registrations in flight, which hold
+    a key share lock on it (see `hold_event`), and keeps new ones out until
+    commit: none can slip in between the count and the write, even while
+    there is no seat row to lock yet.
+    """
+    locked = await session.execute(
+        select(Event.id).where(Event.id == event_id).with_for_update()
+    )
+    if locked.scalar() is None:
+        return None
+    registered = await session.scalar(
+        select(func.count())
+        .select_from(Registration)
+        .where(Registration.event_id == event_id)
+    )
+    if capacity is None:
+        # no limit, everybody waiting gets in
+        waiting = await session.scalar(
+            select(func.count())
+            .select_from(Waitlist)
+            .where(Waitlist.event_id == event_id)
+        )
+        registered += await promote_waitlist(session, event_id, waiting)
+        # whoever could not be promoted (volunteers) has nothing left to wait for
+        await session.execute(delete(Waitlist).where(Waitlist.event_id == event_id))
+        await session.execute(delete(EventSeat).where(EventSeat.event_id == event_id))
+        return EventCapacityResponse(
+            capacity=None, remaining=None, registered=registered
+        )
+
+    free = max(capacity - registered, 0)
+    # new tickets go after any still queued, ix_waitlist_event_ticket is unique
+    tail = (
+        select(func.coalesce(func.max(Waitlist.ticket), 0))
+        .where(Waitlist.event_id == event_id)
+        .scalar_subquery()
+    )
+    statement = pg_insert(EventSeat).values(
+        event_id=event_id, capacity=capacity, remaining=free, waitlist_tail=tail
+    )
+    await session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[EventSeat.event_id],
+            set_=dict(
+                capacity=statement.excluded.capacity,
+                remaining=free,
+                waitlist_tail=func.greatest(
+                    EventSeat.waitlist_tail, statement.excluded.waitlist_tail
+                ),
+            ),
+        )
+    )
+    promoted = await promote_waitlist(session, event_id, free)
+    if promoted:
+        await session.execute(
+            update(EventSeat)
+            .where(EventSeat.event_id == event_id)
+            .values(remaining=free - promoted)
+        )
+    return EventCapacityResponse(
+        capacity=capacity, remaining=free - promoted, registered=registered + promoted
+    )
+
+
+async def limit_to_venue(session: AsyncSession, event_id: str, venue: str) -> None:
+    """Limit the event to the capacity of its (new) venue, as on creation"""
+    capacity = await session.scalar(select(Venue.capacity).where(Venue.name == venue))
+    if capacity is not None:
+        await set_event_capacity(session, event_id, capacity)
+
+
+@router.put(
+    "/{id}/capacity",
+    response_model=EventCapacityResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def update_event_capacity(
+    id: str,
+    event_capacity: EventCapacityRequest,
+    current_user: BaseUser = Depends(deps.get_current_user),
+    session: AsyncSession = Depends(deps.get_session),
+):
+    """Set or lift (`capacity: null`) the registration limit of an event (admin only)
+
+    Remaining seats are recounted from the registrations, which also repairs
+    a counter that drifted.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    seats = await set_event_capacity(session, id, event_capacity.capacity)
+    if seats is None:
+        raise HTTPException(status_code=404, detail="Event not found")
     await session.commit()
-    return EventSchema(
-        id=event.id,
-        name=event.name,
-        type=event.type,
-        desc=event.desc,
-        date=event.date,
-        time=event.time,
-        venue=event.venue,
+    return seats
+
+
+@router.post(
+    "/{id}/cancellations",
+    response_model=CancellationResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def cancel_registrations(
+    id: str,
+    cancellation: CancellationRequest,
+    current_user: BaseUser = Depends(deps.get_current_user),
+    session: AsyncSession = Depends(deps.get_session),
+):
+    """Cancel many registrations at once and promote the waitlist (admin only)
+
+    Everything happens in one transaction, the promotion in one statement.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    result = await session.execute(
+        delete(Registration)
+        .where(
+            Registration.event_id == id,
+            Registration.user_id.in_(cancellation.user_ids),
+        )
+        .returning(Registration.user_id)
+    )
+    cancelled = len(result.all())
+    promoted = await release_seats(session, id, cancelled)
+    await session.commit()
+    return CancellationResponse(cancelled=cancelled, promoted=promoted)
+
+
+@router.post(
+    "/auto-schedule",
+    response_model=AutoScheduleResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def auto_schedule_events(
+    auto_schedule: AutoScheduleRequest,
+    current_user: BaseUser = Depends(deps.get_current_user),
+    session: AsyncSession = Depends(deps.get_session),
+):
+    """Place every event without a venue into a venue and timeslot (admin only)
+
+    Events that already have a venue stay where they are. Expected attendance
+    and participant clashes come from registrations. Returns the proposed
+    placements and their quality; `apply=true` also saves them.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    if auto_schedule.day_end <= auto_schedule.day_start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="day_end must be after day_start",
+        )
+    grid = Grid(
+        days=sorted(set(auto_schedule.days)),
+        day_start=auto_schedule.day_start,
+        day_end=auto_schedule.day_end,
+        slot=datetime.timedelta(minutes=auto_schedule.slot_minutes),
+    )
+    opens = datetime.datetime.combine(grid.days[0], grid.day_start)
+    closes = datetime.datetime.combine(grid.days[-1], grid.day_end)
+
+    pending = (
+        await session.execute(
+            select(Event.id, Event.name, Event.duration).filter(Event.venue.is_(None))
+        )
+    ).all()
+    booked = (
+        await session.execute(
+            select(Event.id, Event.venue, Event.date, Event.duration).filter(
+                Event.venue.is_not(None), occupies(opens, closes)
+            )
+        )
+    ).all()
+    venues = (await session.execute(select(Venue.name, Venue.capacity))).all()
+    attendees = defaultdict(set)
+    registrations = await session.execute(
+        select(Registration.event_id, Registration.user_id).filter(
+            Registration.event_id.in_([row.id for row in chain(pending, booked)])
+        )
+    )
+    for event_id, user_id in registrations:
+        attendees[event_id].add(user_id)
+
+    # CPU bound for up to the time budget, keep the event loop free
+    result = await run_in_threadpool(
+        scheduler.schedule,
+        [
+            EventDemand(row.id, row.duration, frozenset(attendees[row.id]))
+            for row in pending
+        ],
+        [VenueSpec(row.name, row.capacity) for row in venues],
+        grid,
+        [
+            Booking(
+                row.id,
+                row.venue,
+                row.date,
+                row.date + row.duration,
+                frozenset(attendees[row.id]),
+            )
+            for row in booked
+        ],
+        time_budget=auto_schedule.time_budget_ms / 1000,
+    )
+
+    names = {row.id: row.name for row in pending}
+    if auto_schedule.apply and result.placements:
+        # a limit an admin already set on an unplaced event stays
+        limited = set(
+            await session.scalars(
+                select(EventSeat.event_id).where(
+                    EventSeat.event_id.in_([p.event_id for p in result.placements])
+                )
+            )
+        )
+        for placement in result.placements:
+            await session.execute(
+                update(Event)
+                .where(Event.id == placement.event_id)
+                .values(date=placement.start, venue=placement.venue)
+            )
+            if placement.event_id not in limited:
+                await limit_to_venue(session, placement.event_id, placement.venue)
+        await commit_booking(session)
+        await refresh_event_snapshots(session)
+
+    return AutoScheduleResponse(
+        applied=auto_schedule.apply,
+        placements=[
+            AutoScheduledEvent(
+                event_id=placement.event_id,
+                name=names[placement.event_id],
+                venue=placement.venue,
+                start=placement.start,
+                end=placement.end,
+            )
+            for placement in result.placements
+        ],
+        unassigned=[
+            UnscheduledEvent(event_id=event_id, name=names[event_id], reason=reason)
+            for event_id, reason in result.unassigned.items()
+        ],
+        quality=AutoScheduleQuality(
+            events=len(pending),
+            placed=len(result.placements),
+            clashes=result.clashes,
+            greedy_clashes=result.greedy_clashes,
+            clashing_pairs=result.clashing_pairs,
+            capacity_utilization=result.capacity_utilization,
+            moves=result.moves,
+            restarts=result.restarts,
+            converged=result.converged,
+            elapsed_ms=result.elapsed_ms,
+        ),
     )
 
 
 @router.get(
     "/registrations/{event_id}",
-    response_model=List[RegistrationResponse],
+    response_model=list[RegistrationResponse],
     status_code=status.HTTP_200_OK,
 )
 async def list_registrations(
     event_id: str,
+    response: Response,
+    limit: Optional[int] = Query(default=None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    stream: bool = False,
     current_user: BaseUser = Depends(deps.get_current_user),
     session: AsyncSession = Depends(deps.get_session),
 ):
-    """List all registrations for an event"""
-    organizers = await session.execute(
-        select(Manage).filter(Manage.event_id == event_id)
-    )
-    organizers = organizers.scalars().all()
-    if current_user.role == "admin" or (
-        current_user.role == "organizer"
-        and current_user.id in [organizer.id for organizer in organizers]
-    ):
-        result = await session.execute(
-            select(Registration).filter(Registration.event_id == event_id)
-        )
-        registrations = result.scalars().all()
-        all_registrations: List[RegistrationResponse] = []
-        for registration in registrations:
-            user = await session.execute(
-                select(User).filter(User.id == registration.user_id)
-            )
-            user = user.scalar_one()
-            if user is None:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Inconsistent data",
-                )
-            all_registrations.append(
-                RegistrationResponse(name=user.name, email=user.email)
+    """List all registrations for an event
+
+    Ordered by registration time. Pass `limit` to page through registrants,
+    the next page cursor is returned in the `X-Next-Cursor` header. With
+    `stream=true` rows are streamed from a server side cursor instead.
+    """
+    if not await deps.can_manage_event(session, event_id, current_user):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized"
+        )
+
+    query = (
+        select(User.name, User.email, Registration.reg_time, Registration.user_id)
+        .select_from(Registration)
+        .join(User, User.id == Registration.user_id)
+        .filter(Registration.event_id == event_id)
+        .order_by(Registration.reg_time, Registration.user_id)
+    )
+    if cursor is not None:
+        reg_time, user_id = decode_cursor(cursor, 2)
+        query = query.filter(
+            tuple_(Registration.reg_time, Registration.user_id)
+            > tuple_(
+                literal(decode_datetime(reg_time), Registration.reg_time.type),
+                literal(user_id, Registration.user_id.type),
             )
+        )
 
-        return all_registrations
-    else:
+    if stream:
+        return StreamingResponse(
+            stream_registrations(query.limit(limit)), media_type="application/json"
+        )
+
+    result = await session.execute(query.limit(limit + 1 if limit else None))
+    rows = result.all()
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            rows[-1].reg_time, rows[-1].user_id
+        )
+    return [RegistrationResponse(name=row.name, email=row.email) for row in rows]
+
+
+async def stream_registrations(query):
+    """Encodes registrations as a JSON array while reading them from the database"""
+    async with async_session() as session:
+        rows = await session.stream(query.execution_options(yield_per=500))
+        separator = ""
+        yield "["
+        async for row in rows:
+            yield separator + RegistrationResponse(
+                name=row.name, email=row.email
+            ).model_dump_json()
+            separator = ","
+        yield "]"
+
+
+EXPORT_COLUMNS = ["name", "email", "phone", "reg_time", "university", "roll", "dept"]
+
+
+@router.get("/registrations/{event_id}/export", status_code=status.HTTP_200_OK)
+async def export_registrations(
+    event_id: str,
+    format: Literal["csv", "ndjson"] = "csv",
+    current_user: BaseUser = Depends(deps.get_current_user),
+    session: AsyncSession = Depends(deps.get_session),
+):
+    """Export registrations of an event as CSV or NDJSON
+
+    Rows are streamed from a server side cursor, memory use does not depend
+    on the number of registrants.
+    """
+    if not await deps.can_manage_event(session, event_id, current_user):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized"
         )
+
+    query = (
+        select(
+            User.name,
+            User.email,
+            User.phone,
+            Registration.reg_time,
+            Participant.university,
+            Student.roll,
+            Student.dept,
+        )
+        .select_from(Registration)
+        .join(User, User.id == Registration.user_id)
+        .outerjoin(Participant, Participant.id == Registration.user_id)
+        .outerjoin(Student, Student.id == Registration.user_id)
+        .filter(Registration.event_id == event_id)
+        .order_by(Registration.reg_time, Registration.user_id)
+    )
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_export(query, format),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="registrations-{event_id}.{format}"'
+        },
+    )
+
+
+async def stream_export(query, format: str):
+    async with async_session() as session:
+        rows = await session.stream(query.execution_options(yield_per=1000))
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if format == "csv":
+            writer.writerow(EXPORT_COLUMNS)
+        async for partition in rows.partitions():
+            for row in partition:
+                record = dict(zip(EXPORT_COLUMNS, row))
+                record["reg_time"] = record["reg_time"].isoformat()
+                if format == "csv":
+                    writer.writerow(record.values())
+                else:
+                    buffer.write(json.dumps(record) + "\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
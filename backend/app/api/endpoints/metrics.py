@@ -0,0 +1,23 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.api import deps
+from app.core import metrics
+from app.schemas.requests import BaseUser
+
+router = APIRouter()
+
+
+@router.get(
+    "/", response_model=dict[str, dict[str, Any]], status_code=status.HTTP_200_OK
+)
+async def read_metrics(
+    current_user: BaseUser = Depends(deps.get_current_user),
+):
+    """Read in-process metrics of the worker serving the request (admin only)"""
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized"
+        )
+    return metrics.collect()
@@ -1,12 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import literal, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
-from app.models import Accomodation, Manage, Mess, Participant
-from app.schemas.responses import MiniParticipantResponse, ParticipantResponse
-from app.schemas.requests import BaseUser, ParticipantCreateRequest
-
+from app.api.pagination import (
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    decode_datetime,
+    encode_cursor,
+)
+from app.core import allocation
+from app.models import Accomodation, Mess, Participant, Registration, User
+from app.schemas.requests import (
+    BaseUser,
+    ParticipantCreateRequest,
+    ParticipantImportRequest,
+)
+from app.schemas.responses import (
+    MiniParticipantResponse,
+    ParticipantImportResponse,
+    ParticipantResponse,
+    RebalanceResponse,
+)
 
 router = APIRouter()
 
@@ -19,29 +38,25 @@ async def create_participant(
     current_user: BaseUser = Depends(deps.get_current_user),
     session: AsyncSession = Depends(deps.get_session),
 ):
-    """Create a new participant"""
+    """Create a new participant
+
+    A bed and a mess seat are claimed from the slot ledgers in the same
+    transaction, "No accomodation" / "No mess" when everything is taken.
+    """
     participant = Participant(
         id=current_user.id,
         university=new_participant.university,
     )
     session.add(participant)
+    await session.flush()
+    allocated = await allocation.allocate(session, [current_user.id])
+    accomodation_id, mess_id = allocated[current_user.id]
     await session.commit()
 
-    participant_in_db = await session.execute(
-        select(Participant).filter(Participant.id == current_user.id)
-    )
-    participant_in_db = participant_in_db.scalar_one()
-    if participant_in_db is None:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Inconsistent data",
-        )
     accomodation, mess = None, None
-    if participant_in_db.accomodation_id:
+    if accomodation_id:
         accomodation = await session.execute(
-            select(Accomodation).filter(
-                Accomodation.id == participant_in_db.accomodation_id
-            )
+            select(Accomodation).filter(Accomodation.id == accomodation_id)
         )
         accomodation = accomodation.scalar_one()
         if accomodation is None:
@@ -50,10 +65,8 @@ async def create_participant(
                 detail="Inconsistent data",
             )
 
-    if participant_in_db.mess_id:
-        mess = await session.execute(
-            select(Mess).filter(Mess.id == participant_in_db.mess_id)
-        )
+    if mess_id:
+        mess = await session.execute(select(Mess).filter(Mess.id == mess_id))
         mess = mess.scalar_one()
         if mess is None:
             raise HTTPException(
@@ -65,7 +78,7 @@ async def create_participant(
         name=current_user.name,
         email=current_user.email,
         phone=current_user.phone if current_user.phone else "",
-        university=participant_in_db.university,
+        university=participant.university,
         accomodation=accomodation.name if accomodation else "No accomodation",
         mess=mess.name if mess else "No mess",
     )
@@ -132,65 +145,134 @@ async def read_participant_me(
 )
 async def list_participants(
     event_id: str,
+    response: Response,
+    university: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=1000),
+    cursor: Optional[str] = None,
     current_user: BaseUser = Depends(deps.get_current_user),
     session: AsyncSession = Depends(deps.get_session),
 ):
-    """List all participants"""
-    organizers = await session.execute(
-        select(Manage).filter(Manage.event_id == event_id)
-    )
-    organizers = organizers.scalars().all()
-    if current_user.role != "admin" and (
-        current_user.role != "organizer"
-        or current_user.id not in [organizer.id for organizer in organizers]
-    ):
+    """List all participants registered for an event
+
+    Ordered by registration time, paginated like `/events/registrations`.
+    """
+    if not await deps.can_manage_event(session, event_id, current_user):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized"
         )
-    
-    result = await session.execute(select(Participant))
-    participants = result.scalars().all()
-    all_participants: list[MiniParticipantResponse] = []
-    for participant in participants:
-        user = await session.execute(
-            select(BaseUser).filter(BaseUser.id == participant.id)
+
+    query = (
+        select(
+            User.name,
+            User.email,
+            Participant.university,
+            Accomodation.name.label("accomodation"),
+            Mess.name.label("mess"),
+            Registration.reg_time,
+            Registration.user_id,
         )
-        user = user.scalar_one()
-        if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Inconsistent data",
-            )
-        accomodation, mess = None, None
-        if participant.accomodation_id:
-            accomodation = await session.execute(
-                select(Accomodation).filter(
-                    Accomodation.id == participant.accomodation_id
-                )
-            )
-            accomodation = accomodation.scalar_one()
-            if accomodation is None:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Inconsistent data",
-                )
-
-        if participant.mess_id:
-            mess = await session.execute(
-                select(Mess).filter(Mess.id == participant.mess_id)
+        .select_from(Registration)
+        .join(Participant, Participant.id == Registration.user_id)
+        .join(User, User.id == Registration.user_id)
+        .outerjoin(Accomodation, Accomodation.id == Participant.accomodation_id)
+        .outerjoin(Mess, Mess.id == Participant.mess_id)
+        .filter(Registration.event_id == event_id)
+        .order_by(Registration.reg_time, Registration.user_id)
+    )
+    if university is not None:
+        query = query.filter(Participant.university == university)
+    if cursor is not None:
+        reg_time, user_id = decode_cursor(cursor, 2)
+        query = query.filter(
+            tuple_(Registration.reg_time, Registration.user_id)
+            > tuple_(
+                literal(decode_datetime(reg_time), Registration.reg_time.type),
+                literal(user_id, Registration.user_id.type),
             )
-            mess = mess.scalar_one()
-            if mess is None:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Inconsistent data",
-                )
-
-        all_participants.append(
-            MiniParticipantResponse(
-                name=user.name,
-                email=user.email,
-                university=participant.university
+        )
+
+    result = await session.execute(query.limit(limit + 1 if limit else None))
+    rows = result.all()
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            rows[-1].reg_time, rows[-1].user_id
+        )
+    return [
+        MiniParticipantResponse(
+            name=row.name,
+            email=row.email,
+            university=row.university,
+            accomodation=row.accomodation or "No accomodation",
+            mess=row.mess or "No mess",
+        )
+        for row in rows
+    ]
+
+
+# ----------------- Admin -----------------
+@router.post(
+    "/import",
+    response_model=ParticipantImportResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def import_participants(
+    participants: ParticipantImportRequest,
+    current_user: BaseUser = Depends(deps.get_current_user),
+    session: AsyncSession = Depends(deps.get_session),
+):
+    """Create participants in bulk (admin only)
+
+    Users already registered as participants are skipped. Beds and mess
+    seats for the whole batch are claimed with one statement per ledger.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized"
+        )
+    try:
+        result = await session.execute(
+            pg_insert(Participant)
+            .values(
+                [
+                    {"id": item.user_id, "university": item.university}
+                    for item in participants.participants
+                ]
             )
+            .on_conflict_do_nothing()
+            .returning(Participant.id)
+        )
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
-    return all_participants
+    created = list(result.scalars())
+    allocated = await allocation.allocate(session, created)
+    await session.commit()
+    return ParticipantImportResponse(
+        created=len(created),
+        with_accomodation=sum(bed is not None for bed, _ in allocated.values()),
+        with_mess=sum(seat is not None for _, seat in allocated.values()),
+    )
+
+
+@router.post(
+    "/rebalance", response_model=RebalanceResponse, status_code=status.HTTP_200_OK
+)
+async def rebalance_allocations(
+    current_user: BaseUser = Depends(deps.get_current_user),
+    session: AsyncSession = Depends(deps.get_session),
+):
+    """Reconcile accomodation and mess slots with capacities (admin only)
+
+    Run after changing a capacity or bulk loading participants: adds or
+    drops free slots, gives participants assigned outside the ledger a slot
+    and allocates what is free to participants still without one.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized"
+        )
+    report = await allocation.rebalance(session)
+    await session.commit()
+    return RebalanceResponse(**report)
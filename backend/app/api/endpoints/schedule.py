@@ -1,59 +1,121 @@
 import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+import json
+from itertools import groupby
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import Date, cast, distinct, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
+from app.api.conditional import REVALIDATE_CACHE_CONTROL, cached_json_response
+from app.core import config, metrics
+from app.core.snapshot import Snapshot, make_etag
 from app.models import Event
-from app.schemas.responses import List, ScheduleResponse
-from app.schemas.requests import BaseUser, ScheduleRequest
-
+from app.schemas.requests import BaseUser
+from app.schemas.responses import ScheduleResponse
 
 router = APIRouter()
 
+DATE_FORMAT = "%d-%m-%Y"
+
+
+def schedule_entry(event) -> ScheduleResponse:
+    return ScheduleResponse(
+        name=event.name,
+        start_time=event.date.strftime("%H:%M"),
+        end_time=(event.date + event.duration).strftime("%H:%M"),
+        venue=event.venue,
+    )
+
+
+def serialized(payload) -> tuple[bytes, str]:
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    return body, make_etag(body)
+
+
+async def build_schedule(session: AsyncSession) -> dict:
+    """Dates list plus the sorted entries of every day, serialized once"""
+    events = await session.execute(
+        select(Event.name, Event.date, Event.duration, Event.venue).order_by(
+            Event.date, Event.name
+        )
+    )
+    days = {
+        day.strftime(DATE_FORMAT): serialized(
+            [schedule_entry(event).model_dump() for event in day_events]
+        )
+        for day, day_events in groupby(events, key=lambda event: event.date.date())
+    }
+    return {"dates": serialized(list(days)), "days": days}
+
+
+# rebuilt by events.create_event / events.update_event after they commit
+schedule_snapshot = Snapshot(
+    build_schedule, ttl=config.settings.SCHEDULE_SNAPSHOT_TTL_SECONDS
+)
+metrics.register("schedule_snapshot", schedule_snapshot.stats)
+EMPTY_DAY = serialized([])
+
 
-def unique_list(l):
-    return list(dict.fromkeys(l))
+def snapshot_response(request: Request, body: bytes, etag: str):
+    return cached_json_response(
+        request,
+        body,
+        etag,
+        headers={
+            "Cache-Control": REVALIDATE_CACHE_CONTROL,
+            "X-Schedule-Version": str(schedule_snapshot.version),
+        },
+    )
 
 
-@router.get("/dates", response_model=List[str], status_code=status.HTTP_200_OK)
+@router.get("/dates", response_model=list[str], status_code=status.HTTP_200_OK)
 async def read_schedule_dates(
+    request: Request,
     current_user: BaseUser = Depends(deps.get_current_user),
-    session: AsyncSession = Depends(deps.get_session),
+    session: AsyncSession = Depends(deps.get_read_session),
+    primary: AsyncSession = Depends(deps.get_session),
 ):
     """Get schedule dates"""
-    dates = await session.execute(select(Event.date).order_by(Event.date))
-    dates = dates.scalars().all()
-    return unique_list(
-        [
-            date.strftime("%d-%m-%Y")
-            for date in sorted(dates, key=lambda x: int(x.strftime("%d%m%Y")))
-        ]
-    )
+    snapshot = await schedule_snapshot.get(primary)
+    if snapshot is not None:
+        return snapshot_response(request, *snapshot["dates"])
+
+    day = cast(Event.date, Date)
+    dates = await session.execute(select(distinct(day)).order_by(day))
+    return [date.strftime(DATE_FORMAT) for date in dates.scalars()]
 
 
 @router.get(
-    "/{date}", response_model=List[ScheduleResponse], status_code=status.HTTP_200_OK
+    "/{date}", response_model=list[ScheduleResponse], status_code=status.HTTP_200_OK
 )
 async def read_schedule(
     date: str,
+    request: Request,
     current_user: BaseUser = Depends(deps.get_current_user),
-    session: AsyncSession = Depends(deps.get_session),
+    session: AsyncSession = Depends(deps.get_read_session),
+    primary: AsyncSession = Depends(deps.get_session),
 ):
     """Get schedule for a date"""
-    event_date = datetime.datetime.strptime(date, "%d-%m-%Y")
-    events = await session.execute(select(Event))
-    events = events.scalars().all()
-    schedule = []
-    for event in events:
-        if event.date.date() != event_date.date():
-            continue
-        schedule.append(
-            ScheduleResponse(
-                name=event.name,
-                start_time=event.date.strftime("%H:%M"),
-                venue=event.venue,
-            )
+    try:
+        day_start = datetime.datetime.strptime(date, DATE_FORMAT)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date must look like {datetime.date.today().strftime(DATE_FORMAT)}",
+        )
+    snapshot = await schedule_snapshot.get(primary)
+    if snapshot is not None:
+        return snapshot_response(
+            request, *snapshot["days"].get(day_start.strftime(DATE_FORMAT), EMPTY_DAY)
         )
 
-    return schedule
+    day_end = day_start + datetime.timedelta(days=1)
+
+    # half-open range on the raw column, served by ix_event_date_id
+    events = await session.execute(
+        select(Event.name, Event.date, Event.duration, Event.venue)
+        .where(Event.date >= day_start, Event.date < day_end)
+        .order_by(Event.date, Event.name)
+    )
+    return [schedule_entry(event) for event in events]
@@ -3,10 +3,9 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
-from app.models import Student, Volunteer, Event
-from app.schemas.responses import List, StudentResponse, StudentVolunteerResponse
-from app.schemas.requests import BaseUser, StudentCreateRequest, StudentVolunteerRequest
-
+from app.models import Student
+from app.schemas.requests import BaseUser, StudentCreateRequest
+from app.schemas.responses import StudentResponse
 
 router = APIRouter()
 
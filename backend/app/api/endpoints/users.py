@@ -1,18 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import delete, select
+from sqlalchemy import delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
+from app.api.endpoints.events import events_won_by, invalidate_winners
+from app.core.security import create_access_token, password_hasher
 from app.models import User
-from app.schemas.responses import UserAdminResponse, UserListResponse, UserResponse, UserMeResponse, UserRolerResponse
 from app.schemas.requests import (
+    BaseUser,
     UserChangeRequest,
     UserCreateRequest,
     UserUpdatePasswordRequest,
-    BaseUser,
 )
-from app.core.security import get_password_hash
-
+from app.schemas.responses import (
+    UserAdminResponse,
+    UserListResponse,
+    UserMeResponse,
+    UserResponse,
+    UserRolerResponse,
+)
 
 router = APIRouter()
 
@@ -45,15 +51,20 @@ async def reset_current_user_password(
     current_user: BaseUser = Depends(deps.get_current_user),
 ):
     """Update current user password"""
-    current_user.password = get_password_hash(user_update_password.password)
-    session.add(current_user)
-    await session.commit()
-    return UserMeResponse(
-        email=current_user.email,
-        phone=current_user.phone if current_user.phone else "",
-        name=current_user.name,
-        role=current_user.role,
+    result = await session.execute(
+        update(User)
+        .where(User.id == current_user.id)
+        .values(
+            password=await password_hasher.hash(user_update_password.password),
+            token_version=User.token_version + 1,
+        )
+        .returning(User)
     )
+    user = result.scalars().one()
+    await session.commit()
+    deps.invalidate_user_credentials(current_user.id)
+    token, _, _ = create_access_token(user)
+    return UserResponse(status="success", token=token)
 
 
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
@@ -62,8 +73,12 @@ async def delete_current_user(
     session: AsyncSession = Depends(deps.get_session),
 ):
     """Delete current user"""
+    # their prizes are left without a winner by the foreign key
+    won = await events_won_by(session, current_user.id)
     await session.execute(delete(User).where(User.id == current_user.id))
     await session.commit()
+    deps.invalidate_user_credentials(current_user.id)
+    invalidate_winners(won)
 
 
 @router.get("/role", response_model=UserRolerResponse, status_code=status.HTTP_200_OK)
@@ -73,6 +88,7 @@ async def get_current_user_role(
     """Get current user role"""
     return UserRolerResponse(role=current_user.role)
 
+
 # ----------------------------- Admin -----------------------------
 @router.get("/all", response_model=UserListResponse)
 async def list_users(
@@ -141,9 +157,11 @@ async def delete_user(
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized"
         )
+    won = await events_won_by(session, id)
     await session.execute(delete(User).where(User.id == id))
     await session.commit()
-    return
+    deps.invalidate_user_credentials(id)
+    invalidate_winners(won)
 
 
 @router.post("/", response_model=UserMeResponse, status_code=status.HTTP_201_CREATED)
@@ -166,7 +184,7 @@ async def create_user(
 
     new_user = User(
         email=user.email,
-        password=get_password_hash(user.password),
+        password=await password_hasher.hash(user.password),
         phone=user.phone,
         name=user.name,
         role=user.role,
@@ -201,7 +219,12 @@ async def update_user(
     user.phone = new_user.phone if new_user.phone is None else user.phone
     user.name = new_user.name if new_user.name else user.name
     user.role = new_user.role if new_user.role else user.role
+    user.token_version = User.token_version + 1
+    # winners are listed by name
+    won = await events_won_by(session, user.id)
     await session.commit()
+    deps.invalidate_user_credentials(user.id)
+    invalidate_winners(won)
     return UserMeResponse(
         email=user.email,
         phone=user.phone if user.phone else "",
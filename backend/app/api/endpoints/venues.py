@@ -0,0 +1,111 @@
+import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.models import Event, Venue
+from app.schemas.requests import BaseUser
+from app.schemas.responses import VenueCalendarResponse, VenueSlot
+
+router = APIRouter()
+
+MAX_CALENDAR_WINDOW = datetime.timedelta(days=31)
+
+
+def naive_utc(value: Optional[datetime.datetime]) -> Optional[datetime.datetime]:
+    """`value` comparable with event dates, which are stored as naive UTC
+
+    Query parameters with an offset (`...T10:00+05:30`, `...Z`) parse as aware
+    datetimes that neither Postgres nor Python compare with naive ones.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(datetime.UTC).replace(tzinfo=None)
+
+
+def occupies(start: datetime.datetime, end: datetime.datetime):
+    """Events whose [date, date + duration) overlaps [start, end)
+
+    Same expression as the `ex_event_venue_overlap` constraint, so together
+    with an equality on the venue the lookup is a GiST index scan.
+    """
+    return func.tsrange(Event.date, Event.date + Event.duration).op("&&")(
+        func.tsrange(start, end)
+    )
+
+
+async def find_venue_conflict(
+    session: AsyncSession,
+    venue: Optional[str],
+    start: datetime.datetime,
+    duration: datetime.timedelta,
+    event_id: Optional[str] = None,
+) -> Optional[str]:
+    """Name of an event already booked in `venue` during the given slot"""
+    if venue is None:
+        return None
+    query = select(Event.name).filter(
+        Event.venue == venue, occupies(start, start + duration)
+    )
+    if event_id is not None:
+        query = query.filter(Event.id != event_id)
+    result = await session.execute(query.limit(1))
+    return result.scalar()
+
+
+def free_slots(
+    busy: list[VenueSlot], start: datetime.datetime, end: datetime.datetime
+) -> list[VenueSlot]:
+    """Gaps between the sorted `busy` slots, within [start, end)"""
+    free, cursor = [], start
+    for slot in busy:
+        if slot.start > cursor:
+            free.append(VenueSlot(start=cursor, end=slot.start))
+        cursor = max(cursor, slot.end)
+    if cursor < end:
+        free.append(VenueSlot(start=cursor, end=end))
+    return free
+
+
+@router.get(
+    "/{name}/calendar",
+    response_model=VenueCalendarResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def read_venue_calendar(
+    name: str,
+    date_from: datetime.datetime,
+    date_to: datetime.datetime,
+    current_user: BaseUser = Depends(deps.get_current_user),
+    session: AsyncSession = Depends(deps.get_session),
+):
+    """Busy and free slots of a venue between `date_from` and `date_to`"""
+    date_from, date_to = naive_utc(date_from), naive_utc(date_to)
+    if not date_from < date_to <= date_from + MAX_CALENDAR_WINDOW:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"date_to must be after date_from, at most {MAX_CALENDAR_WINDOW.days} days",
+        )
+    result = await session.execute(select(Venue.name).where(Venue.name == name))
+    if result.scalar() is None:
+        raise HTTPException(status_code=404, detail="Venue not found")
+
+    events = await session.execute(
+        select(Event.name, Event.date, Event.duration)
+        .filter(Event.venue == name, occupies(date_from, date_to))
+        .order_by(Event.date)
+    )
+    busy = [
+        VenueSlot(
+            start=max(event.date, date_from),
+            end=min(event.date + event.duration, date_to),
+            event=event.name,
+        )
+        for event in events
+    ]
+    return VenueCalendarResponse(
+        venue=name, busy=busy, free=free_slots(busy, date_from, date_to)
+    )
@@ -1,13 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from typing import Literal, Optional
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import JSONResponse
+from sqlalchemy import exists, literal, select, tuple_
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.exc import IntegrityError, DBAPIError
 
 from app.api import deps
-from app.models import Manage, Student, User, Volunteer, Event
-from app.schemas.responses import StudentVolunteerResponse, List
+from app.api.idempotency import idempotency_store
+from app.api.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.models import Event, Student, User, Volunteer
 from app.schemas.requests import BaseUser, StudentVolunteerRequest
-
+from app.schemas.responses import StudentVolunteerResponse
 
 router = APIRouter()
 
@@ -19,10 +32,27 @@ router = APIRouter()
 )
 async def volunteer_student(
     voulunteer: StudentVolunteerRequest,
+    request: Request,
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
     current_user: BaseUser = Depends(deps.get_current_user),
     session: AsyncSession = Depends(deps.get_session),
 ):
-    """Volunteer for an event"""
+    """Volunteer for an event
+
+    Retries sent with the same `Idempotency-Key` header get the first
+    response back without signing up again.
+    """
+    return await idempotency_store.run(
+        request,
+        current_user.id,
+        idempotency_key,
+        lambda: sign_up(session, voulunteer, current_user),
+    )
+
+
+async def sign_up(
+    session: AsyncSession, voulunteer: StudentVolunteerRequest, current_user: BaseUser
+) -> Response:
     if current_user.role != "student":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Not a student"
@@ -60,71 +90,73 @@ async def volunteer_student(
             status_code=status.HTTP_406_NOT_ACCEPTABLE,
             detail="Already registered as Volunteer",
         )
-    return StudentVolunteerResponse(
+    response = StudentVolunteerResponse(
         name=current_user.name, roll=student.roll, dept=student.dept
     )
+    return JSONResponse(content=response.model_dump())
 
 
 # ----------------- Admin -----------------
 @router.get(
     "/all/{event_id}",
-    response_model=List[StudentVolunteerResponse],
+    response_model=list[StudentVolunteerResponse],
     status_code=status.HTTP_200_OK,
 )
 async def read_volunteers(
     event_id: str,
+    response: Response,
+    sort: Literal["roll", "dept"] = "roll",
+    limit: Optional[int] = Query(default=None, ge=1, le=1000),
+    cursor: Optional[str] = None,
     current_user: BaseUser = Depends(deps.get_current_user),
     session: AsyncSession = Depends(deps.get_session),
 ):
-    """Read volunteers for an event"""
-    organizers = await session.execute(
-        select(Manage).filter(Manage.event_id == event_id)
-    )
-    organizers = organizers.scalars().all()
-    volunteers_for_event = await session.execute(
-        select(Volunteer, Student, User)
+    """Read volunteers for an event
+
+    Sorted by roll, or by dept then roll. Pass `limit` to page through
+    volunteers, the next page cursor is returned in the `X-Next-Cursor` header.
+    """
+    allowed = await deps.can_manage_event(session, event_id, current_user)
+    if not allowed and current_user.role == "student":
+        allowed = await session.scalar(
+            select(
+                exists().where(
+                    Volunteer.event_id == event_id, Volunteer.id == current_user.id
+                )
+            )
+        )
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Access denied"
+        )
+
+    sort_key = [Student.roll] if sort == "roll" else [Student.dept, Student.roll]
+    query = (
+        select(User.name, Student.roll, Student.dept)
+        .select_from(Volunteer)
         .join(Student, Volunteer.id == Student.id)
         .join(User, Volunteer.id == User.id)
         .filter(Volunteer.event_id == event_id)
+        .order_by(*sort_key)
     )
-    volunteers_for_event = volunteers_for_event.scalars().all()
-    if (
-        current_user.role == "admin"
-        or (
-            current_user.role == "organizer"
-            and current_user.id in [organizer.id for organizer in organizers]
-        )
-        or (
-            current_user.role == "student"
-            and current_user.id in [volunteer.id for volunteer in volunteers_for_event]
-        )
-    ):
-        volunteers: List[StudentVolunteerResponse] = []
-        for volunteer in volunteers_for_event:
-            user = await session.execute(select(User).filter(User.id == volunteer.id))
-            user = user.scalar_one()
-            if user is None:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Inconsistent data",
-                )
-            student = await session.execute(
-                select(Student).filter(Student.id == volunteer.id)
-            )
-            student = student.scalar_one()
-            if student is None:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Inconsistent data",
-                )
-            volunteers.append(
-                StudentVolunteerResponse(
-                    name=user.name, roll=student.roll, dept=student.dept
-                )
+    if cursor is not None:
+        after = decode_cursor(cursor, len(sort_key))
+        query = query.filter(
+            tuple_(*sort_key)
+            > tuple_(
+                *(literal(value, column.type) for column, value in zip(sort_key, after))
             )
+        )
 
-        return volunteers
-    else:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN, detail="Access denied"
+    result = await session.execute(query.limit(limit + 1 if limit else None))
+    rows = result.all()
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            *([last.roll] if sort == "roll" else [last.dept, last.roll])
         )
+    return [
+        StudentVolunteerResponse(name=row.name, roll=row.roll, dept=row.dept)
+        for row in rows
+    ]
@@ -0,0 +1,221 @@
+"""
+`Idempotency-Key` support for writes that clients retry over flaky networks.
+
+The first request with a key runs the write, and its response (status, body
+and a few headers) is kept for `IDEMPOTENCY_TTL_SECONDS` under (user, key).
+Retries get that response back with `Idempotent-Replayed: true`, the write
+does not run again. A retry arriving while the first request is still running
+waits for it in the same worker; with the `database` store a retry landing on
+another worker meanwhile gets 409 with Retry-After. Reusing a key for a
+different request is a 422.
+
+Responses that ask to be retried (server errors, anything with Retry-After)
+are not stored, the next attempt runs the write afresh.
+"""
+
+import asyncio
+import datetime
+import hashlib
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import and_, delete, or_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core import config, metrics
+from app.core.cache import TTLCache
+from app.core.session import async_session
+from app.models import IdempotencyRecord
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+STORED_HEADERS = ("content-type", "etag", "location")
+STALE_CLAIM_SECONDS = 60  # an unfinished claim this old belongs to a dead worker
+
+
+@dataclass
+class StoredResponse:
+    fingerprint: str
+    status_code: int
+    headers: dict[str, str]
+    body: bytes
+
+    def replay(self) -> Response:
+        return Response(
+            content=self.body,
+            status_code=self.status_code,
+            headers={**self.headers, REPLAYED_HEADER: "true"},
+        )
+
+
+async def request_fingerprint(request: Request) -> str:
+    digest = hashlib.sha256(f"{request.method} {request.url.path}\n".encode())
+    digest.update(await request.body())
+    return digest.hexdigest()
+
+
+class IdempotencyStore:
+    def __init__(self, backend: str, maxsize: int, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.responses = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._in_flight: dict[tuple[str, str], asyncio.Future] = {}
+        self.replayed = 0
+        self.waited = 0
+        self.conflicts = 0
+
+    async def run(
+        self,
+        request: Request,
+        user_id: str,
+        key: Optional[str],
+        write: Callable[[], Awaitable[Response]],
+    ) -> Response:
+        """Response of `write`, run at most once per user and key"""
+        if key is None:
+            return await write()
+        scope = (str(user_id), key)
+        fingerprint = await request_fingerprint(request)
+
+        while (pending := self._in_flight.get(scope)) is not None:
+            self.waited += 1
+            await asyncio.shield(pending)
+        stored = self.responses.get(scope)
+        if stored is not None:
+            return self._replay(stored, fingerprint)
+
+        done = asyncio.get_running_loop().create_future()
+        self._in_flight[scope] = done
+        claimed = False
+        stored = None
+        try:
+            if self.backend == "database":
+                stored = await self._claim(scope, fingerprint)
+                if stored is not None:
+                    self.responses.set(scope, stored)
+                    return self._replay(stored, fingerprint)
+                claimed = True
+            try:
+                response = await write()
+            except HTTPException as e:
+                # same body as the default handler, but storable
+                response = JSONResponse(
+                    {"detail": e.detail}, status_code=e.status_code, headers=e.headers
+                )
+            if response.status_code < 500 and "retry-after" not in response.headers:
+                stored = StoredResponse(
+                    fingerprint=fingerprint,
+                    status_code=response.status_code,
+                    headers={
+                        name: value
+                        for name, value in response.headers.items()
+                        if name in STORED_HEADERS
+                    },
+                    body=bytes(response.body),
+                )
+                self.responses.set(scope, stored)
+            return response
+        finally:
+            if claimed:
+                await self._settle(scope, stored)
+            del self._in_flight[scope]
+            done.set_result(None)
+
+    def _replay(self, stored: StoredResponse, fingerprint: str) -> Response:
+        if stored.fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key already used for a different request",
+            )
+        self.replayed += 1
+        return stored.replay()
+
+    async def _claim(
+        self, scope: tuple[str, str], fingerprint: str
+    ) -> Optional[StoredResponse]:
+        """Takes the key for this request, or returns what another worker stored"""
+        user_id, key = scope
+        now = datetime.datetime.now()
+        async with async_session() as session:
+            claim = pg_insert(IdempotencyRecord).values(
+                user_id=user_id, key=key, fingerprint=fingerprint, created_at=now
+            )
+            claimed = await session.scalar(
+                claim.on_conflict_do_update(
+                    index_elements=[IdempotencyRecord.user_id, IdempotencyRecord.key],
+                    set_=dict(
+                        fingerprint=claim.excluded.fingerprint,
+                        status_code=None,
+                        headers=None,
+                        body=None,
+                        created_at=claim.excluded.created_at,
+                    ),
+                    where=or_(
+                        IdempotencyRecord.created_at
+                        < now - datetime.timedelta(seconds=self.ttl),
+                        and_(
+                            IdempotencyRecord.status_code.is_(None),
+                            IdempotencyRecord.created_at
+                            < now - datetime.timedelta(seconds=STALE_CLAIM_SECONDS),
+                        ),
+                    ),
+                ).returning(IdempotencyRecord.user_id)
+            )
+            if claimed is not None:
+                await session.commit()
+                return None
+            record = await session.get(IdempotencyRecord, (user_id, key))
+        if record is None or record.status_code is None:
+            self.conflicts += 1
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is in progress",
+                headers={"Retry-After": "1"},
+            )
+        return StoredResponse(
+            fingerprint=record.fingerprint,
+            status_code=record.status_code,
+            headers=record.headers or {},
+            body=record.body or b"",
+        )
+
+    async def _settle(
+        self, scope: tuple[str, str], stored: Optional[StoredResponse]
+    ) -> None:
+        """Stores the outcome of a claimed key, or releases the key for a retry"""
+        user_id, key = scope
+        match = and_(IdempotencyRecord.user_id == user_id, IdempotencyRecord.key == key)
+        async with async_session() as session:
+            if stored is None:
+                await session.execute(delete(IdempotencyRecord).where(match))
+            else:
+                await session.execute(
+                    update(IdempotencyRecord)
+                    .where(match)
+                    .values(
+                        status_code=stored.status_code,
+                        headers=stored.headers,
+                        body=stored.body,
+                    )
+                )
+            await session.commit()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self.responses.stats(),
+            "backend": self.backend,
+            "in_flight": len(self._in_flight),
+            "replayed": self.replayed,
+            "waited": self.waited,
+            "conflicts": self.conflicts,
+        }
+
+
+idempotency_store = IdempotencyStore(
+    backend=config.settings.IDEMPOTENCY_STORE,
+    maxsize=config.settings.IDEMPOTENCY_CACHE_MAXSIZE,
+    ttl=config.settings.IDEMPOTENCY_TTL_SECONDS,
+)
+metrics.register("idempotency", idempotency_store.stats)
@@ -0,0 +1,331 @@
+"""
+Admission control for endpoints that get stampeded when registrations open.
+
+An `AdmissionGate` lets at most `max_in_flight` requests through at once, and
+at most `max_in_flight_per_key` of them for the same key (an event). Requests
+beyond that wait in line, earliest arrival first. One still waiting after
+`max_wait` seconds, or arriving while `max_waiting` requests are already in
+line, is turned away with `AdmissionRejected` instead of queueing on the
+database pool. The rejection carries a signed queue ticket remembering when
+the request first arrived: retrying with it keeps the place in line, and
+`GET /admission/{ticket}` reports the position without touching the database.
+
+A ticket is bound to the `Authorization` header of the request it was issued
+to (by its SHA-256, the token itself is not in it) and is good for one place
+in line: it is spent as soon as a retry is honoured with it, and a retry
+turned away again gets a fresh ticket with the same arrival.
+
+Gates and their lines are per uvicorn worker. Tickets order by wall clock
+arrival, so a ticket keeps its place on whichever worker the retry lands; spent
+tickets are remembered per worker too.
+"""
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import math
+import time
+import uuid
+from collections.abc import AsyncIterator, Callable, Hashable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import jwt
+
+from app.core import config, metrics
+from app.core.cache import TTLCache
+
+QUEUE_TICKET_HEADER = "X-Queue-Ticket"
+TICKET_AUDIENCE = "admission"  # access token validation rejects it
+TICKET_ALGORITHM = "HS256"
+SPENT_TICKETS_MAXSIZE = 100000
+
+_gates: dict[str, "AdmissionGate"] = {}
+
+
+@dataclass
+class Ticket:
+    gate: str
+    key: Optional[str]
+    arrived_at: float
+    holder: Optional[str] = None  # see `holder_of`
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+
+def holder_of(authorization: Optional[str]) -> Optional[str]:
+    """What a ticket remembers of the `Authorization` header it was issued to"""
+    if authorization is None:
+        return None
+    return hashlib.sha256(authorization.encode()).hexdigest()
+
+
+def sign_ticket(ticket: Ticket, ttl: int) -> str:
+    return jwt.encode(
+        {
+            "aud": TICKET_AUDIENCE,
+            "jti": ticket.id,
+            "gate": ticket.gate,
+            "key": ticket.key,
+            "arr": ticket.arrived_at,
+            "hld": ticket.holder,
+            "exp": int(time.time()) + ttl,
+        },
+        key=config.settings.SECRET_KEY,
+        algorithm=TICKET_ALGORITHM,
+    )
+
+
+def read_ticket(token: str) -> Optional[Ticket]:
+    """The ticket behind `token`, None if it is forged, expired or malformed"""
+    try:
+        payload = jwt.decode(
+            token,
+            config.settings.SECRET_KEY,
+            algorithms=[TICKET_ALGORITHM],
+            audience=TICKET_AUDIENCE,
+        )
+        return Ticket(
+            gate=str(payload["gate"]),
+            key=payload["key"],
+            arrived_at=float(payload["arr"]),
+            holder=payload["hld"],
+            id=str(payload["jti"]),
+        )
+    except (jwt.PyJWTError, KeyError, TypeError, ValueError):
+        return None
+
+
+def get_gate(name: str) -> Optional["AdmissionGate"]:
+    return _gates.get(name)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request could not be admitted in time"""
+
+    def __init__(self, gate: str, position: int, retry_after: int, ticket: str):
+        super().__init__(gate, position, retry_after)
+        self.gate = gate
+        self.position = position
+        self.retry_after = retry_after
+        self.ticket = ticket
+
+
+@dataclass(order=True)
+class _Waiter:
+    arrived_at: float
+    seq: int
+    key: Optional[Hashable] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class AdmissionGate:
+    """Concurrency limit with a fair line in front of it.
+
+    A limit of 0 disables it; a gate with no limits admits everything.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_in_flight: int,
+        max_in_flight_per_key: int = 0,
+        max_waiting: int = 1000,
+        max_wait: float = 2.0,
+        ticket_ttl: int = 600,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_in_flight_per_key = max_in_flight_per_key
+        self.max_waiting = max_waiting
+        self.max_wait = max_wait
+        self.ticket_ttl = ticket_ttl
+        self.clock = clock
+        self.in_flight = 0
+        self._in_flight_by_key: dict[Hashable, int] = {}
+        # one line per key, each a heap ordered by arrival
+        self._lines: dict[Hashable, list[_Waiter]] = {}
+        self.waiting = 0
+        self._seq = itertools.count()
+        # ids of tickets already honoured, kept until they would expire anyway
+        self._spent = TTLCache(
+            maxsize=SPENT_TICKETS_MAXSIZE, ttl=ticket_ttl, timer=time.monotonic
+        )
+        self.service_time = 0.0  # moving average, seconds
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        _gates[name] = self
+        metrics.register(f"admission_{name}", self.stats)
+
+    def _has_room(self, key: Optional[Hashable]) -> bool:
+        if self.max_in_flight and self.in_flight >= self.max_in_flight:
+            return False
+        return not (
+            key is not None
+            and self.max_in_flight_per_key
+            and self._in_flight_by_key.get(key, 0) >= self.max_in_flight_per_key
+        )
+
+    def _take(self, key: Optional[Hashable]) -> None:
+        self.in_flight += 1
+        self._in_flight_by_key[key] = self._in_flight_by_key.get(key, 0) + 1
+        self.admitted += 1
+
+    def _release(self, key: Optional[Hashable], elapsed: Optional[float]) -> None:
+        self.in_flight -= 1
+        if self._in_flight_by_key[key] == 1:
+            del self._in_flight_by_key[key]
+        else:
+            self._in_flight_by_key[key] -= 1
+        if elapsed is not None:
+            self.service_time = (
+                elapsed
+                if not self.service_time
+                else 0.9 * self.service_time + 0.1 * elapsed
+            )
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Admit waiters, earliest arrival first among keys below their limit"""
+        while self.waiting and self._has_room(None):
+            best = None
+            for key, line in self._lines.items():
+                if self._has_room(key) and (best is None or line[0] < best[0]):
+                    best = line
+            if best is None:
+                return
+            waiter = heapq.heappop(best)
+            if not best:
+                del self._lines[waiter.key]
+            self.waiting -= 1
+            self._take(waiter.key)
+            waiter.future.set_result(None)
+
+    def _remove(self, waiter: _Waiter) -> None:
+        line = self._lines[waiter.key]
+        line.remove(waiter)
+        if line:
+            heapq.heapify(line)
+        else:
+            del self._lines[waiter.key]
+        self.waiting -= 1
+
+    def position(self, arrived_at: float) -> int:
+        """Place in line of a request that arrived at `arrived_at`, 1 is next"""
+        return 1 + sum(
+            waiter.arrived_at < arrived_at
+            for line in self._lines.values()
+            for waiter in line
+        )
+
+    def retry_after(self, position: int) -> int:
+        """Seconds until `position` is likely to reach the front, at least 1"""
+        lanes = self.max_in_flight or self.max_in_flight_per_key or 1
+        return max(1, math.ceil(position * self.service_time / lanes))
+
+    def _honour(
+        self, token: str, key: Optional[Hashable], holder: Optional[str]
+    ) -> Optional[float]:
+        """Arrival kept by the ticket `token`, spending it; None if it does not apply"""
+        held = read_ticket(token)
+        if (
+            held is None
+            or held.gate != self.name
+            or held.key != (None if key is None else str(key))
+            or held.holder != holder
+            or self._spent.get(held.id) is not None
+        ):
+            return None
+        self._spent.set(held.id, True)
+        return held.arrived_at
+
+    def _reject(
+        self, key: Optional[Hashable], arrived_at: float, holder: Optional[str]
+    ) -> AdmissionRejected:
+        self.rejected += 1
+        position = self.position(arrived_at)
+        ticket = Ticket(
+            gate=self.name,
+            key=None if key is None else str(key),
+            arrived_at=arrived_at,
+            holder=holder,
+        )
+        return AdmissionRejected(
+            gate=self.name,
+            position=position,
+            retry_after=self.retry_after(position),
+            ticket=sign_ticket(ticket, self.ticket_ttl),
+        )
+
+    @asynccontextmanager
+    async def admit(
+        self,
+        key: Optional[Hashable] = None,
+        ticket: Optional[str] = None,
+        authorization: Optional[str] = None,
+    ) -> AsyncIterator[None]:
+        """Hold one of the gate's slots for the duration of the block
+
+        `ticket` is the queue ticket of an earlier rejection for the same key
+        and `authorization`, the request then lines up as of its first arrival.
+        """
+        arrived_at = self.clock()
+        holder = holder_of(authorization)
+        if ticket is not None:
+            kept = self._honour(ticket, key, holder)
+            if kept is not None:
+                arrived_at = min(arrived_at, kept)
+
+        # nobody who could run is ever left waiting, so room means no one is ahead
+        if self._has_room(key):
+            self._take(key)
+        else:
+            if self.waiting >= self.max_waiting:
+                raise self._reject(key, arrived_at, holder)
+            waiter = _Waiter(
+                arrived_at,
+                next(self._seq),
+                key,
+                asyncio.get_running_loop().create_future(),
+            )
+            heapq.heappush(self._lines.setdefault(key, []), waiter)
+            self.waiting += 1
+            self.queued += 1
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter.future), self.max_wait)
+            except asyncio.TimeoutError:
+                pass
+            except BaseException:
+                # the client went away, give up the place or the slot
+                if waiter.future.done():
+                    self._release(key, None)
+                else:
+                    self._remove(waiter)
+                    waiter.future.cancel()
+                raise
+            if not waiter.future.done():
+                rejection = self._reject(key, arrived_at, holder)
+                self._remove(waiter)
+                waiter.future.cancel()
+                raise rejection
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(key, time.monotonic() - started)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "max_in_flight_per_key": self.max_in_flight_per_key,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "service_time_ms": self.service_time * 1000,
+        }
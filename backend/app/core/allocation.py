@@ -0,0 +1,197 @@
+"""
+Accomodation and mess allocation over slot ledgers.
+
+Every accomodation has one `accomodation_slot` row per bed and every mess one
+`mess_slot` row per seat. Allocation claims free slots with
+`FOR UPDATE SKIP LOCKED`, so concurrent allocations take different rows
+instead of queueing on a shared capacity counter. A slot is held by at most
+one participant, which rules out over-allocation. Free slots are claimed
+lowest slot number first across all accomodations (messes), spreading
+participants evenly.
+
+`rebalance` derives the slots from `capacity`, adopts participants assigned
+outside the ledger and hands free slots to participants still without one.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import Integer, column, delete, exists, func, select, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Accomodation, AccomodationSlot, Mess, MessSlot, Participant
+
+
+@dataclass(frozen=True)
+class Ledger:
+    name: str
+    slot: Any  # slot model
+    resource: Any  # model whose capacity the slots stand for
+    resource_id: Any  # slot column pointing at the resource
+    assignment: Any  # participant column recording the allocation
+
+
+ACCOMODATION = Ledger(
+    "accomodation",
+    AccomodationSlot,
+    Accomodation,
+    AccomodationSlot.accomodation_id,
+    Participant.accomodation_id,
+)
+MESS = Ledger("mess", MessSlot, Mess, MessSlot.mess_id, Participant.mess_id)
+LEDGERS = (ACCOMODATION, MESS)
+
+
+async def claim(
+    session: AsyncSession,
+    ledger: Ledger,
+    participant_ids: list[str],
+    resource_id: Optional[str] = None,
+) -> dict[str, str]:
+    """Claims one free slot for each participant, as long as slots are free
+
+    One statement for the whole list. Returns participant id -> accomodation
+    (mess) id for those who got a slot and records it on their participant
+    rows, which must be flushed already. Pass `resource_id` to claim in one
+    accomodation (mess) only. The slots stay locked until the session commits.
+    """
+    if not participant_ids:
+        return {}
+    Slot = ledger.slot
+    key = ledger.resource_id.key
+    free = select(ledger.resource_id, Slot.slot).where(Slot.participant_id.is_(None))
+    if resource_id is not None:
+        free = free.where(ledger.resource_id == resource_id)
+    free = (
+        free.order_by(Slot.slot, ledger.resource_id)
+        .limit(len(participant_ids))
+        .with_for_update(skip_locked=True)
+        .cte("free")
+    )
+    # window functions and FOR UPDATE do not mix, number the rows one level up
+    numbered = select(
+        free.c[key],
+        free.c.slot,
+        func.row_number().over(order_by=(free.c.slot, free.c[key])).label("n"),
+    ).cte("numbered")
+    wanted = values(
+        column("participant_id", Slot.participant_id.type),
+        column("n", Integer),
+        name="wanted",
+    ).data([(participant_id, n) for n, participant_id in enumerate(participant_ids, 1)])
+    result = await session.execute(
+        update(Slot)
+        .where(
+            ledger.resource_id == numbered.c[key],
+            Slot.slot == numbered.c.slot,
+            numbered.c.n == wanted.c.n,
+        )
+        .values(participant_id=wanted.c.participant_id)
+        .returning(Slot.participant_id, ledger.resource_id)
+        .execution_options(synchronize_session=False)
+    )
+    claimed = dict(result.all())
+    if claimed:
+        await session.execute(
+            update(Participant),
+            [
+                {"id": participant_id, ledger.assignment.key: resource}
+                for participant_id, resource in claimed.items()
+            ],
+        )
+    return claimed
+
+
+async def allocate(
+    session: AsyncSession, participant_ids: list[str]
+) -> dict[str, tuple[Optional[str], Optional[str]]]:
+    """Claims a bed and a mess seat for each of the (flushed) participants
+
+    Returns participant id -> (accomodation id, mess id), None where nothing
+    was free.
+    """
+    beds = await claim(session, ACCOMODATION, participant_ids)
+    seats = await claim(session, MESS, participant_ids)
+    return {
+        participant_id: (beds.get(participant_id), seats.get(participant_id))
+        for participant_id in participant_ids
+    }
+
+
+async def sync_slots(session: AsyncSession, ledger: Ledger) -> tuple[int, int]:
+    """Makes the slots match `capacity`, returns (added, removed)
+
+    Only free slots are removed; beds above a lowered capacity stay with
+    their participants until they leave.
+    """
+    Slot, Resource = ledger.slot, ledger.resource
+    # set-returning in the select list: capacity rows per resource, and no
+    # second FROM element left unjoined to the resource
+    number = func.generate_series(0, Resource.capacity - 1).label("slot")
+    added = await session.execute(
+        pg_insert(Slot)
+        .from_select([ledger.resource_id.key, "slot"], select(Resource.id, number))
+        .on_conflict_do_nothing()
+    )
+    removed = await session.execute(
+        delete(Slot)
+        .where(
+            ledger.resource_id == Resource.id,
+            Slot.slot >= Resource.capacity,
+            Slot.participant_id.is_(None),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return added.rowcount, removed.rowcount
+
+
+async def rebalance(session: AsyncSession) -> dict[str, dict[str, int]]:
+    """Reconciles both ledgers with capacities and participants
+
+    Syncs the slots with `capacity`, gives participants assigned outside
+    the ledger (bulk loads, rows from before the ledger) a slot in their
+    accomodation (mess), counting those that do not fit as overbooked, and
+    allocates free slots to participants without one. Commit afterwards.
+    """
+    report = {}
+    for ledger in LEDGERS:
+        added, removed = await sync_slots(session, ledger)
+
+        holds_slot = exists().where(ledger.slot.participant_id == Participant.id)
+        result = await session.execute(
+            select(Participant.id, ledger.assignment).where(
+                ledger.assignment.is_not(None), ~holds_slot
+            )
+        )
+        strays = defaultdict(list)
+        for participant_id, resource_id in result.tuples():
+            strays[resource_id].append(participant_id)
+        adopted = overbooked = 0
+        for resource_id, participant_ids in strays.items():
+            got = await claim(session, ledger, participant_ids, resource_id)
+            adopted += len(got)
+            overbooked += len(participant_ids) - len(got)
+
+        waiting = await session.scalars(
+            select(Participant.id)
+            .where(ledger.assignment.is_(None))
+            .order_by(Participant.id)
+        )
+        allocated = len(await claim(session, ledger, list(waiting)))
+
+        free = await session.scalar(
+            select(func.count())
+            .select_from(ledger.slot)
+            .where(ledger.slot.participant_id.is_(None))
+        )
+        report[ledger.name] = {
+            "added": added,
+            "removed": removed,
+            "adopted": adopted,
+            "overbooked": overbooked,
+            "allocated": allocated,
+            "free": free,
+        }
+    return report
@@ -0,0 +1,99 @@
+"""
+Group commit for small writes arriving in bursts.
+
+Callers `submit` an item and await its result. A single worker collects
+whatever arrived within `max_delay` seconds of the first item (at most
+`max_size` of them) and hands the whole batch to `flush`, which writes it in
+one transaction and returns one result per item, in order. While a batch is
+being flushed the next one accumulates, so batches grow with the load.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        flush: Callable[[list[Any]], Awaitable[list[Any]]],
+        max_size: int,
+        max_delay: float,
+    ):
+        self.flush = flush
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        self.batches = 0
+        self.items = 0
+        self.largest = 0
+        self.failures = 0
+
+    async def submit(self, item: Any) -> Any:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self) -> list[tuple[Any, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_delay
+        while len(batch) < self.max_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        while len(batch) < self.max_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            # callers that gave up (request cancelled) need no result
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if not batch:
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            self.largest = max(self.largest, len(batch))
+            try:
+                results = await self.flush([item for item, _ in batch])
+            except Exception as e:
+                self.failures += 1
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("batcher closed"))
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "largest_batch": self.largest,
+            "average_batch": self.items / self.batches if self.batches else 0.0,
+            "failed_batches": self.failures,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
@@ -14,7 +14,8 @@ For the rest, we use file `.env` (gitignored), see `.env.example`
 `DEFAULT_SQLALCHEMY_DATABASE_URI` and `TEST_SQLALCHEMY_DATABASE_URI`:
 Both are ment to be validated at the runtime, do not change unless you know
 what are you doing. All the two validators do is to build full URI (TCP protocol)
-to databases to avoid typo bugs.
+to databases to avoid typo bugs. `REPLICA_SQLALCHEMY_DATABASE_URI` is built
+the same way, and is None unless `REPLICA_DATABASE_HOSTNAME` is set.
 
 See https://pydantic-docs.helpmanual.io/usage/settings/
 
@@ -24,9 +25,9 @@ Note, complex types like lists are read as json-encoded strings.
 import tomllib
 from functools import cached_property
 from pathlib import Path
-from typing import Literal
+from typing import Literal, Optional
 
-from pydantic import AnyHttpUrl, EmailStr, PostgresDsn, computed_field
+from pydantic import EmailStr, PostgresDsn, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 PROJECT_DIR = Path(__file__).parent.parent.parent
@@ -39,11 +40,71 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ENVIRONMENT: Literal["DEV", "PYTEST", "STG", "PRD"] = "DEV"
     SECURITY_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 64  # jobs waiting for a worker before 503
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 11520  # 8 days
+    PAIR_ACCESS_TOKEN_EXPIRE_MINUTES: int = (
+        15  # access tokens issued with a refresh token
+    )
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 40320  # 28 days
     BACKEND_CORS_ORIGINS: list[str] = []
     ALLOWED_HOSTS: list[str] = ["localhost", "127.0.0.1"]
 
+    # AUTH CACHE
+    AUTH_CACHE_MAXSIZE: int = 10000  # 0 disables the cache
+    AUTH_CACHE_TTL_SECONDS: int = 60  # upper bound on revocation lag across workers
+
+    # READ CACHES
+    WINNERS_CACHE_TTL_SECONDS: int = 60
+    SCHEDULE_SNAPSHOT_TTL_SECONDS: int = 30  # 0 disables the snapshot
+    EVENT_CATALOG_SNAPSHOT_TTL_SECONDS: int = 30  # 0 disables the snapshot
+
+    # EVENT SEARCH, "memory" for databases without the pg_trgm extension
+    EVENT_SEARCH_BACKEND: Literal["postgres", "memory"] = "postgres"
+
+    # REGISTRATION GROUP COMMIT, unlimited events only
+    REGISTRATION_BATCHING: bool = False
+    REGISTRATION_BATCH_MAX_SIZE: int = 200
+    REGISTRATION_BATCH_MAX_DELAY_MS: int = 5
+
+    # ADMISSION CONTROL, per uvicorn worker; 0 disables a limit
+    ADMISSION_REGISTER_MAX_IN_FLIGHT: int = 16
+    # one seat row serializes them anyway; raise it with REGISTRATION_BATCHING,
+    # a batch can only be as large as this
+    ADMISSION_REGISTER_MAX_IN_FLIGHT_PER_EVENT: int = 4
+    ADMISSION_CATALOG_MAX_IN_FLIGHT: int = 32
+    ADMISSION_MAX_WAITING: int = 1000  # requests in line before turning new ones away
+    ADMISSION_MAX_WAIT_SECONDS: float = 2  # time in line before 503 with a queue ticket
+    ADMISSION_TICKET_TTL_SECONDS: int = 600
+
+    # IDEMPOTENCY KEYS, "database" shares stored responses between workers
+    IDEMPOTENCY_STORE: Literal["memory", "database"] = "memory"
+    IDEMPOTENCY_CACHE_MAXSIZE: int = 10000
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+
+    # DATABASE POOL, per uvicorn worker; see app/core/pool.py
+    WEB_CONCURRENCY: int = 2  # uvicorn workers, the Dockerfile reads it too
+    DATABASE_MAX_CONNECTIONS: int = 90  # all workers together, below max_connections
+    DATABASE_POOL_SIZE: Optional[int] = None  # default: half of the worker's share
+    DATABASE_MAX_OVERFLOW: Optional[int] = None  # default: the rest of the share
+    DATABASE_POOL_TIMEOUT_SECONDS: float = 10
+    DATABASE_POOL_RECYCLE_SECONDS: int = 1800
+    # a round trip per checkout; without it the first request to hit a dropped
+    # connection fails and invalidates the pool, recycling retires old ones
+    DATABASE_POOL_PRE_PING: bool = False
+    DATABASE_STATEMENT_CACHE_SIZE: int = 100  # 0 behind pgbouncer transaction pooling
+
+    # READ REPLICA, read-only endpoints use it when the hostname is set;
+    # same user, password and database as the default database
+    REPLICA_DATABASE_HOSTNAME: Optional[str] = None
+    REPLICA_DATABASE_PORT: int = 5432
+    REPLICA_CONNECT_TIMEOUT_SECONDS: float = 2
+    REPLICA_RETRY_SECONDS: float = 10  # reads stay on the primary after a failure
+    READ_YOUR_WRITES_SECONDS: float = (
+        5  # a user's reads stay on the primary after a write
+    )
+
     # PROJECT NAME, VERSION AND DESCRIPTION
     PROJECT_NAME: str = PYPROJECT_CONTENT["name"]
     VERSION: str = PYPROJECT_CONTENT["version"]
@@ -81,6 +142,22 @@ class Settings(BaseSettings):
             )
         )
 
+    @computed_field
+    @cached_property
+    def REPLICA_SQLALCHEMY_DATABASE_URI(self) -> Optional[str]:
+        if self.REPLICA_DATABASE_HOSTNAME is None:
+            return None
+        return str(
+            PostgresDsn.build(
+                scheme="postgresql+asyncpg",
+                username=self.DEFAULT_DATABASE_USER,
+                password=self.DEFAULT_DATABASE_PASSWORD,
+                host=self.REPLICA_DATABASE_HOSTNAME,
+                port=self.REPLICA_DATABASE_PORT,
+                path=self.DEFAULT_DATABASE_DB,
+            )
+        )
+
     @computed_field
     @cached_property
     def TEST_SQLALCHEMY_DATABASE_URI(self) -> str:
@@ -102,9 +179,9 @@ class Settings(BaseSettings):
     # def __init__(self, **data):
     #     super().__init__(**data)
 
-        # for k, v in self.model_dump().items():
-        #     if isinstance(v, str) and v.startswith("[") and v.endswith("]"):
-        #         setattr(self, k, eval(v))
+    # for k, v in self.model_dump().items():
+    #     if isinstance(v, str) and v.startswith("[") and v.endswith("]"):
+    #         setattr(self, k, eval(v))
 
 
 settings: Settings = Settings()  # type: ignore
@@ -0,0 +1,19 @@
+"""
+Process-local metrics registry.
+
+Modules register a collector (a callable returning a flat dict) under a name,
+and `/metrics` returns a snapshot of all of them. Values are per uvicorn worker.
+"""
+
+from collections.abc import Callable
+from typing import Any
+
+_collectors: dict[str, Callable[[], dict[str, Any]]] = {}
+
+
+def register(name: str, collector: Callable[[], dict[str, Any]]) -> None:
+    _collectors[name] = collector
+
+
+def collect() -> dict[str, dict[str, Any]]:
+    return {name: collector() for name, collector in _collectors.items()}
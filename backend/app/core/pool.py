@@ -0,0 +1,110 @@
+"""
+Connection pool sizing and instrumentation.
+
+Every uvicorn worker has its own pool, so the connection budget
+(`DATABASE_MAX_CONNECTIONS`, kept below Postgres `max_connections`) is split
+evenly across `WEB_CONCURRENCY` workers: half of a worker's share stays open
+as the pool, the rest is overflow opened under load and closed when returned.
+
+`InstrumentedPool` times every checkout, including the wait for a free
+connection and opening a new one, and `pool_stats` reports that next to the
+in-use and idle gauges, under `db_pool` in `/metrics`. Steady waits mean the
+pool is too small for the load; a high idle count at peak means it is too big.
+"""
+
+import time
+from typing import Any, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+WAIT_BUCKETS_MS = (1, 10, 100, 1000)
+
+
+def pool_limits(
+    max_connections: int,
+    workers: int,
+    pool_size: Optional[int] = None,
+    max_overflow: Optional[int] = None,
+) -> tuple[int, int]:
+    """(pool_size, max_overflow) of one worker, derived where not given"""
+    share = max(2, max_connections // max(1, workers))
+    if pool_size is None:
+        pool_size = share // 2
+    if max_overflow is None:
+        max_overflow = max(0, share - pool_size)
+    return pool_size, max_overflow
+
+
+class PoolTimings:
+    def __init__(self):
+        self.checkouts = 0
+        self.waiting = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.waits_over = dict.fromkeys(WAIT_BUCKETS_MS, 0)
+
+    def record(self, elapsed: float) -> None:
+        self.checkouts += 1
+        self.wait_total += elapsed
+        self.wait_max = max(self.wait_max, elapsed)
+        for bucket in WAIT_BUCKETS_MS:
+            if elapsed * 1000 >= bucket:
+                self.waits_over[bucket] += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "waiting": self.waiting,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": (
+                self.wait_total / self.checkouts * 1000 if self.checkouts else 0.0
+            ),
+            "wait_max_ms": self.wait_max * 1000,
+            **{
+                f"waits_over_{bucket}ms": count
+                for bucket, count in self.waits_over.items()
+            },
+        }
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """`AsyncAdaptedQueuePool` that records how long checkouts take"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timings = PoolTimings()
+
+    def recreate(self) -> "InstrumentedPool":
+        # engine.dispose() swaps in a new pool, keep counting where we were
+        pool = super().recreate()
+        pool.timings = self.timings
+        return pool
+
+    def _do_get(self):
+        self.timings.waiting += 1
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.timings.timeouts += 1
+            raise
+        finally:
+            self.timings.waiting -= 1
+        self.timings.record(time.perf_counter() - start)
+        return connection
+
+
+def pool_stats(engine: AsyncEngine) -> dict[str, Any]:
+    pool = engine.pool
+    stats = {
+        "pool_size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "in_use": pool.checkedout(),
+        "idle": pool.checkedin(),
+    }
+    if isinstance(pool, InstrumentedPool):
+        stats.update(pool.timings.stats())
+    return stats
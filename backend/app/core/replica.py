@@ -0,0 +1,150 @@
+"""
+Routing of read-only requests to a streaming replica.
+
+Endpoints that only read take `deps.get_read_session`, a `ReadSession` that
+opens on the replica when `REPLICA_DATABASE_HOSTNAME` is set. A user's reads
+stay on the primary for `READ_YOUR_WRITES_SECONDS` after one of their writes
+went through, so nobody misses their own change while the replica catches up.
+When the replica cannot be reached, reads fall back to the primary and stay
+there for `REPLICA_RETRY_SECONDS` before it is tried again.
+
+The routing, and the connection checkout with it, happen on the first
+statement: requests answered from a snapshot or with a 304, and requests still
+waiting in an admission gate, hold no connection from either pool.
+
+Process-wide caches and snapshots are shared by every reader, so they are only
+ever filled from the primary: a replica lagging behind would otherwise pin its
+stale rows for everybody until the next refresh. Endpoints serving them take a
+`deps.get_session` as well, which only connects when a refresh is due.
+
+Writes are noted per uvicorn worker, like the caches. A read landing on
+another worker within the window can still be served by the replica.
+"""
+
+import asyncio
+import time
+from collections.abc import Callable, Hashable
+from typing import Any, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core import config, metrics
+from app.core.cache import TTLCache
+from app.core.session import async_session, replica_session
+
+RECENT_WRITERS_MAXSIZE = 10000
+
+
+class ReadRouter:
+    def __init__(
+        self,
+        primary: async_sessionmaker,
+        replica: Optional[async_sessionmaker],
+        read_your_writes: float,
+        retry_after: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.retry_after = retry_after
+        self.clock = clock
+        # user id -> True while their reads must see their last write
+        self.recent_writers = TTLCache(
+            maxsize=RECENT_WRITERS_MAXSIZE if read_your_writes > 0 else 0,
+            ttl=read_your_writes,
+            timer=clock,
+        )
+        self.down_until = 0.0
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.fallbacks = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.replica is not None
+
+    def note_write(self, user_id: Hashable) -> None:
+        if self.enabled:
+            self.recent_writers.set(str(user_id), True)
+
+    def _use_replica(self, user_id: Hashable) -> bool:
+        return (
+            self.enabled
+            and self.clock() >= self.down_until
+            and self.recent_writers.get(str(user_id)) is None
+        )
+
+    async def open(self, user_id: Hashable) -> AsyncSession:
+        """A session for a read-only request of `user_id`, close it afterwards"""
+        if self._use_replica(user_id):
+            session = self.replica()
+            try:
+                # check out a connection now, failures surface here and not
+                # halfway through the endpoint
+                await session.connection()
+            except (exc.DBAPIError, exc.TimeoutError, OSError, asyncio.TimeoutError):
+                await session.close()
+                self.fallbacks += 1
+                self.down_until = self.clock() + self.retry_after
+            else:
+                self.replica_reads += 1
+                return session
+        self.primary_reads += 1
+        return self.primary()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "fallbacks": self.fallbacks,
+            "replica_down": self.clock() < self.down_until,
+            "recent_writers": len(self.recent_writers),
+        }
+
+
+read_router = ReadRouter(
+    primary=async_session,
+    replica=replica_session,
+    read_your_writes=config.settings.READ_YOUR_WRITES_SECONDS,
+    retry_after=config.settings.REPLICA_RETRY_SECONDS,
+)
+metrics.register("read_routing", read_router.stats)
+
+
+class ReadSession:
+    """Stands in for the `AsyncSession` of a read-only request of `user_id`
+
+    The session is opened through `router` on the first statement, falling
+    back to the primary as `ReadRouter.open` does. Close it afterwards.
+    """
+
+    def __init__(self, router: ReadRouter, user_id: Hashable):
+        self.router = router
+        self.user_id = user_id
+        self.session: Optional[AsyncSession] = None
+
+    async def _open(self) -> AsyncSession:
+        if self.session is None:
+            self.session = await self.router.open(self.user_id)
+        return self.session
+
+    async def execute(self, *args, **kwargs):
+        return await (await self._open()).execute(*args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return await (await self._open()).scalar(*args, **kwargs)
+
+    async def scalars(self, *args, **kwargs):
+        return await (await self._open()).scalars(*args, **kwargs)
+
+    async def stream(self, *args, **kwargs):
+        return await (await self._open()).stream(*args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return await (await self._open()).get(*args, **kwargs)
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
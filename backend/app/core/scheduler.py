@@ -0,0 +1,412 @@
+"""
+Venue and timeslot assignment for events that have no venue yet.
+
+The fest days are cut into a grid of equal slots. Every event is placed in one
+venue for a run of consecutive slots within a single day, so that
+
+- no venue hosts two events at the same time (hard),
+- the venue holds the expected attendance (hard),
+- as few participants as possible are registered for two events running at
+  the same time (minimized).
+
+Events already booked into a venue are kept where they are; they block their
+venue and count towards clashes. A greedy pass places the hardest events first,
+then local search relocates and swaps clashing events, and perturbations of
+the best solution found continue until the time budget is spent. Pure Python,
+no database access.
+"""
+
+import datetime
+import math
+import random
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class EventDemand:
+    id: str
+    duration: datetime.timedelta
+    attendees: frozenset[str] = frozenset()
+    attendance: int = 0  # defaults to the number of attendees
+
+    @property
+    def expected(self) -> int:
+        return max(self.attendance, len(self.attendees))
+
+
+@dataclass(frozen=True)
+class VenueSpec:
+    name: str
+    capacity: int
+
+
+@dataclass(frozen=True)
+class Booking:
+    """An event that already has a venue and a time"""
+
+    id: str
+    venue: str
+    start: datetime.datetime
+    end: datetime.datetime
+    attendees: frozenset[str] = frozenset()
+
+
+@dataclass(frozen=True)
+class Grid:
+    days: Sequence[datetime.date]
+    day_start: datetime.time = datetime.time(9)
+    day_end: datetime.time = datetime.time(18)
+    slot: datetime.timedelta = datetime.timedelta(minutes=30)
+
+    @property
+    def slots_per_day(self) -> int:
+        day = datetime.date.min
+        length = datetime.datetime.combine(
+            day, self.day_end
+        ) - datetime.datetime.combine(day, self.day_start)
+        return max(0, length // self.slot)
+
+    @property
+    def size(self) -> int:
+        return len(self.days) * self.slots_per_day
+
+    def start_of(self, index: int) -> datetime.datetime:
+        day, offset = divmod(index, self.slots_per_day)
+        return (
+            datetime.datetime.combine(self.days[day], self.day_start)
+            + offset * self.slot
+        )
+
+    def covering(
+        self, start: datetime.datetime, end: datetime.datetime
+    ) -> Iterable[tuple[int, int]]:
+        """Runs of slot indexes `[first, last)` that `[start, end)` touches"""
+        for day, date in enumerate(self.days):
+            opens = datetime.datetime.combine(date, self.day_start)
+            lo = max(start, opens)
+            hi = min(end, opens + self.slots_per_day * self.slot)
+            if lo < hi:
+                base = day * self.slots_per_day
+                yield (
+                    base + (lo - opens) // self.slot,
+                    base + math.ceil((hi - opens) / self.slot),
+                )
+
+
+@dataclass
+class Placement:
+    event_id: str
+    venue: str
+    start: datetime.datetime
+    end: datetime.datetime
+
+
+@dataclass
+class ScheduleResult:
+    placements: list[Placement] = field(default_factory=list)
+    # event id -> why it could not be placed
+    unassigned: dict[str, str] = field(default_factory=dict)
+    # participant double bookings, summed over every pair of overlapping events
+    clashes: int = 0
+    greedy_clashes: int = 0
+    clashing_pairs: int = 0
+    capacity_utilization: float = 0.0
+    moves: int = 0
+    restarts: int = 0
+    # False when the time budget ran out before reaching a local optimum
+    converged: bool = True
+    elapsed_ms: float = 0.0
+
+
+class _Problem:
+    def __init__(self, events, venues, grid, bookings):
+        self.events = list(events)
+        self.grid = grid
+        self.spd = grid.slots_per_day
+        self.venues = sorted(venues, key=lambda venue: (venue.capacity, venue.name))
+        self.venue_index = {venue.name: v for v, venue in enumerate(self.venues)}
+        self.lengths = [
+            max(1, math.ceil(event.duration / grid.slot)) for event in self.events
+        ]
+        # smallest adequate venue first
+        self.feasible = [
+            [
+                v
+                for v, venue in enumerate(self.venues)
+                if venue.capacity >= event.expected
+            ]
+            for event in self.events
+        ]
+        self.occupied = [bytearray(grid.size) for _ in self.venues]
+        self.at: list[tuple[int, int] | None] = [None] * len(self.events)
+
+        attending: defaultdict[str, list[int]] = defaultdict(list)
+        for i, event in enumerate(self.events):
+            for user in event.attendees:
+                attending[user].append(i)
+        self.neighbours: list[dict[int, int]] = [defaultdict(int) for _ in self.events]
+        for events_of_user in attending.values():
+            for a in events_of_user:
+                for b in events_of_user:
+                    if a != b:
+                        self.neighbours[a][b] += 1
+
+        # (first, last, shared attendees) of every booking clashing with event i
+        self.fixed: list[list[tuple[int, int, int]]] = [[] for _ in self.events]
+        for booking in bookings:
+            runs = list(grid.covering(booking.start, booking.end))
+            v = self.venue_index.get(booking.venue)
+            if v is not None:
+                for first, last in runs:
+                    self.occupied[v][first:last] = b"\x01" * (last - first)
+            shared: defaultdict[int, int] = defaultdict(int)
+            for user in booking.attendees:
+                for i in attending.get(user, ()):
+                    shared[i] += 1
+            for i, weight in shared.items():
+                self.fixed[i].extend((first, last, weight) for first, last in runs)
+
+    def penalties(self, i: int) -> list[int]:
+        """Clashes event i would cause, for every start slot"""
+        length, size = self.lengths[i], self.grid.size
+        diff = [0] * (size + 1)
+
+        def add(first, last, weight):
+            # starts t overlapping [first, last): t < last and t + length > first
+            lo = max(0, first - length + 1)
+            hi = min(size, last)
+            if lo < hi:
+                diff[lo] += weight
+                diff[hi] -= weight
+
+        for j, weight in self.neighbours[i].items():
+            if self.at[j] is not None:
+                start = self.at[j][1]
+                add(start, start + self.lengths[j], weight)
+        for first, last, weight in self.fixed[i]:
+            add(first, last, weight)
+
+        penalty, running = [0] * size, 0
+        for t in range(size):
+            running += diff[t]
+            penalty[t] = running
+        return penalty
+
+    def best(self, i: int) -> tuple[int, int, int] | None:
+        """Cheapest free (penalty, venue, start) for event i"""
+        length = self.lengths[i]
+        if length > self.spd or not self.feasible[i]:
+            return None
+        penalty = self.penalties(i)
+        starts = [t for t in range(self.grid.size) if t % self.spd + length <= self.spd]
+        starts.sort(key=lambda t: penalty[t])
+        for t in starts:
+            for v in self.feasible[i]:
+                if self.occupied[v].find(1, t, t + length) == -1:
+                    return penalty[t], v, t
+        return None
+
+    def place(self, i: int, v: int, t: int) -> None:
+        self.at[i] = (v, t)
+        self.occupied[v][t : t + self.lengths[i]] = b"\x01" * self.lengths[i]
+
+    def remove(self, i: int) -> tuple[int, int]:
+        v, t = self.at[i]
+        self.at[i] = None
+        self.occupied[v][t : t + self.lengths[i]] = bytes(self.lengths[i])
+        return v, t
+
+    def save(self):
+        return list(self.at), [bytearray(row) for row in self.occupied]
+
+    def restore(self, state) -> None:
+        at, occupied = state
+        self.at = list(at)
+        self.occupied = [bytearray(row) for row in occupied]
+
+    def cost(self, i: int) -> int:
+        return self.penalties(i)[self.at[i][1]]
+
+    def clashes(self) -> tuple[int, int]:
+        total = pairs = 0
+        for i, placed in enumerate(self.at):
+            if placed is None:
+                continue
+            start, end = placed[1], placed[1] + self.lengths[i]
+            for j, weight in self.neighbours[i].items():
+                if j > i and self.at[j] is not None:
+                    other = self.at[j][1]
+                    if other < end and start < other + self.lengths[j]:
+                        total += weight
+                        pairs += 1
+            for first, last, weight in self.fixed[i]:
+                if first < end and start < last:
+                    total += weight
+                    pairs += 1
+        return total, pairs
+
+
+def _swap(
+    problem: _Problem, order: list[int], deadline: float, timer
+) -> tuple[int, bool]:
+    """Exchange the slots of two equally long events if that lowers clashes"""
+    moves = 0
+    placed = [i for i in order if problem.at[i] is not None]
+    penalties = {i: problem.penalties(i) for i in placed}
+    by_length: defaultdict[int, list[int]] = defaultdict(list)
+    for i in placed:
+        by_length[problem.lengths[i]].append(i)
+    for i in sorted(placed, key=lambda i: -penalties[i][problem.at[i][1]]):
+        vi, ti = problem.at[i]
+        if penalties[i][ti] == 0:
+            break
+        if timer() >= deadline:
+            return moves, False
+        length = problem.lengths[i]
+        for j in by_length[length]:
+            vj, tj = problem.at[j]
+            if j == i or vi not in problem.feasible[j] or vj not in problem.feasible[i]:
+                continue
+            moves += 1
+            weight = problem.neighbours[i].get(j, 0)
+            overlap = weight if abs(ti - tj) < length else 0
+            before = penalties[i][ti] + penalties[j][tj] - overlap
+            # each penalty counts the other event at its old slot, i sits on
+            # j's old slot and j on i's after the swap
+            after = penalties[i][tj] + penalties[j][ti] - 2 * weight + overlap
+            if after < before:
+                problem.remove(i)
+                problem.remove(j)
+                problem.place(i, vj, tj)
+                problem.place(j, vi, ti)
+                return moves, True
+    return moves, False
+
+
+def _descend(
+    problem: _Problem, order: list[int], deadline: float, timer
+) -> tuple[int, bool]:
+    """Relocate or swap clashing events until no single move improves"""
+    moves = 0
+    while timer() < deadline:
+        improved = False
+        placed = [i for i in order if problem.at[i] is not None]
+        costs = {i: problem.cost(i) for i in placed}
+        for i in sorted(placed, key=lambda i: -costs[i]):
+            if costs[i] == 0 or timer() >= deadline:
+                break
+            current = problem.cost(i)
+            v, t = problem.remove(i)
+            best = problem.best(i)
+            moves += 1
+            if best is not None and best[0] < current:
+                problem.place(i, best[1], best[2])
+                improved = True
+            else:
+                problem.place(i, v, t)
+        # slots freed by moves may fit events placed nowhere so far
+        for i in order:
+            if problem.at[i] is None and timer() < deadline:
+                best = problem.best(i)
+                if best is not None:
+                    problem.place(i, best[1], best[2])
+                    improved = True
+        if not improved:
+            swaps, improved = _swap(problem, order, deadline, timer)
+            moves += swaps
+        if not improved:
+            return moves, timer() < deadline
+    return moves, False
+
+
+def schedule(
+    events: Iterable[EventDemand],
+    venues: Iterable[VenueSpec],
+    grid: Grid,
+    bookings: Iterable[Booking] = (),
+    time_budget: float = 1.0,
+    seed: int = 0,
+    timer: Callable[[], float] = time.monotonic,
+) -> ScheduleResult:
+    """Assign a venue and start time to every event that fits in `grid`
+
+    Greedy construction, local search to a local optimum, then perturbation
+    (reinsert a few clashing events in random order, descend again) keeping
+    the best solution found until `time_budget` seconds have passed.
+    """
+    started = timer()
+    deadline = started + time_budget
+    rng = random.Random(seed)
+    problem = _Problem(events, venues, grid, bookings)
+    result = ScheduleResult()
+
+    # greedy: the most constrained events first
+    order = sorted(
+        range(len(problem.events)),
+        key=lambda i: (
+            len(problem.feasible[i]),
+            -problem.lengths[i],
+            -sum(problem.neighbours[i].values()),
+        ),
+    )
+    for i in order:
+        best = problem.best(i)
+        if best is not None:
+            problem.place(i, best[1], best[2])
+    result.greedy_clashes, _ = problem.clashes()
+
+    def quality():
+        # placing an event matters more than any number of clashes
+        return problem.at.count(None), problem.clashes()[0]
+
+    result.moves, result.converged = _descend(problem, order, deadline, timer)
+    best_quality, best_state = quality(), problem.save()
+    while result.converged and timer() < deadline:
+        clashing = [
+            i for i in order if problem.at[i] is not None and problem.cost(i) > 0
+        ]
+        if not clashing:
+            break
+        kicked = rng.sample(clashing, max(1, len(clashing) // 10))
+        for i in kicked:
+            problem.remove(i)
+        rng.shuffle(kicked)
+        for i in kicked:
+            best = problem.best(i)
+            if best is not None:
+                problem.place(i, best[1], best[2])
+        moves, _ = _descend(problem, order, deadline, timer)
+        result.moves += moves
+        result.restarts += 1
+        if quality() < best_quality:
+            best_quality, best_state = quality(), problem.save()
+        else:
+            problem.restore(best_state)
+    problem.restore(best_state)
+
+    utilization = []
+    for i, event in enumerate(problem.events):
+        if problem.at[i] is None:
+            if problem.lengths[i] > problem.spd:
+                reason = "longer than a day of the grid"
+            elif not problem.feasible[i]:
+                reason = "no venue large enough"
+            else:
+                reason = "no free slot"
+            result.unassigned[event.id] = reason
+            continue
+        v, t = problem.at[i]
+        start = grid.start_of(t)
+        result.placements.append(
+            Placement(event.id, problem.venues[v].name, start, start + event.duration)
+        )
+        if problem.venues[v].capacity:
+            utilization.append(event.expected / problem.venues[v].capacity)
+    result.clashes, result.clashing_pairs = problem.clashes()
+    if utilization:
+        result.capacity_utilization = sum(utilization) / len(utilization)
+    result.elapsed_ms = (timer() - started) * 1000
+    return result
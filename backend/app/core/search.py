@@ -0,0 +1,118 @@
+"""
+In-process inverted index over the event catalog.
+
+Used by `/events/search` when `EVENT_SEARCH_BACKEND=memory`, for databases
+without `pg_trgm`. Every query term matches as a prefix, so the same index
+answers ranked search and as-you-type autocomplete. The index is immutable once
+built; writers build a new one and swap it in (see `app.core.snapshot`).
+"""
+
+import bisect
+import heapq
+import re
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Any
+
+# words split on anything but letters and digits, like the Postgres parser
+TOKEN = re.compile(r"[^\W_]+")
+
+# a hit in the name outranks one in the type, which outranks the description
+FIELD_WEIGHTS = {"name": 3.0, "type": 2.0, "desc": 1.0}
+EXACT_BONUS = 0.5
+
+# weighted tsvector of an event row; the GIN index ix_event_search_document is
+# built on exactly this expression
+POSTGRES_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(type, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(\"desc\", '')), 'C')"
+)
+
+
+def prefix_tsquery(query: str) -> str:
+    """`to_tsquery` input matching every term of `query` as a prefix"""
+    return " & ".join(f"{term}:*" for term in tokenize(query))
+
+
+def tokenize(text: str | None) -> list[str]:
+    return TOKEN.findall(text.lower()) if text else []
+
+
+class EventSearchIndex:
+    """Term -> {event id: weight} postings plus a sorted vocabulary.
+
+    `documents` are the rows returned by `search`, keyed by event id. Each row
+    needs `id`, `name`, `date` and the fields in `FIELD_WEIGHTS`.
+    """
+
+    def __init__(self, rows: Iterable[Any]):
+        self.documents: dict[str, Any] = {}
+        postings: defaultdict[str, dict[str, float]] = defaultdict(dict)
+        for row in rows:
+            self.documents[row.id] = row
+            for field, weight in FIELD_WEIGHTS.items():
+                for term in tokenize(getattr(row, field)):
+                    postings[term][row.id] = max(postings[term].get(row.id, 0), weight)
+        self.postings = dict(postings)
+        self.vocabulary = sorted(self.postings)
+        self.names = sorted(
+            (row.name.lower(), row.id) for row in self.documents.values()
+        )
+        # tie break of equal scores, earlier events first
+        self.order = {
+            row.id: position
+            for position, row in enumerate(
+                sorted(self.documents.values(), key=lambda row: (row.date, row.id))
+            )
+        }
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def _expand(self, prefix: str) -> list[str]:
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + "\U0010ffff", lo=start)
+        return self.vocabulary[start:end]
+
+    def _scores(self, term: str) -> dict[str, float]:
+        scores: dict[str, float] = {}
+        for word in self._expand(term):
+            bonus = EXACT_BONUS if word == term else 0.0
+            for event_id, weight in self.postings[word].items():
+                # shorter completions are closer to what was typed
+                score = weight * len(term) / len(word) + bonus
+                if score > scores.get(event_id, 0.0):
+                    scores[event_id] = score
+        return scores
+
+    def search(self, query: str, limit: int) -> list[tuple[Any, float]]:
+        """Events matching every term of `query`, best first"""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        # intersect starting from the rarest term
+        per_term = sorted((self._scores(term) for term in terms), key=len)
+        totals = per_term[0]
+        for scores in per_term[1:]:
+            totals = {
+                event_id: total + scores[event_id]
+                for event_id, total in totals.items()
+                if event_id in scores
+            }
+        order = self.order
+        best = heapq.nsmallest(
+            limit, totals.items(), key=lambda item: (-item[1], order[item[0]])
+        )
+        return [(self.documents[event_id], score) for event_id, score in best]
+
+    def suggest(self, prefix: str, limit: int) -> list[str]:
+        """Event names starting with `prefix`, alphabetically"""
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self.names, (prefix,))
+        names = []
+        for name, event_id in self.names[start : start + limit]:
+            if not name.startswith(prefix):
+                break
+            names.append(self.documents[event_id].name)
+        return names
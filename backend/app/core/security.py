@@ -1,15 +1,20 @@
 """Black-box security shortcuts to generate JWT tokens and password hashing and verifcation."""
 
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
 import jwt
 from passlib.context import CryptContext
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
-from app.core import config
-from app.schemas.responses import AccessTokenResponse
+from app.core import config, metrics
+from app.models import User
 
 JWT_ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_SECS = config.settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
 REFRESH_TOKEN_EXPIRE_SECS = config.settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60
+PAIR_ACCESS_TOKEN_EXPIRE_SECS = config.settings.PAIR_ACCESS_TOKEN_EXPIRE_MINUTES * 60
 PWD_CONTEXT = CryptContext(
     schemes=["bcrypt"],
     deprecated="auto",
@@ -18,28 +23,102 @@ PWD_CONTEXT = CryptContext(
 
 
 class JWTTokenPayload(BaseModel):
-    """Pydantic model for JWT token payload"""
-
-    token: str
-    
+    """Pydantic model for JWT token payload
 
+    Access tokens also carry the user's role, profile and token version so
+    requests can be authorized without reading the user table.
+    """
 
-def create_jwt_token(email: str, password: str):
+    sub: str
+    refresh: bool = False
+    issued_at: int = Field(alias="iat")
+    expires_at: int = Field(alias="exp")
+    version: int | None = Field(default=None, alias="ver")
+    role: str | None = None
+    email: str | None = None
+    name: str | None = None
+    phone: str | None = None
+    family: str | None = Field(default=None, alias="fam")
+    generation: int | None = Field(default=None, alias="gen")
+
+
+def create_jwt_token(
+    subject: str | int, exp_secs: int, refresh: bool, claims: dict | None = None
+) -> tuple[str, int, int]:
     """Creates jwt access or refresh token for user.
 
     Args:
         subject: anything unique to user, id or email etc.
         exp_secs: expire time in seconds
         refresh: if True, this is refresh token
+        claims: extra claims to embed in the token
+
+    Returns:
+        tuple of token, expires_at and issued_at (unix timestamps)
     """
 
-    to_encode: dict[str, str] = {"email": email, "password": password}
+    issued_at = int(time.time())
+    expires_at = issued_at + exp_secs
+
+    to_encode = {
+        **(claims or {}),
+        "sub": str(subject),
+        "refresh": refresh,
+        "iat": issued_at,
+        "exp": expires_at,
+    }
     encoded_jwt = jwt.encode(
         to_encode,
         key=config.settings.SECRET_KEY,
         algorithm=JWT_ALGORITHM,
     )
-    return encoded_jwt
+    return encoded_jwt, expires_at, issued_at
+
+
+def create_access_token(
+    user: User, exp_secs: int = ACCESS_TOKEN_EXPIRE_SECS
+) -> tuple[str, int, int]:
+    """Creates access token with the claims `deps.get_current_user` relies on"""
+    return create_jwt_token(
+        user.id,
+        exp_secs,
+        refresh=False,
+        claims={
+            "ver": user.token_version or 0,
+            "role": user.role,
+            "email": user.email,
+            "name": user.name,
+            "phone": user.phone if user.phone else "",
+        },
+    )
+
+
+def create_refresh_token(
+    user: User, family: str, generation: int
+) -> tuple[str, int, int]:
+    """Creates refresh token bound to a `RefreshSession` row and its generation"""
+    return create_jwt_token(
+        user.id,
+        REFRESH_TOKEN_EXPIRE_SECS,
+        refresh=True,
+        claims={"ver": user.token_version or 0, "fam": family, "gen": generation},
+    )
+
+
+def token_subject(authorization: str | None) -> str | None:
+    """User id of a valid access token in an `Authorization: Bearer` header"""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = jwt.decode(
+            token, config.settings.SECRET_KEY, algorithms=[JWT_ALGORITHM]
+        )
+    except jwt.PyJWTError:
+        return None
+    if payload.get("refresh") or "sub" not in payload:
+        return None
+    return str(payload["sub"])
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -58,3 +137,94 @@ def get_password_hash(password: str) -> str:
     It takes about 0.3s for default 12 rounds of SECURITY_BCRYPT_DEFAULT_ROUNDS.
     """
     return PWD_CONTEXT.hash(password)
+
+
+def _timed_call(func, *args):
+    """Runs in the worker, returns when the job left the queue with its result"""
+    return time.time(), func(*args)
+
+
+class PasswordHashingOverloaded(Exception):
+    """Raised when the password hashing queue is full"""
+
+
+class PasswordHasher:
+    """Async facade running bcrypt in a dedicated thread or process pool.
+
+    bcrypt takes hundreds of milliseconds, calling it from a handler stalls
+    the whole event loop. At most `workers + queue_size` jobs are accepted,
+    further calls raise `PasswordHashingOverloaded` instead of piling up.
+    """
+
+    def __init__(self, executor: str, workers: int, queue_size: int):
+        self.executor_kind = executor
+        self.workers = workers
+        self.queue_size = queue_size
+        self._executor: Executor | None = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hasher"
+                )
+        return self._executor
+
+    async def _submit(self, func, *args):
+        if self.pending >= self.workers + self.queue_size:
+            self.rejected += 1
+            raise PasswordHashingOverloaded()
+        self.pending += 1
+        submitted_at = time.time()
+        try:
+            started_at, result = await asyncio.get_running_loop().run_in_executor(
+                self.executor, _timed_call, func, *args
+            )
+        finally:
+            self.pending -= 1
+        wait = max(started_at - submitted_at, 0.0)
+        self.completed += 1
+        self.queue_wait_total += wait
+        self.queue_wait_max = max(self.queue_wait_max, wait)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(verify_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "executor": self.executor_kind,
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_wait_avg_ms": (
+                self.queue_wait_total / self.completed * 1000 if self.completed else 0.0
+            ),
+            "queue_wait_max_ms": self.queue_wait_max * 1000,
+        }
+
+
+password_hasher = PasswordHasher(
+    executor=config.settings.PASSWORD_HASH_EXECUTOR,
+    workers=config.settings.PASSWORD_HASH_WORKERS,
+    queue_size=config.settings.PASSWORD_HASH_QUEUE_SIZE,
+)
+metrics.register("password_hashing", password_hasher.stats)
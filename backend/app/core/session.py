@@ -4,15 +4,57 @@ SQLAlchemy async engine and sessions tools
 https://docs.sqlalchemy.org/en/20/orm/extensions/asyncio.html
 """
 
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from typing import Optional
 
-from app.core import config
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from app.core import config, metrics
+from app.core.pool import InstrumentedPool, pool_limits, pool_stats
 
 if config.settings.ENVIRONMENT == "PYTEST":
     sqlalchemy_database_uri = config.settings.TEST_SQLALCHEMY_DATABASE_URI
+    # tests create their tables on the primary only
+    replica_database_uri = None
 else:
     sqlalchemy_database_uri = config.settings.DEFAULT_SQLALCHEMY_DATABASE_URI
+    replica_database_uri = config.settings.REPLICA_SQLALCHEMY_DATABASE_URI
+
+pool_size, max_overflow = pool_limits(
+    config.settings.DATABASE_MAX_CONNECTIONS,
+    config.settings.WEB_CONCURRENCY,
+    config.settings.DATABASE_POOL_SIZE,
+    config.settings.DATABASE_MAX_OVERFLOW,
+)
+
 
+def make_engine(uri: str, **connect_args) -> AsyncEngine:
+    return create_async_engine(
+        uri,
+        poolclass=InstrumentedPool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=config.settings.DATABASE_POOL_TIMEOUT_SECONDS,
+        pool_recycle=config.settings.DATABASE_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=config.settings.DATABASE_POOL_PRE_PING,
+        connect_args={
+            # statements SQLAlchemy prepares per connection, and asyncpg's own cache
+            "prepared_statement_cache_size": config.settings.DATABASE_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": config.settings.DATABASE_STATEMENT_CACHE_SIZE,
+            **connect_args,
+        },
+    )
 
-async_engine = create_async_engine(sqlalchemy_database_uri, pool_pre_ping=True)
+
+async_engine = make_engine(sqlalchemy_database_uri)
 async_session = async_sessionmaker(async_engine, expire_on_commit=False)
+metrics.register("db_pool", lambda: pool_stats(async_engine))
+
+# read-only endpoints go through `app.core.replica.read_router`
+replica_engine: Optional[AsyncEngine] = None
+replica_session: Optional[async_sessionmaker] = None
+if replica_database_uri is not None:
+    replica_engine = make_engine(
+        replica_database_uri, timeout=config.settings.REPLICA_CONNECT_TIMEOUT_SECONDS
+    )
+    replica_session = async_sessionmaker(replica_engine, expire_on_commit=False)
+    metrics.register("db_pool_replica", lambda: pool_stats(replica_engine))
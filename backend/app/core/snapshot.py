@@ -0,0 +1,96 @@
+"""
+Read models rebuilt as a whole and swapped atomically.
+
+A `Snapshot` holds the result of an async builder together with a version
+counter. Writers call `refresh` after committing so the worker that handled
+the write serves fresh data immediately; other workers rebuild once `ttl`
+seconds have passed. A build that was already running when the snapshot was
+invalidated may have read the rows from before the write, its result is
+dropped instead of stored.
+"""
+
+import asyncio
+import hashlib
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag derived from content, identical in every worker"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+class Snapshot:
+    """Lazily built, atomically replaced value with a version number.
+
+    `ttl=0` disables the snapshot, `get` then returns None and callers are
+    expected to query the database directly.
+    """
+
+    def __init__(self, build: Callable[[AsyncSession], Awaitable[Any]], ttl: float):
+        self.build = build
+        self.ttl = ttl
+        self.value: Any = None
+        self.version = 0
+        self.built_at = 0.0
+        self.builds = 0
+        self.generation = 0  # bumped by `invalidate`
+        self._lock: asyncio.Lock | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def is_fresh(self) -> bool:
+        return self.value is not None and time.monotonic() - self.built_at < self.ttl
+
+    def invalidate(self) -> None:
+        self.value = None
+        self.generation += 1
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def get(self, session: AsyncSession) -> Any:
+        if not self.enabled:
+            return None
+        if self.is_fresh():
+            return self.value
+        async with self.lock:
+            # another request may have rebuilt it while we waited
+            if not self.is_fresh():
+                await self._rebuild(session)
+        return self.value
+
+    async def refresh(self, session: AsyncSession) -> None:
+        """Rebuild now, call after committing a write the snapshot depends on"""
+        self.invalidate()
+        if self.enabled:
+            async with self.lock:
+                await self._rebuild(session)
+
+    async def _rebuild(self, session: AsyncSession) -> None:
+        generation = self.generation
+        value = await self.build(session)
+        self.builds += 1
+        if generation != self.generation:
+            # invalidated while building, `value` may predate the write
+            return
+        self.value, self.built_at = value, time.monotonic()
+        self.version += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "version": self.version,
+            "builds": self.builds,
+            "age_seconds": time.monotonic() - self.built_at
+            if self.value is not None
+            else None,
+        }
@@ -6,31 +6,29 @@ By defualt `main` create a superuser if not exists
 """
 
 import asyncio
+import datetime
+import hashlib
+import uuid
 
-from sqlalchemy import select, insert, text
+from sqlalchemy import insert, select
+
+from app.core import allocation, config
+from app.core.security import get_password_hash
+from app.core.session import async_session
 from app.models import (
     Accomodation,
     Competition,
+    Event,
     Manage,
     Mess,
+    Participant,
     Prize,
     Sponsor,
     Sponsorship,
-    User,
     Student,
-    Participant,
-    Event,
+    User,
     Venue,
 )
-import uuid
-import hashlib
-import datetime
-
-from app.core import config, security
-from app.core.session import async_session
-from app.models import User
-from app.core.security import get_password_hash
-
 
 user_data = [
     {
@@ -403,23 +401,78 @@ events_data = [
 ]
 
 manage_data = [
-    {'id': 'U001', 'event_id': '1', 'position': 'Head', 'responsibility': 'Overlooks the event'},
-    {'id': 'U002', 'event_id': '1', 'position': 'Secretary', 'responsibility': 'Assists the guest lecturer in the event'},
-    {'id': 'U004', 'event_id': '1', 'position': 'Secretary', 'responsibility': 'Stage Management'},
-
-    {'id': 'U006', 'event_id': '2', 'position': 'Head', 'responsibility': 'Overlooks the event. Question Framing'},
-    {'id': 'U007', 'event_id': '2', 'position': 'Secretary', 'responsibility': 'Invigilation and crowd management'},
-
-    {'id': 'U006', 'event_id': '3', 'position': 'Head', 'responsibility': 'Overlooks the event. Question Framing'},
-    {'id': 'U007', 'event_id': '3', 'position': 'Secretary', 'responsibility': 'Invigilation and crowd management'},
-
-    {'id': 'U006', 'event_id': '4', 'position': 'Head', 'responsibility': 'Overlooks the event. Game Design'},
-    {'id': 'U007', 'event_id': '4', 'position': 'Secretary', 'responsibility': 'Invigilation and crowd management'},
-
-    {'id': 'U001', 'event_id': '5', 'position': 'Head', 'responsibility': 'Overlooks the event. Relations management'},
-    {'id': 'U002', 'event_id': '5', 'position': 'Secretary', 'responsibility': 'Assistance for the guest'},
-    {'id': 'U004', 'event_id': '5', 'position': 'Secretary', 'responsibility': 'Stage Management'},
-
+    {
+        "id": "U001",
+        "event_id": "1",
+        "position": "Head",
+        "responsibility": "Overlooks the event",
+    },
+    {
+        "id": "U002",
+        "event_id": "1",
+        "position": "Secretary",
+        "responsibility": "Assists the guest lecturer in the event",
+    },
+    {
+        "id": "U004",
+        "event_id": "1",
+        "position": "Secretary",
+        "responsibility": "Stage Management",
+    },
+    {
+        "id": "U006",
+        "event_id": "2",
+        "position": "Head",
+        "responsibility": "Overlooks the event. Question Framing",
+    },
+    {
+        "id": "U007",
+        "event_id": "2",
+        "position": "Secretary",
+        "responsibility": "Invigilation and crowd management",
+    },
+    {
+        "id": "U006",
+        "event_id": "3",
+        "position": "Head",
+        "responsibility": "Overlooks the event. Question Framing",
+    },
+    {
+        "id": "U007",
+        "event_id": "3",
+        "position": "Secretary",
+        "responsibility": "Invigilation and crowd management",
+    },
+    {
+        "id": "U006",
+        "event_id": "4",
+        "position": "Head",
+        "responsibility": "Overlooks the event. Game Design",
+    },
+    {
+        "id": "U007",
+        "event_id": "4",
+        "position": "Secretary",
+        "responsibility": "Invigilation and crowd management",
+    },
+    {
+        "id": "U001",
+        "event_id": "5",
+        "position": "Head",
+        "responsibility": "Overlooks the event. Relations management",
+    },
+    {
+        "id": "U002",
+        "event_id": "5",
+        "position": "Secretary",
+        "responsibility": "Assistance for the guest",
+    },
+    {
+        "id": "U004",
+        "event_id": "5",
+        "position": "Secretary",
+        "responsibility": "Stage Management",
+    },
 ]
 
 competitions_data = [
@@ -467,7 +520,7 @@ prizes_data = [
     {"event_id": "3", "position": 3, "amount": 10000, "winner_id": None},
     {"event_id": "4", "position": 1, "amount": 10000, "winner_id": None},
     {"event_id": "4", "position": 2, "amount": 7000, "winner_id": None},
-    {"event_id": "4", "position": 3, "amount": 5000, "winner_id": None}
+    {"event_id": "4", "position": 3, "amount": 5000, "winner_id": None},
 ]
 
 messes_data = [
@@ -548,107 +601,6 @@ async def populate_data(session):
             await session.execute(insert(Prize).values(prize))
 
 
-# ------------------------- Create Triggers -------------------------
-async def create_triggers(session):
-    async with session.begin():
-        await session.execute(text(
-            """
-            CREATE OR REPLACE FUNCTION reg_check()
-            RETURNS TRIGGER AS $$
-            DECLARE
-            acid UUID;
-            ac_avail INTEGER;
-            mid UUID;
-            m_avail INTEGER;
-            BEGIN
-            select id,capacity into acid,ac_avail from accomodation order by capacity desc limit 1;
-            select id,capacity into mid,m_avail from mess order by capacity desc limit 1;
-            IF (ac_avail = 0) THEN
-                acid = NULL;
-            END IF;
-
-            IF m_avail=0 THEN
-                mid = NULL;
-            END IF;
-
-            UPDATE accomodation SET capacity = capacity - 1 WHERE id = acid;
-            UPDATE mess SET capacity = capacity - 1 WHERE id = mid;
-            NEW.mess_id = mid;
-            NEW.accomodation_id = acid;
-            
-            RETURN NEW;
-            END;
-            $$ LANGUAGE plpgsql;
-
-            
-            """)
-        )
-        await session.execute(text(
-            """
-
-            CREATE TRIGGER reg_check_trigger
-            BEFORE INSERT ON participant
-            FOR EACH ROW
-            EXECUTE FUNCTION reg_check();
-            """)
-        )
-        await session.execute(text(
-            """
-
-            CREATE OR REPLACE FUNCTION stu_as_vol_check()
-            RETURNS TRIGGER AS $$
-            DECLARE
-            cnt INTEGER DEFAULT 0;
-            BEGIN
-            SELECT COUNT(user_id) INTO cnt
-            FROM registration
-            WHERE registration.user_id = NEW.id AND registration.event_id = NEW.event_id;
-            IF cnt <> 0 THEN
-                RAISE EXCEPTION 'Already registered as participant for this event';
-            END IF;
-            RETURN NEW;
-            END;
-            $$ LANGUAGE plpgsql;
-            """)
-        )
-        await session.execute(text(
-            """
-            CREATE TRIGGER stu_as_vol_trigger 
-            BEFORE INSERT ON volunteer
-            FOR EACH ROW
-            EXECUTE FUNCTION stu_as_vol_check();
-            """)
-        )
-        await session.execute(text(
-            """
-            CREATE OR REPLACE FUNCTION vol_as_par_check()
-            RETURNS TRIGGER AS $$
-            DECLARE 
-            cnt INTEGER DEFAULT 0;
-            BEGIN
-            SELECT COUNT(id) INTO cnt
-            FROM volunteer
-            WHERE volunteer.event_id = NEW.event_id and volunteer.id = NEW.user_id;
-            IF cnt <> 0 THEN
-                RAISE EXCEPTION 'Already registered as volunteer for this event';
-            END IF;
-            RETURN NEW;
-            END;
-            $$ LANGUAGE plpgsql;
-            """)
-        )
-        await session.execute(text(
-            """
-            --- VOLUNTEER IS NOT ALLOWED TO PARTICIPATE IN HIS EVENT 
-            CREATE TRIGGER vol_as_par_trigger
-            BEFORE INSERT ON registration
-            FOR EACH ROW
-            EXECUTE FUNCTION vol_as_par_check();
-
-            """)
-        )
-
-
 async def main() -> None:
     print("Start initial data")
     async with async_session() as session:
@@ -679,9 +631,10 @@ async def main() -> None:
     print("Initial data created")
 
     async with async_session() as session:
-        await create_triggers(session)
+        # seeded participants come with an accomodation and mess, book their slots
+        await allocation.rebalance(session)
         await session.commit()
-        print("Triggers created")
+        print("Accomodation and mess slots allocated")
 
 
 if __name__ == "__main__":
@@ -1,13 +1,29 @@
 """Main FastAPI app instance declaration."""
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import JSONResponse
 
 from app.api.api import api_router
-from app.core import config
+from app.api.endpoints import events
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.core import admission, config, replica, security
+from app.schemas.responses import QueueTicketResponse
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await events.registration_batcher.close()
+    security.password_hasher.shutdown()
+
 
 app = FastAPI(
+    lifespan=lifespan,
     title=config.settings.PROJECT_NAME,
     version=config.settings.VERSION,
     description=config.settings.DESCRIPTION,
@@ -16,6 +32,51 @@ app = FastAPI(
 )
 app.include_router(api_router)
 
+
+@app.exception_handler(security.PasswordHashingOverloaded)
+async def password_hashing_overloaded_handler(
+    request: Request, exc: security.PasswordHashingOverloaded
+):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Too many login attempts in progress, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(admission.AdmissionRejected)
+async def admission_rejected_handler(
+    request: Request, exc: admission.AdmissionRejected
+):
+    content = QueueTicketResponse(
+        detail="Too many requests in progress, retry with the queue ticket",
+        position=exc.position,
+        retry_after=exc.retry_after,
+        ticket=exc.ticket,
+    )
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=content.model_dump(),
+        headers={
+            "Retry-After": str(exc.retry_after),
+            admission.QUEUE_TICKET_HEADER: exc.ticket,
+        },
+    )
+
+
+if replica.read_router.enabled:
+
+    @app.middleware("http")
+    async def note_writes(request: Request, call_next):
+        """Keeps the reads of a user who just wrote on the primary for a while"""
+        response = await call_next(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            user_id = security.token_subject(request.headers.get("Authorization"))
+            if user_id is not None:
+                replica.read_router.note_write(user_id)
+        return response
+
+
 # Sets all CORS enabled origins
 app.add_middleware(
     CORSMiddleware,
@@ -23,6 +84,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, admission.QUEUE_TICKET_HEADER, "Retry-After"],
 )
 
 # # Guards against HTTP Host Header attacks
@@ -14,13 +14,27 @@ alembic revision --autogenerate -m "migration_name"
 alembic upgrade head
 """
 
+import datetime
 import uuid
-
-from sqlalchemy import String, Integer, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from typing import Optional
+
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    CheckConstraint,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    func,
+    text,
+)
+from sqlalchemy import event as sa_event
+from sqlalchemy.dialects.postgresql import UUID, ExcludeConstraint
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from typing_extensions import Annotated
-import datetime
+
+from app.core.search import POSTGRES_DOCUMENT
 
 MINI_STRING = 30
 MEDIUM_STRING = 120
@@ -46,6 +60,45 @@ class User(Base):
     )
     role: Mapped[str] = mapped_column(String(MINI_STRING), nullable=False)
     password: Mapped[str] = mapped_column(String(MEDIUM_STRING), nullable=False)
+    # bumped whenever issued tokens must stop working (password, role, profile change)
+    token_version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+
+
+class RefreshSession(Base):
+    """Rotation record of a refresh token family, one row per login"""
+
+    __tablename__ = "refresh_session"
+    id: Mapped[str] = mapped_column(
+        UUID(as_uuid=False), primary_key=True, default=lambda _: str(uuid.uuid4())
+    )
+    user_id: Mapped[str] = mapped_column(
+        ForeignKey("user.id", ondelete="CASCADE", onupdate="CASCADE"), index=True
+    )
+    # generation of the only refresh token of the family that may still be used
+    generation: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    expires_at: Mapped[datetime.datetime] = mapped_column(nullable=False)
+
+
+class IdempotencyRecord(Base):
+    """Stored outcome of a write sent with an `Idempotency-Key` header
+
+    A row without `status_code` is a request still in progress.
+    """
+
+    __tablename__ = "idempotency_key"
+    user_id: Mapped[str] = mapped_column(
+        ForeignKey("user.id", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True
+    )
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    status_code: Mapped[int] = mapped_column(Integer, nullable=True)
+    headers: Mapped[dict] = mapped_column(JSON, nullable=True)
+    body: Mapped[bytes] = mapped_column(LargeBinary, nullable=True)
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        nullable=False, default=datetime.datetime.now, index=True
+    )
 
 
 class Student(Base):
@@ -98,6 +151,60 @@ class Participant(Base):
     )
 
 
+class AccomodationSlot(Base):
+    """One bed of an accomodation, allocated while `participant_id` is set
+
+    `capacity` of the accomodation is the number of slots; participants
+    claim free slots with FOR UPDATE SKIP LOCKED, see `app.core.allocation`.
+    """
+
+    __tablename__ = "accomodation_slot"
+    accomodation_id: Mapped[str] = mapped_column(
+        ForeignKey("accomodation.id", ondelete="CASCADE", onupdate="CASCADE"),
+        primary_key=True,
+    )
+    slot: Mapped[int] = mapped_column(Integer, primary_key=True)
+    participant_id: Mapped[str] = mapped_column(
+        ForeignKey("participant.id", ondelete="SET NULL", onupdate="CASCADE"),
+        nullable=True,
+        unique=True,
+    )
+
+    # free slots in claim order, lowest slot number first across accomodations
+    __table_args__ = (
+        Index(
+            "ix_accomodation_slot_free",
+            "slot",
+            "accomodation_id",
+            postgresql_where=text("participant_id IS NULL"),
+        ),
+    )
+
+
+class MessSlot(Base):
+    """One seat of a mess, allocated while `participant_id` is set"""
+
+    __tablename__ = "mess_slot"
+    mess_id: Mapped[str] = mapped_column(
+        ForeignKey("mess.id", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True
+    )
+    slot: Mapped[int] = mapped_column(Integer, primary_key=True)
+    participant_id: Mapped[str] = mapped_column(
+        ForeignKey("participant.id", ondelete="SET NULL", onupdate="CASCADE"),
+        nullable=True,
+        unique=True,
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_mess_slot_free",
+            "slot",
+            "mess_id",
+            postgresql_where=text("participant_id IS NULL"),
+        ),
+    )
+
+
 class Venue(Base):
     __tablename__ = "venue"
     name: Mapped[str] = mapped_column(
@@ -117,13 +224,48 @@ class Event(Base):
     )
     type: Mapped[str] = mapped_column(String(MINI_STRING), nullable=False)
     desc: Mapped[str] = mapped_column(String(LONG_STRING))
-    date: Mapped[datetime.datetime] = mapped_column(nullable=False)
+    date: Mapped[datetime.datetime] = mapped_column(nullable=False, index=True)
     duration: Mapped[datetime.timedelta] = mapped_column(nullable=False)
-    venue: Mapped[str] = mapped_column(
+    venue: Mapped[Optional[str]] = mapped_column(
         ForeignKey("venue.name", ondelete="SET NULL", onupdate="SET NULL"),
         nullable=True,
     )
 
+    # keyset order of the event listing, with and without the common filters
+    __table_args__ = (
+        Index("ix_event_date_id", "date", "id"),
+        Index("ix_event_type_date_id", "type", "date", "id"),
+        Index("ix_event_venue_date_id", "venue", "date", "id"),
+        # full-text match of /events/search
+        Index(
+            "ix_event_search_document",
+            text(f"({POSTGRES_DOCUMENT})"),
+            postgresql_using="gin",
+        ),
+        # no two events may occupy a venue at the same time (needs btree_gist)
+        ExcludeConstraint(
+            ("venue", "="),
+            (text("tsrange(date, date + duration)"), "&&"),
+            name="ex_event_venue_overlap",
+            using="gist",
+        ),
+    )
+
+
+# case-insensitive name prefix search, `lower(name) LIKE 'abc%'`
+Index(
+    "ix_event_name_lower",
+    func.lower(Event.name).label("name_lower"),
+    postgresql_ops={"name_lower": "text_pattern_ops"},
+)
+# typo-tolerant name match of /events/search, `lower(name) % 'abc'` (needs pg_trgm)
+Index(
+    "ix_event_name_trgm",
+    func.lower(Event.name).label("name_trgm"),
+    postgresql_using="gin",
+    postgresql_ops={"name_trgm": "gin_trgm_ops"},
+)
+
 
 class Registration(Base):
     __tablename__ = "registration"
@@ -138,6 +280,46 @@ class Registration(Base):
     )
 
 
+class EventSeat(Base):
+    """Seats left for a capacity limited event, no row means no limit"""
+
+    __tablename__ = "event_seat"
+    event_id: Mapped[str] = mapped_column(
+        ForeignKey("event.id", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True
+    )
+    capacity: Mapped[int] = mapped_column(Integer, nullable=False)
+    remaining: Mapped[int] = mapped_column(Integer, nullable=False)
+    # last waitlist ticket handed out for this event
+    waitlist_tail: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0, server_default="0"
+    )
+
+    __table_args__ = (
+        CheckConstraint("remaining >= 0", name="ck_event_seat_remaining"),
+    )
+
+
+class Waitlist(Base):
+    """Registrants of a full event, promoted in ticket order as seats free up"""
+
+    __tablename__ = "waitlist"
+    event_id: Mapped[str] = mapped_column(
+        ForeignKey("event.id", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True
+    )
+    user_id: Mapped[str] = mapped_column(
+        ForeignKey("user.id", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True
+    )
+    ticket: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    reg_time: Mapped[datetime.datetime] = mapped_column(
+        nullable=False, default=datetime.datetime.now
+    )
+
+    # head of the queue and positions are index lookups
+    __table_args__ = (
+        Index("ix_waitlist_event_ticket", "event_id", "ticket", unique=True),
+    )
+
+
 class Volunteer(Base):
     __tablename__ = "volunteer"
     id: Mapped[str] = mapped_column(
@@ -148,6 +330,81 @@ class Volunteer(Base):
     )
 
 
+class EventRole(Base):
+    """The one role a user holds in an event, kept by triggers on
+    `registration` and `volunteer`
+
+    The primary key stops a user from both participating in and volunteering
+    for the same event, race-free and with a single index lookup per insert.
+    """
+
+    __tablename__ = "event_role"
+    event_id: Mapped[str] = mapped_column(
+        ForeignKey("event.id", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True
+    )
+    user_id: Mapped[str] = mapped_column(
+        ForeignKey("user.id", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True
+    )
+    role: Mapped[str] = mapped_column(String(MINI_STRING), nullable=False)
+
+
+# same statements as migration 2026101974_event_role, for schemas made by create_all
+EVENT_ROLE_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION claim_event_role() RETURNS TRIGGER AS $$
+    DECLARE
+        uid UUID;
+        held VARCHAR;
+    BEGIN
+        IF TG_TABLE_NAME = 'registration' THEN
+            uid := NEW.user_id;
+        ELSE
+            uid := NEW.id;
+        END IF;
+        -- waits for a concurrent claim of the same pair to commit or roll back
+        INSERT INTO event_role (event_id, user_id, role)
+        VALUES (NEW.event_id, uid, TG_ARGV[0])
+        ON CONFLICT DO NOTHING;
+        IF NOT FOUND THEN
+            SELECT role INTO held FROM event_role
+            WHERE event_id = NEW.event_id AND user_id = uid;
+            RAISE EXCEPTION 'Already registered as % for this event', held;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION release_event_role() RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_TABLE_NAME = 'registration' THEN
+            DELETE FROM event_role
+            WHERE event_id = OLD.event_id AND user_id = OLD.user_id;
+        ELSE
+            DELETE FROM event_role
+            WHERE event_id = OLD.event_id AND user_id = OLD.id;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "CREATE TRIGGER registration_claim_role AFTER INSERT ON registration "
+    "FOR EACH ROW EXECUTE FUNCTION claim_event_role('participant')",
+    "CREATE TRIGGER registration_release_role AFTER DELETE ON registration "
+    "FOR EACH ROW EXECUTE FUNCTION release_event_role()",
+    "CREATE TRIGGER volunteer_claim_role AFTER INSERT ON volunteer "
+    "FOR EACH ROW EXECUTE FUNCTION claim_event_role('volunteer')",
+    "CREATE TRIGGER volunteer_release_role AFTER DELETE ON volunteer "
+    "FOR EACH ROW EXECUTE FUNCTION release_event_role()",
+]
+
+
+@sa_event.listens_for(Base.metadata, "after_create")
+def create_event_role_triggers(target, connection, **kw):
+    for statement in EVENT_ROLE_DDL:
+        connection.execute(text(statement))
+
+
 class Manage(Base):
     __tablename__ = "manage"
     id: Mapped[str] = mapped_column(
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr, Field, validator
 import datetime
-from typing import List, Optional
+from typing import Optional
+
+from pydantic import BaseModel, EmailStr, Field
 
 
 class BaseRequest(BaseModel):
@@ -20,6 +21,7 @@ class UserCreateRequest(BaseRequest):
     name: str
     role: str
 
+
 class UserChangeRequest(BaseRequest):
     email: Optional[EmailStr] = None
     phone: Optional[str] = None
@@ -32,12 +34,16 @@ class UserLoginRequest(BaseRequest):
     password: str
 
 
+class RefreshTokenRequest(BaseRequest):
+    refresh_token: str
+
+
 class BaseUser(BaseModel):
     id: str
     email: EmailStr
     phone: str
     role: str
-    password: str
+    password: str = ""
     name: str
 
 
@@ -58,7 +64,7 @@ class EventCreateRequest(BaseRequest):
     desc: str
     date: datetime.datetime
     duration: datetime.timedelta
-    venue: str
+    venue: Optional[str] = None  # leave it to /events/auto-schedule
 
 
 class EventChangeRequest(BaseRequest):
@@ -70,11 +76,38 @@ class EventChangeRequest(BaseRequest):
     venue: Optional[str] = None
 
 
+class EventCapacityRequest(BaseRequest):
+    capacity: Optional[int] = Field(ge=0)
+
+
+class CancellationRequest(BaseRequest):
+    user_ids: list[str] = Field(min_length=1, max_length=5000)
+
+
+class AutoScheduleRequest(BaseRequest):
+    days: list[datetime.date] = Field(min_length=1, max_length=14)
+    day_start: datetime.time = datetime.time(9)
+    day_end: datetime.time = datetime.time(18)
+    slot_minutes: int = Field(default=30, ge=5, le=240)
+    time_budget_ms: int = Field(default=2000, ge=10, le=30000)
+    apply: bool = False
+
+
 # ----------------- Schedule -----------------
 class ScheduleRequest(BaseRequest):
     date: str
 
+
 # ----------------- Student -----------------
 # ----------------- Participant -----------------
 class ParticipantCreateRequest(BaseRequest):
     university: str
+
+
+class ParticipantImportItem(BaseRequest):
+    user_id: str
+    university: str
+
+
+class ParticipantImportRequest(BaseRequest):
+    participants: list[ParticipantImportItem] = Field(min_length=1, max_length=5000)
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, ConfigDict, EmailStr
-from typing import List
 import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, EmailStr
 
 
 class BaseResponse(BaseModel):
@@ -29,6 +30,7 @@ class UserMeResponse(BaseResponse):
     name: str
     role: str
 
+
 class UserAdminResponse(BaseResponse):
     id: str
     email: EmailStr
@@ -38,7 +40,7 @@ class UserAdminResponse(BaseResponse):
 
 
 class UserListResponse(BaseResponse):
-    users: List[UserAdminResponse]
+    users: list[UserAdminResponse]
 
 
 class UserRolerResponse(BaseResponse):
@@ -53,27 +55,121 @@ class EventSchema(BaseResponse):
     desc: str
     date: datetime.datetime
     duration: datetime.timedelta
-    venue: str
+    venue: Optional[str] = None  # None until the event is scheduled
 
 
 class EventListResponse(BaseResponse):
-    events: List[EventSchema]
+    events: list[EventSchema]
+
+
+class EventSummarySchema(BaseResponse):
+    id: str
+    name: str
+    type: str
+    date: datetime.datetime
+    duration: datetime.timedelta
+    venue: Optional[str] = None
+
+
+class EventSummaryListResponse(BaseResponse):
+    events: list[EventSummarySchema]
+
+
+class EventSearchResult(EventSummarySchema):
+    rank: float
+
+
+class VenueSlot(BaseResponse):
+    start: datetime.datetime
+    end: datetime.datetime
+    event: Optional[str] = None
+
+
+class VenueCalendarResponse(BaseResponse):
+    venue: str
+    busy: list[VenueSlot]
+    free: list[VenueSlot]
+
+
+class EventCapacityResponse(BaseResponse):
+    capacity: Optional[int]
+    remaining: Optional[int]
+    registered: int
+
+
+class WaitlistResponse(BaseResponse):
+    position: int
+
+
+class CancellationResponse(BaseResponse):
+    cancelled: int
+    promoted: int
+
+
+class QueueTicketResponse(BaseResponse):
+    detail: str
+    position: int
+    retry_after: int
+    ticket: str
+
+
+class QueuePositionResponse(BaseResponse):
+    position: int
+    retry_after: int
+
+
+class AutoScheduledEvent(BaseResponse):
+    event_id: str
+    name: str
+    venue: str
+    start: datetime.datetime
+    end: datetime.datetime
+
+
+class UnscheduledEvent(BaseResponse):
+    event_id: str
+    name: str
+    reason: str
+
+
+class AutoScheduleQuality(BaseResponse):
+    events: int
+    placed: int
+    clashes: int
+    greedy_clashes: int
+    clashing_pairs: int
+    capacity_utilization: float
+    moves: int
+    restarts: int
+    converged: bool
+    elapsed_ms: float
+
+
+class AutoScheduleResponse(BaseResponse):
+    applied: bool
+    placements: list[AutoScheduledEvent]
+    unassigned: list[UnscheduledEvent]
+    quality: AutoScheduleQuality
 
 
 class RegistrationResponse(BaseResponse):
     name: str
     email: EmailStr
 
+
 class WinnerResponse(BaseResponse):
     name: str
     position: int
     prize: str
 
+
 # ----------------- Schedule -----------------
 class ScheduleResponse(BaseResponse):
     name: str
     start_time: str
-    venue: str
+    end_time: str
+    venue: Optional[str] = None
+
 
 # ----------------- Student -----------------
 class StudentResponse(BaseResponse):
@@ -96,7 +192,30 @@ class ParticipantResponse(BaseResponse):
     accomodation: str
     mess: str
 
+
 class MiniParticipantResponse(BaseResponse):
     name: str
     email: EmailStr
-    university: str
\ No newline at end of file
+    university: str
+    accomodation: str
+    mess: str
+
+
+class ParticipantImportResponse(BaseResponse):
+    created: int
+    with_accomodation: int
+    with_mess: int
+
+
+class AllocationReport(BaseResponse):
+    added: int
+    removed: int
+    adopted: int
+    overbooked: int
+    allocated: int
+    free: int
+
+
+class RebalanceResponse(BaseResponse):
+    accomodation: AllocationReport
+    mess: AllocationReport
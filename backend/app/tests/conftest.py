@@ -4,10 +4,14 @@ from collections.abc import AsyncGenerator
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient
-from sqlalchemy import delete, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, event, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
+from app.api import deps
+from app.api.endpoints.events import catalog_snapshot, search_snapshot
+from app.api.endpoints.schedule import schedule_snapshot
 from app.core import config, security
+from app.core import session as db
 from app.core.session import async_engine, async_session
 from app.main import app
 from app.models import Base, User
@@ -36,6 +40,8 @@ async def test_db_setup_sessionmaker():
 
     # always drop and create test db tables between tests session
     async with async_engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
 
@@ -49,6 +55,9 @@ async def session(test_db_setup_sessionmaker) -> AsyncGenerator[AsyncSession, No
         for name, table in Base.metadata.tables.items():
             await session.execute(delete(table))
         await session.commit()
+        schedule_snapshot.invalidate()
+        catalog_snapshot.invalidate()
+        search_snapshot.invalidate()
 
 
 @pytest_asyncio.fixture(scope="session")
@@ -68,7 +77,9 @@ async def default_user(test_db_setup_sessionmaker) -> User:
         if user is None:
             new_user = User(
                 email=default_user_email,
-                hashed_password=default_user_password_hash,
+                password=default_user_password_hash,
+                name="geralt",
+                role="student",
             )
             new_user.id = default_user_id
             session.add(new_user)
@@ -81,3 +92,47 @@ async def default_user(test_db_setup_sessionmaker) -> User:
 @pytest.fixture
 def default_user_headers(default_user: User):
     return {"Authorization": f"Bearer {default_user_access_token}"}
+
+
+class QueryCounter:
+    """Counts statements sent to the database while active"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+@pytest.fixture
+def query_counter():
+    counter = QueryCounter()
+    event.listen(async_engine.sync_engine, "before_cursor_execute", counter)
+    yield counter
+    event.remove(async_engine.sync_engine, "before_cursor_execute", counter)
+
+
+@pytest_asyncio.fixture
+async def burst_pool() -> AsyncGenerator[None, None]:
+    """Serves requests from a pool of the usual size that waits up to a minute
+
+    The in-process client runs a burst of hundreds of requests on one CPU, so
+    the last ones queue for a connection longer than the default timeout even
+    though the pool never stalls. Same contention, more patience.
+    """
+    engine = create_async_engine(
+        db.sqlalchemy_database_uri,
+        pool_size=db.pool_size,
+        max_overflow=db.max_overflow,
+        pool_timeout=60,
+    )
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def get_session() -> AsyncGenerator[AsyncSession, None]:
+        async with sessionmaker() as session:
+            yield session
+
+    app.dependency_overrides[deps.get_session] = get_session
+    yield
+    del app.dependency_overrides[deps.get_session]
+    await engine.dispose()
@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from app.core.admission import AdmissionGate, AdmissionRejected, read_ticket
+
+
+async def test_admission_gate_admits_in_arrival_order():
+    gate = AdmissionGate("test-fifo", max_in_flight=1, max_wait=1)
+    admitted = []
+
+    async def request(name):
+        async with gate.admit():
+            admitted.append(name)
+            await asyncio.sleep(0.01)
+
+    first = asyncio.create_task(request("first"))
+    await asyncio.sleep(0)
+    waiting = [asyncio.create_task(request(i)) for i in range(5)]
+    await asyncio.gather(first, *waiting)
+
+    assert admitted == ["first", 0, 1, 2, 3, 4]
+    assert gate.stats()["queued"] == 5
+    assert (gate.in_flight, gate.waiting) == (0, 0)
+
+
+async def test_admission_gate_limits_each_key():
+    gate = AdmissionGate("test-keys", max_in_flight=3, max_in_flight_per_key=1)
+    release = asyncio.Event()
+    admitted = []
+
+    async def request(key):
+        async with gate.admit(key):
+            admitted.append(key)
+            await release.wait()
+
+    tasks = [asyncio.create_task(request(key)) for key in "aab"]
+    await asyncio.sleep(0.01)
+    # the second request for "a" waits, "b" passes it
+    assert admitted == ["a", "b"]
+    release.set()
+    await asyncio.gather(*tasks)
+    assert admitted == ["a", "b", "a"]
+
+
+async def test_admission_gate_rejects_with_a_ticket_keeping_the_place():
+    clock = iter(range(100)).__next__
+    gate = AdmissionGate("test-tickets", max_in_flight=1, max_wait=0.01, clock=clock)
+    slot = gate.admit("event")
+    await slot.__aenter__()
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        async with gate.admit("event"):
+            pass
+    ticket = rejected.value.ticket
+    assert rejected.value.position == 1
+    assert read_ticket(ticket).arrived_at == 1
+    # a ticket is bound to its gate and key
+    with pytest.raises(AdmissionRejected) as other:
+        async with gate.admit("other event", ticket=ticket):
+            pass
+    assert read_ticket(other.value.ticket).arrived_at == 2
+
+    gate.max_wait = 1
+    admitted = []
+
+    async def request(ticket=None):
+        async with gate.admit("event", ticket=ticket):
+            admitted.append(ticket)
+
+    newcomer = asyncio.create_task(request())
+    await asyncio.sleep(0)
+    returning = asyncio.create_task(request(ticket))
+    await asyncio.sleep(0)
+    assert gate.position(read_ticket(ticket).arrived_at) == 1
+    await slot.__aexit__(None, None, None)
+    await asyncio.gather(newcomer, returning)
+    assert admitted == [ticket, None]
+
+
+async def test_admission_gate_turns_away_when_the_line_is_full():
+    gate = AdmissionGate("test-full", max_in_flight=1, max_waiting=0)
+    async with gate.admit():
+        with pytest.raises(AdmissionRejected):
+            async with gate.admit():
+                pass
+    assert gate.stats()["rejected"] == 1
+
+
+async def test_admission_ticket_is_bound_to_its_holder_and_single_use():
+    clock = iter(range(100)).__next__
+    gate = AdmissionGate("test-holder", max_in_flight=1, max_wait=0.01, clock=clock)
+    slot = gate.admit("event")
+    await slot.__aenter__()
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        async with gate.admit("event", authorization="Bearer alice"):
+            pass
+    ticket = rejected.value.ticket
+    assert read_ticket(ticket).arrived_at == 1
+    assert "alice" not in str(read_ticket(ticket))
+
+    # somebody else's token does not get the place
+    with pytest.raises(AdmissionRejected) as stolen:
+        async with gate.admit("event", ticket=ticket, authorization="Bearer bob"):
+            pass
+    assert read_ticket(stolen.value.ticket).arrived_at == 2
+
+    # the holder does, and is turned away again with a fresh ticket for it
+    with pytest.raises(AdmissionRejected) as again:
+        async with gate.admit("event", ticket=ticket, authorization="Bearer alice"):
+            pass
+    renewed = again.value.ticket
+    assert read_ticket(renewed).arrived_at == 1
+    assert read_ticket(renewed).id != read_ticket(ticket).id
+
+    # the first ticket is spent
+    with pytest.raises(AdmissionRejected) as replayed:
+        async with gate.admit("event", ticket=ticket, authorization="Bearer alice"):
+            pass
+    assert read_ticket(replayed.value.ticket).arrived_at == 4
+
+    await slot.__aexit__(None, None, None)
+    async with gate.admit("event", ticket=renewed, authorization="Bearer alice"):
+        pass
+    assert gate.stats()["admitted"] == 2
@@ -62,3 +62,34 @@ async def test_auth_refresh_token(client: AsyncClient, default_user: User):
     assert "refresh_token" in token
     assert "refresh_token_expires_at" in token
     assert "refresh_token_issued_at" in token
+
+
+async def test_auth_refresh_token_reuse_revokes_family(
+    client: AsyncClient, default_user: User
+):
+    response = await client.post(
+        app.url_path_for("login_access_token"),
+        data={
+            "username": default_user_email,
+            "password": default_user_password,
+        },
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    refresh_token = response.json()["refresh_token"]
+
+    rotated = await client.post(
+        app.url_path_for("refresh_token"), json={"refresh_token": refresh_token}
+    )
+    assert rotated.status_code == codes.OK
+
+    reused = await client.post(
+        app.url_path_for("refresh_token"), json={"refresh_token": refresh_token}
+    )
+    assert reused.status_code == codes.UNAUTHORIZED
+
+    # the token handed out by the rotation belongs to the revoked family too
+    after_reuse = await client.post(
+        app.url_path_for("refresh_token"),
+        json={"refresh_token": rotated.json()["refresh_token"]},
+    )
+    assert after_reuse.status_code == codes.UNAUTHORIZED
@@ -0,0 +1,36 @@
+import asyncio
+
+from app.core.batching import MicroBatcher
+
+
+async def test_micro_batcher_groups_concurrent_items():
+    flushed = []
+
+    async def flush(items):
+        flushed.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(flush, max_size=4, max_delay=0.01)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+    await batcher.close()
+
+    assert results == [i * 2 for i in range(10)]
+    assert [len(batch) for batch in flushed] == [4, 4, 2]
+    assert batcher.stats()["largest_batch"] == 4
+
+
+async def test_micro_batcher_fails_the_whole_batch():
+    async def flush(items):
+        raise RuntimeError("database down")
+
+    batcher = MicroBatcher(flush, max_size=10, max_delay=0.01)
+    results = await asyncio.gather(
+        *(batcher.submit(i) for i in range(3)), return_exceptions=True
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    # the worker survives a failed batch
+    batcher.flush = lambda items: asyncio.sleep(0, result=list(items))
+    assert await batcher.submit("next") == "next"
+    await batcher.close()
+    assert batcher.stats()["failed_batches"] == 1
@@ -0,0 +1,76 @@
+import asyncio
+
+from app.core.cache import TTLCache
+from app.core.snapshot import Snapshot
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_hit_miss_and_expiry():
+    timer = FakeTimer()
+    cache = TTLCache(maxsize=10, ttl=5, timer=timer)
+    cache.set("token", "user")
+    assert cache.get("token") == "user"
+    assert cache.get("other") is None
+    timer.now = 5
+    assert cache.get("token") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+    assert cache.stats()["expirations"] == 1
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_evict_where_and_disabled():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("t1", "u1")
+    cache.set("t2", "u2")
+    assert cache.evict_where(lambda _, user: user == "u1") == 1
+    assert cache.get("t1") is None
+
+    disabled = TTLCache(maxsize=0, ttl=60)
+    disabled.set("t1", "u1")
+    assert len(disabled) == 0
+
+
+async def test_snapshot_refresh_wins_over_a_build_started_before_the_write():
+    rows = ["before"]
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def build(session):
+        seen = list(rows)
+        if not started.is_set():
+            # the first build read its rows, then stalls until after the write
+            started.set()
+            await release.wait()
+        return seen
+
+    snapshot = Snapshot(build, ttl=60)
+    reader = asyncio.create_task(snapshot.get(None))
+    await started.wait()
+
+    # the write commits, its handler refreshes while the reader still builds
+    rows[:] = ["after"]
+    writer = asyncio.create_task(snapshot.refresh(None))
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(reader, writer)
+
+    assert snapshot.value == ["after"]
+    assert snapshot.version == 1
+    assert await snapshot.get(None) == ["after"]
@@ -0,0 +1,852 @@
+import asyncio
+import datetime
+import json
+import uuid
+
+import pytest
+from httpx import AsyncClient, codes
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.endpoints.events import register_gate
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.core import config, security
+from app.core.admission import QUEUE_TICKET_HEADER
+from app.core.session import async_session
+from app.main import app
+from app.models import (
+    Event,
+    EventRole,
+    EventSeat,
+    Prize,
+    Registration,
+    User,
+    Venue,
+    Volunteer,
+    Waitlist,
+)
+
+
+async def create_event_with_registrants(session: AsyncSession, registrants: int):
+    admin = User(
+        id=str(uuid.uuid4()),
+        email="admin@example.com",
+        name="admin",
+        role="admin",
+        phone="0",
+        password="x",
+    )
+    session.add(admin)
+    session.add(Venue(name="Gymkhana", location="Near main building", capacity=20))
+    # no relationships order the inserts, flush each level before the next
+    await session.flush()
+    event = Event(
+        id=str(uuid.uuid4()),
+        name="Valorant",
+        type="competition",
+        desc="Valorant gaming competition",
+        date=datetime.datetime(2024, 4, 16, 19),
+        duration=datetime.timedelta(hours=1, minutes=30),
+        venue="Gymkhana",
+    )
+    session.add(event)
+    users = [
+        User(
+            id=str(uuid.uuid4()),
+            email=f"participant{i}@example.com",
+            name=f"participant{i}",
+            role="participant",
+            phone=str(1000 + i),
+            password="x",
+        )
+        for i in range(registrants)
+    ]
+    session.add_all(users)
+    await session.flush()
+    reg_time = datetime.datetime(2024, 4, 1)
+    for i, user in enumerate(users):
+        session.add(
+            Registration(
+                event_id=event.id,
+                user_id=user.id,
+                reg_time=reg_time + datetime.timedelta(minutes=i),
+            )
+        )
+    await session.commit()
+    token, _, _ = security.create_access_token(admin)
+    return event, {"Authorization": f"Bearer {token}"}
+
+
+async def test_list_registrations_query_count_is_constant(
+    client: AsyncClient, session: AsyncSession, query_counter
+):
+    event, headers = await create_event_with_registrants(session, 50)
+    url = app.url_path_for("list_registrations", event_id=event.id)
+    # warm up the token version cache
+    await client.get(url, headers=headers)
+
+    query_counter.count = 0
+    response = await client.get(url, headers=headers)
+    assert response.status_code == codes.OK
+    assert len(response.json()) == 50
+    assert query_counter.count == 1
+
+
+async def test_list_registrations_keyset_pagination(
+    client: AsyncClient, session: AsyncSession
+):
+    event, headers = await create_event_with_registrants(session, 5)
+    url = app.url_path_for("list_registrations", event_id=event.id)
+
+    names, cursor = [], None
+    while True:
+        params = {"limit": 2} | ({"cursor": cursor} if cursor else {})
+        response = await client.get(url, headers=headers, params=params)
+        assert response.status_code == codes.OK
+        names += [registration["name"] for registration in response.json()]
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+    assert names == [f"participant{i}" for i in range(5)]
+
+    streamed = await client.get(url, headers=headers, params={"stream": True})
+    assert [r["name"] for r in streamed.json()] == names
+
+
+async def test_export_registrations(client: AsyncClient, session: AsyncSession):
+    event, headers = await create_event_with_registrants(session, 3)
+    url = app.url_path_for("export_registrations", event_id=event.id)
+
+    response = await client.get(url, headers=headers, params={"format": "csv"})
+    assert response.status_code == codes.OK
+    lines = response.text.splitlines()
+    assert lines[0] == "name,email,phone,reg_time,university,roll,dept"
+    assert len(lines) == 4
+
+    response = await client.get(url, headers=headers, params={"format": "ndjson"})
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["name"] for row in rows] == [
+        "participant0",
+        "participant1",
+        "participant2",
+    ]
+    assert rows[0]["reg_time"] == "2024-04-01T00:00:00"
+
+
+async def test_list_winners_batch(
+    client: AsyncClient, session: AsyncSession, query_counter
+):
+    event, headers = await create_event_with_registrants(session, 2)
+    result = await session.execute(
+        select(User)
+        .join(Registration, Registration.user_id == User.id)
+        .where(Registration.event_id == event.id)
+    )
+    winner = result.scalars().first()
+    session.add_all(
+        [
+            Prize(event_id=event.id, position=2, amount=15000, winner_id=None),
+            Prize(event_id=event.id, position=1, amount=20000, winner_id=winner.id),
+        ]
+    )
+    await session.commit()
+
+    query_counter.count = 0
+    response = await client.get(
+        app.url_path_for("list_winners_batch"),
+        headers=headers,
+        params={"event_id": [event.id]},
+    )
+    assert response.status_code == codes.OK
+    assert response.json() == {
+        event.id: [
+            {"name": winner.name, "position": 1, "prize": "₹ 20,000"},
+            {"name": "Not declared", "position": 2, "prize": "₹ 15,000"},
+        ]
+    }
+    assert query_counter.count <= 2
+
+    # served from the cache until a prize row changes
+    query_counter.count = 0
+    response = await client.get(
+        app.url_path_for("list_winners", event_id=event.id), headers=headers
+    )
+    assert response.json()[0]["name"] == winner.name
+    assert query_counter.count == 0
+
+
+async def test_list_winners_not_refilled_between_flush_and_commit(
+    client: AsyncClient, session: AsyncSession
+):
+    event, headers = await create_event_with_registrants(session, 1)
+    winner = (
+        await session.execute(select(User).where(User.role == "participant"))
+    ).scalar_one()
+    prize = Prize(event_id=event.id, position=1, amount=20000, winner_id=None)
+    session.add(prize)
+    await session.commit()
+    url = app.url_path_for("list_winners", event_id=event.id)
+    response = await client.get(url, headers=headers)
+    assert response.json()[0]["name"] == "Not declared"
+
+    prize.winner_id = winner.id
+    await session.flush()
+    # a read from another session still sees the committed rows
+    response = await client.get(url, headers=headers)
+    assert response.json()[0]["name"] == "Not declared"
+    await session.commit()
+
+    response = await client.get(url, headers=headers)
+    assert response.json()[0]["name"] == "participant0"
+
+    # nothing to drop after a rollback
+    prize.winner_id = None
+    await session.flush()
+    await session.rollback()
+    assert "flushed_winners" not in session.info
+
+
+async def test_list_winners_after_winner_changes(
+    client: AsyncClient, session: AsyncSession
+):
+    event, headers = await create_event_with_registrants(session, 1)
+    winner = (
+        await session.execute(select(User).where(User.role == "participant"))
+    ).scalar_one()
+    session.add(Prize(event_id=event.id, position=1, amount=20000, winner_id=winner.id))
+    await session.commit()
+    url = app.url_path_for("list_winners", event_id=event.id)
+    batch_url = app.url_path_for("list_winners_batch")
+
+    response = await client.get(url, headers=headers)
+    assert response.json()[0]["name"] == "participant0"
+    await client.get(batch_url, headers=headers)
+
+    # Core statements, no Prize is flushed
+    response = await client.put(
+        app.url_path_for("update_user", id=winner.id),
+        headers=headers,
+        json={"name": "Renamed"},
+    )
+    assert response.status_code == codes.OK
+    response = await client.get(url, headers=headers)
+    assert response.json()[0]["name"] == "Renamed"
+    response = await client.get(batch_url, headers=headers)
+    assert response.json()[event.id][0]["name"] == "Renamed"
+
+    response = await client.delete(
+        app.url_path_for("delete_user", id=winner.id), headers=headers
+    )
+    assert response.status_code == codes.NO_CONTENT
+    response = await client.get(url, headers=headers)
+    assert response.json()[0]["name"] == "Not declared"
+
+    # the same event spelt differently shares the cache entry
+    response = await client.get(
+        app.url_path_for("list_winners", event_id=event.id.upper()), headers=headers
+    )
+    assert response.json()[0]["name"] == "Not declared"
+    response = await client.get(
+        app.url_path_for("list_winners", event_id="not-an-id"), headers=headers
+    )
+    assert response.status_code == codes.NOT_FOUND
+    response = await client.get(
+        batch_url, headers=headers, params={"event_id": [event.id, "not-an-id"]}
+    )
+    assert response.status_code == codes.NOT_FOUND
+
+
+async def test_list_events_conditional_get(
+    client: AsyncClient, session: AsyncSession, query_counter
+):
+    event, headers = await create_event_with_registrants(session, 0)
+    url = app.url_path_for("list_events")
+    response = await client.get(url, headers=headers)
+    assert response.status_code == codes.OK
+    assert [e["id"] for e in response.json()["events"]] == [event.id]
+    etag = response.headers["ETag"]
+
+    query_counter.count = 0
+    response = await client.get(url, headers=headers | {"If-None-Match": etag})
+    assert response.status_code == codes.NOT_MODIFIED
+    assert response.content == b""
+    assert query_counter.count == 0
+
+    response = await client.put(
+        app.url_path_for("update_event", id=event.id),
+        headers=headers,
+        json={"name": "Valorant Finals"},
+    )
+    assert response.status_code == codes.OK
+    response = await client.get(url, headers=headers | {"If-None-Match": etag})
+    assert response.status_code == codes.OK
+    assert response.headers["ETag"] != etag
+    assert response.json()["events"][0]["name"] == "Valorant Finals"
+
+
+async def test_list_events_filters_and_keyset_pagination(
+    client: AsyncClient, session: AsyncSession
+):
+    _, headers = await create_event_with_registrants(session, 0)
+    for i in range(4):
+        session.add(
+            Event(
+                id=str(uuid.uuid4()),
+                name=f"Quiz round {i}",
+                type="quiz",
+                desc="General quiz",
+                date=datetime.datetime(2024, 4, 15, 9 + i),
+                duration=datetime.timedelta(hours=1),
+                venue="Gymkhana",
+            )
+        )
+    await session.commit()
+    url = app.url_path_for("list_events")
+
+    response = await client.get(
+        url, headers=headers, params={"name": "QUIZ", "date_to": "2024-04-15T11:00"}
+    )
+    assert response.status_code == codes.OK
+    assert [e["name"] for e in response.json()["events"]] == [
+        "Quiz round 0",
+        "Quiz round 1",
+    ]
+
+    names, cursor = [], None
+    while True:
+        params = {"type": "quiz", "view": "summary", "limit": 3}
+        if cursor is not None:
+            params["cursor"] = cursor
+        response = await client.get(url, headers=headers, params=params)
+        assert response.status_code == codes.OK
+        events = response.json()["events"]
+        assert all("desc" not in event for event in events)
+        names += [event["name"] for event in events]
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+    assert names == [f"Quiz round {i}" for i in range(4)]
+
+
+async def test_search_events(client: AsyncClient, session: AsyncSession):
+    event, headers = await create_event_with_registrants(session, 0)
+    session.add(
+        Event(
+            id=str(uuid.uuid4()),
+            name="Robowars",
+            type="competition",
+            desc="Battle of bots, Valorant fans welcome",
+            date=datetime.datetime(2024, 4, 17, 10),
+            duration=datetime.timedelta(hours=2),
+            venue="Gymkhana",
+        )
+    )
+    await session.commit()
+
+    response = await client.get(
+        app.url_path_for("search_events"), headers=headers, params={"q": "valo"}
+    )
+    assert response.status_code == codes.OK
+    results = response.json()
+    assert [result["name"] for result in results] == ["Valorant", "Robowars"]
+    assert results[0]["rank"] > results[1]["rank"]
+    assert "desc" not in results[0]
+
+    response = await client.get(
+        app.url_path_for("suggest_events"), headers=headers, params={"q": "RO"}
+    )
+    assert response.json() == ["Robowars"]
+
+
+async def test_auto_schedule_events(client: AsyncClient, session: AsyncSession):
+    _, headers = await create_event_with_registrants(session, 0)
+    pending = [
+        Event(
+            id=str(uuid.uuid4()),
+            name=name,
+            type="workshop",
+            desc="",
+            date=datetime.datetime(2024, 4, 1),
+            duration=datetime.timedelta(hours=1),
+            venue=None,
+        )
+        for name in ("Origami", "Pottery")
+    ]
+    session.add_all(pending)
+    await session.commit()
+
+    response = await client.post(
+        app.url_path_for("auto_schedule_events"),
+        headers=headers,
+        json={
+            "days": ["2024-04-16"],
+            "day_start": "09:00",
+            "day_end": "11:00",
+            "slot_minutes": 60,
+            "time_budget_ms": 200,
+            "apply": True,
+        },
+    )
+    assert response.status_code == codes.OK
+    body = response.json()
+    assert body["quality"]["placed"] == 2
+    assert body["unassigned"] == []
+    assert sorted(p["start"] for p in body["placements"]) == [
+        "2024-04-16T09:00:00",
+        "2024-04-16T10:00:00",
+    ]
+
+    await session.rollback()
+    result = await session.execute(
+        select(Event.venue).where(Event.id.in_([event.id for event in pending]))
+    )
+    assert result.scalars().all() == ["Gymkhana", "Gymkhana"]
+    # placed events are limited to the venue, like created ones
+    result = await session.execute(
+        select(EventSeat.capacity).where(
+            EventSeat.event_id.in_([event.id for event in pending])
+        )
+    )
+    assert result.scalars().all() == [20, 20]
+
+    # moving to another venue takes its capacity along
+    session.add(Venue(name="Studio", location="", capacity=5))
+    await session.commit()
+    response = await client.put(
+        app.url_path_for("update_event", id=pending[0].id),
+        headers=headers,
+        json={"venue": "Studio", "date": "2024-04-17T09:00:00"},
+    )
+    assert response.status_code == codes.OK
+    capacity = await session.scalar(
+        select(EventSeat.capacity).where(EventSeat.event_id == pending[0].id)
+    )
+    assert capacity == 5
+
+
+async def test_unplaced_event_is_listed_and_scheduled(
+    client: AsyncClient, session: AsyncSession
+):
+    _, headers = await create_event_with_registrants(session, 0)
+    unplaced = []
+    for name in ("Origami", "Pottery", "Quilting"):
+        response = await client.post(
+            app.url_path_for("create_event"),
+            headers=headers,
+            json={
+                "id": str(uuid.uuid4()),
+                "name": name,
+                "type": "workshop",
+                "desc": "",
+                "date": "2024-04-16T09:00:00",
+                "duration": "PT1H",
+            },
+        )
+        assert response.status_code == codes.CREATED
+        assert response.json()["venue"] is None
+        unplaced.append(response.json()["id"])
+
+    response = await client.get(app.url_path_for("list_events"), headers=headers)
+    assert response.status_code == codes.OK
+    venues = {event["name"]: event["venue"] for event in response.json()["events"]}
+    assert venues["Origami"] is None
+    response = await client.get(
+        app.url_path_for("read_schedule", date="16-04-2024"), headers=headers
+    )
+    assert response.status_code == codes.OK
+    assert [entry["venue"] for entry in response.json()][:3] == [None] * 3
+
+    # two slots for three events, one stays unplaced
+    response = await client.post(
+        app.url_path_for("auto_schedule_events"),
+        headers=headers,
+        json={
+            "days": ["2024-04-16"],
+            "day_start": "09:00",
+            "day_end": "11:00",
+            "slot_minutes": 60,
+            "time_budget_ms": 200,
+            "apply": True,
+        },
+    )
+    assert response.status_code == codes.OK
+    assert len(response.json()["unassigned"]) == 1
+    response = await client.get(app.url_path_for("list_events"), headers=headers)
+    assert response.status_code == codes.OK
+    assert [event["venue"] for event in response.json()["events"]].count(None) == 1
+    response = await client.get(
+        app.url_path_for("read_schedule_dates"), headers=headers
+    )
+    assert response.status_code == codes.OK
+
+
+async def create_participants(
+    session: AsyncSession, count: int, prefix: str = "runner"
+) -> list[dict]:
+    users = [
+        User(
+            id=str(uuid.uuid4()),
+            email=f"{prefix}{i}@example.com",
+            name=f"{prefix}{i}",
+            role="participant",
+            phone=f"{prefix}-{i}",
+            password="x",
+        )
+        for i in range(count)
+    ]
+    session.add_all(users)
+    await session.commit()
+    return [
+        {"Authorization": f"Bearer {security.create_access_token(user)[0]}"}
+        for user in users
+    ]
+
+
+async def test_register_stops_at_capacity(client: AsyncClient, session: AsyncSession):
+    event, admin_headers = await create_event_with_registrants(session, 1)
+    response = await client.put(
+        app.url_path_for("update_event_capacity", id=event.id),
+        headers=admin_headers,
+        json={"capacity": 3},
+    )
+    assert response.json() == {"capacity": 3, "remaining": 2, "registered": 1}
+
+    url = app.url_path_for("read_students", event_id=event.id)
+    statuses = [
+        (await client.put(url, headers=headers)).status_code
+        for headers in await create_participants(session, 3)
+    ]
+    assert statuses == [codes.NO_CONTENT, codes.NO_CONTENT, codes.ACCEPTED]
+
+    response = await client.put(
+        app.url_path_for("update_event_capacity", id=event.id),
+        headers=admin_headers,
+        json={"capacity": None},
+    )
+    # lifting the limit lets the waitlisted participant in
+    assert response.json() == {"capacity": None, "remaining": None, "registered": 4}
+
+
+async def test_waitlist_across_lifted_and_reset_limits(
+    client: AsyncClient, session: AsyncSession
+):
+    event, admin_headers = await create_event_with_registrants(session, 1)
+    capacity_url = app.url_path_for("update_event_capacity", id=event.id)
+    url = app.url_path_for("read_students", event_id=event.id)
+    await client.put(capacity_url, headers=admin_headers, json={"capacity": 1})
+    first, second, helper = await create_participants(session, 3)
+    assert (await client.put(url, headers=first)).status_code == codes.ACCEPTED
+
+    # a volunteer of the event may not queue for it
+    helper_id = security.token_subject(helper["Authorization"])
+    session.add(Volunteer(id=helper_id, event_id=event.id))
+    await session.commit()
+    response = await client.put(url, headers=helper)
+    assert response.status_code == codes.NOT_ACCEPTABLE
+    # left behind by an older version, volunteers are never promoted
+    session.add(Waitlist(event_id=event.id, user_id=helper_id, ticket=7))
+    await session.commit()
+
+    response = await client.put(
+        capacity_url, headers=admin_headers, json={"capacity": None}
+    )
+    assert response.json()["registered"] == 2
+    waiting = await session.scalar(
+        select(func.count()).select_from(Waitlist).where(Waitlist.event_id == event.id)
+    )
+    assert waiting == 0
+
+    # a queue left over from before the limit, new tickets go after it
+    session.add(Waitlist(event_id=event.id, user_id=helper_id, ticket=7))
+    await session.commit()
+    await client.put(capacity_url, headers=admin_headers, json={"capacity": 2})
+    response = await client.put(url, headers=second)
+    assert response.status_code == codes.ACCEPTED
+    assert response.json() == {"position": 2}
+    ticket = await session.scalar(
+        select(Waitlist.ticket).where(
+            Waitlist.event_id == event.id,
+            Waitlist.user_id == security.token_subject(second["Authorization"]),
+        )
+    )
+    assert ticket == 8
+
+
+async def test_register_concurrently_never_oversells(
+    client: AsyncClient, session: AsyncSession
+):
+    event, admin_headers = await create_event_with_registrants(session, 0)
+    await client.put(
+        app.url_path_for("update_event_capacity", id=event.id),
+        headers=admin_headers,
+        json={"capacity": 10},
+    )
+    url = app.url_path_for("read_students", event_id=event.id)
+    participants = await create_participants(session, 100)
+
+    responses = await asyncio.gather(
+        *(client.put(url, headers=headers) for headers in participants)
+    )
+    statuses = [response.status_code for response in responses]
+    assert statuses.count(codes.NO_CONTENT) == 10
+    assert statuses.count(codes.ACCEPTED) == 90
+    positions = [
+        response.json()["position"]
+        for response in responses
+        if response.status_code == codes.ACCEPTED
+    ]
+    assert sorted(positions) == list(range(1, 91))
+
+    registered = await session.scalar(
+        select(func.count())
+        .select_from(Registration)
+        .where(Registration.event_id == event.id)
+    )
+    remaining = await session.scalar(
+        select(EventSeat.remaining).where(EventSeat.event_id == event.id)
+    )
+    assert (registered, remaining) == (10, 0)
+
+
+async def test_first_limit_set_during_registration_burst(
+    client: AsyncClient, session: AsyncSession
+):
+    event, admin_headers = await create_event_with_registrants(session, 0)
+    url = app.url_path_for("read_students", event_id=event.id)
+    participants = await create_participants(session, 60)
+
+    async def set_limit():
+        # let the burst get going while the event is still unlimited
+        await asyncio.sleep(0.02)
+        return await client.put(
+            app.url_path_for("update_event_capacity", id=event.id),
+            headers=admin_headers,
+            json={"capacity": 20},
+        )
+
+    limit, *responses = await asyncio.gather(
+        set_limit(), *(client.put(url, headers=headers) for headers in participants)
+    )
+    assert limit.status_code == codes.OK
+    statuses = [response.status_code for response in responses]
+    assert statuses.count(codes.NO_CONTENT) + statuses.count(codes.ACCEPTED) == 60
+
+    await session.rollback()
+    registered = await session.scalar(
+        select(func.count())
+        .select_from(Registration)
+        .where(Registration.event_id == event.id)
+    )
+    remaining = await session.scalar(
+        select(EventSeat.remaining).where(EventSeat.event_id == event.id)
+    )
+    # everybody registered before the limit counts against it
+    assert registered == statuses.count(codes.NO_CONTENT)
+    assert remaining == max(20 - registered, 0)
+    assert registered <= max(20, limit.json()["registered"])
+
+
+async def test_deregister_promotes_waitlist_in_order(
+    client: AsyncClient, session: AsyncSession
+):
+    event, admin_headers = await create_event_with_registrants(session, 0)
+    await client.put(
+        app.url_path_for("update_event_capacity", id=event.id),
+        headers=admin_headers,
+        json={"capacity": 2},
+    )
+    participants = await create_participants(session, 6)
+    register = app.url_path_for("read_students", event_id=event.id)
+    for headers in participants:
+        await client.put(register, headers=headers)
+
+    position = app.url_path_for("read_waitlist_position", event_id=event.id)
+    response = await client.get(position, headers=participants[3])
+    assert response.json() == {"position": 2}
+
+    # leaving the waitlist, then cancelling a seat promotes the next in line
+    response = await client.delete(register, headers=participants[2])
+    assert response.status_code == codes.NO_CONTENT
+    response = await client.delete(register, headers=participants[0])
+    assert response.status_code == codes.NO_CONTENT
+    response = await client.get(position, headers=participants[3])
+    assert response.status_code == codes.NOT_FOUND
+
+    result = await session.execute(
+        select(User.name)
+        .join(Registration, Registration.user_id == User.id)
+        .where(Registration.event_id == event.id)
+        .order_by(User.name)
+    )
+    assert result.scalars().all() == ["runner1", "runner3"]
+
+    # bulk cancellation promotes everyone left in one go
+    response = await client.post(
+        app.url_path_for("cancel_registrations", id=event.id),
+        headers=admin_headers,
+        json={"user_ids": [str(uuid.uuid4()), *await registered_ids(session, event)]},
+    )
+    assert response.json() == {"cancelled": 2, "promoted": 2}
+    assert (
+        await session.scalar(
+            select(EventSeat.remaining).where(EventSeat.event_id == event.id)
+        )
+        == 0
+    )
+
+
+async def registered_ids(session: AsyncSession, event: Event) -> list[str]:
+    result = await session.execute(
+        select(Registration.user_id).where(Registration.event_id == event.id)
+    )
+    return result.scalars().all()
+
+
+async def test_register_with_group_commit(
+    client: AsyncClient, session: AsyncSession, monkeypatch
+):
+    monkeypatch.setattr(config.settings, "REGISTRATION_BATCHING", True)
+    event, admin_headers = await create_event_with_registrants(session, 0)
+    url = app.url_path_for("read_students", event_id=event.id)
+    participants = await create_participants(session, 30)
+
+    responses = await asyncio.gather(
+        *(client.put(url, headers=headers) for headers in participants),
+        client.put(url, headers=participants[0]),
+    )
+    statuses = sorted(response.status_code for response in responses)
+    assert statuses == [codes.NO_CONTENT] * 30 + [codes.CONFLICT]
+    assert len(await registered_ids(session, event)) == 30
+
+    response = await client.put(
+        app.url_path_for("read_students", event_id=str(uuid.uuid4())),
+        headers=participants[0],
+    )
+    assert response.status_code == codes.NOT_FOUND
+
+    # limited events leave the batch for the seat counter and waitlist
+    await client.put(
+        app.url_path_for("update_event_capacity", id=event.id),
+        headers=admin_headers,
+        json={"capacity": 30},
+    )
+    (late,) = await create_participants(session, 1, prefix="late")
+    response = await client.put(url, headers=late)
+    assert response.status_code == codes.ACCEPTED
+
+
+async def test_register_overloaded_returns_queue_ticket(
+    client: AsyncClient, session: AsyncSession, monkeypatch
+):
+    event, _ = await create_event_with_registrants(session, 0)
+    (participant,) = await create_participants(session, 1)
+    url = app.url_path_for("read_students", event_id=event.id)
+    monkeypatch.setattr(register_gate, "max_wait", 0.01)
+    monkeypatch.setattr(register_gate, "max_in_flight_per_key", 1)
+
+    async with register_gate.admit(event.id):
+        response = await client.put(url, headers=participant)
+    assert response.status_code == codes.SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == str(response.json()["retry_after"])
+    ticket = response.headers[QUEUE_TICKET_HEADER]
+    assert response.json()["ticket"] == ticket
+
+    response = await client.get(app.url_path_for("read_queue_position", ticket=ticket))
+    assert response.status_code == codes.OK
+    assert response.json()["position"] == 1
+    response = await client.get(
+        app.url_path_for("read_queue_position", ticket="forged")
+    )
+    assert response.status_code == codes.NOT_FOUND
+
+    response = await client.put(
+        url, headers={**participant, QUEUE_TICKET_HEADER: ticket}
+    )
+    assert response.status_code == codes.NO_CONTENT
+
+
+async def test_register_idempotency_key_replays_retries(
+    client: AsyncClient, session: AsyncSession
+):
+    event, _ = await create_event_with_registrants(session, 0)
+    url = app.url_path_for("read_students", event_id=event.id)
+    (participant,) = await create_participants(session, 1)
+    headers = {**participant, "Idempotency-Key": str(uuid.uuid4())}
+
+    # a flaky client firing the same request several times at once
+    responses = await asyncio.gather(
+        *(client.put(url, headers=headers) for _ in range(5))
+    )
+    assert [response.status_code for response in responses] == [codes.NO_CONTENT] * 5
+    assert sum("Idempotent-Replayed" in response.headers for response in responses) == 4
+    assert len(await registered_ids(session, event)) == 1
+
+    # without the key the retry is a duplicate registration
+    response = await client.put(url, headers=participant)
+    assert response.status_code == codes.CONFLICT
+
+    other = Event(
+        id=str(uuid.uuid4()),
+        name="CS:GO",
+        type="competition",
+        desc="",
+        date=datetime.datetime(2024, 4, 17, 19),
+        duration=datetime.timedelta(hours=1),
+    )
+    session.add(other)
+    await session.commit()
+    response = await client.put(
+        app.url_path_for("read_students", event_id=other.id), headers=headers
+    )
+    assert response.status_code == codes.UNPROCESSABLE_ENTITY
+
+
+async def test_event_role_keeps_participants_and_volunteers_apart(
+    client: AsyncClient, session: AsyncSession
+):
+    event, _ = await create_event_with_registrants(session, 0)
+    url = app.url_path_for("read_students", event_id=event.id)
+    users = [
+        User(
+            id=str(uuid.uuid4()),
+            email=f"both{i}@example.com",
+            name=f"both{i}",
+            role="participant",
+            phone=f"both-{i}",
+            password="x",
+        )
+        for i in range(2)
+    ]
+    session.add_all(users)
+    await session.flush()
+    session.add(Volunteer(id=users[0].id, event_id=event.id))
+    await session.commit()
+    headers = {"Authorization": f"Bearer {security.create_access_token(users[0])[0]}"}
+
+    response = await client.put(url, headers=headers)
+    assert response.status_code == codes.NOT_ACCEPTABLE
+
+    # stepping down as volunteer frees the role
+    await session.execute(delete(Volunteer).where(Volunteer.id == users[0].id))
+    await session.commit()
+    response = await client.put(url, headers=headers)
+    assert response.status_code == codes.NO_CONTENT
+    role = await session.scalar(
+        select(EventRole.role).where(
+            EventRole.event_id == event.id, EventRole.user_id == users[0].id
+        )
+    )
+    assert role == "participant"
+
+    # two uncommitted claims of the same pair: the second waits, then fails
+    async with async_session() as first, async_session() as second:
+        first.add(Registration(event_id=event.id, user_id=users[1].id))
+        await first.flush()
+        second.add(Volunteer(id=users[1].id, event_id=event.id))
+        volunteering = asyncio.create_task(second.flush())
+        await asyncio.sleep(0.1)
+        assert not volunteering.done()
+        await first.commit()
+        with pytest.raises(DBAPIError, match="Already registered as participant"):
+            await volunteering
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException, Request, Response
+
+from app.api.idempotency import REPLAYED_HEADER, IdempotencyStore
+
+
+def make_request(path: str, body: bytes = b"") -> Request:
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    scope = {"type": "http", "method": "PUT", "path": path, "headers": []}
+    return Request(scope, receive)
+
+
+async def test_idempotency_store_runs_duplicate_keys_in_flight_once():
+    store = IdempotencyStore(backend="memory", maxsize=100, ttl=60)
+    writes = []
+
+    async def write():
+        writes.append(1)
+        await asyncio.sleep(0.01)
+        return Response(status_code=204)
+
+    responses = await asyncio.gather(
+        *(
+            store.run(make_request("/events/register/1"), "user", "key", write)
+            for _ in range(10)
+        )
+    )
+    assert len(writes) == 1
+    assert {response.status_code for response in responses} == {204}
+    assert sum(REPLAYED_HEADER in response.headers for response in responses) == 9
+    assert store.stats()["in_flight"] == 0
+
+    # keys are per user
+    await store.run(make_request("/events/register/1"), "other user", "key", write)
+    assert len(writes) == 2
+
+
+async def test_idempotency_store_replays_errors_but_not_retryable_ones():
+    store = IdempotencyStore(backend="memory", maxsize=100, ttl=60)
+
+    async def conflict():
+        raise HTTPException(status_code=409, detail="Already registered")
+
+    async def busy():
+        raise HTTPException(
+            status_code=409, detail="Try again", headers={"Retry-After": "1"}
+        )
+
+    first = await store.run(make_request("/a"), "user", "conflict", conflict)
+    replay = await store.run(make_request("/a"), "user", "conflict", busy)
+    assert (first.status_code, replay.status_code) == (409, 409)
+    assert replay.body == first.body == b'{"detail":"Already registered"}'
+
+    await store.run(make_request("/a"), "user", "busy", busy)
+    retry = await store.run(make_request("/a"), "user", "busy", conflict)
+    assert REPLAYED_HEADER not in retry.headers
+
+    # the same key for another request is refused
+    with pytest.raises(HTTPException) as reused:
+        await store.run(make_request("/b"), "user", "conflict", conflict)
+    assert reused.value.status_code == 422
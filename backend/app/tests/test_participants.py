@@ -0,0 +1,232 @@
+import asyncio
+import collections
+import datetime
+import uuid
+
+from httpx import AsyncClient, codes
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import allocation, security
+from app.main import app
+from app.models import (
+    Accomodation,
+    AccomodationSlot,
+    Event,
+    Mess,
+    MessSlot,
+    Participant,
+    Registration,
+    User,
+)
+
+
+async def test_list_participants_joins_in_one_query(
+    client: AsyncClient, session: AsyncSession, query_counter
+):
+    admin = User(
+        id=str(uuid.uuid4()),
+        email="admin@example.com",
+        name="admin",
+        role="admin",
+        phone="0",
+        password="x",
+    )
+    hostel = Accomodation(
+        id=str(uuid.uuid4()), name="Accomodation1", location="VS Hall", capacity=30
+    )
+    mess = Mess(id=str(uuid.uuid4()), name="Mess1", location="Takshashila", capacity=20)
+    event = Event(
+        id=str(uuid.uuid4()),
+        name="Overnite",
+        type="competition",
+        desc="Competitive Programming Competition held by codeclub",
+        date=datetime.datetime(2024, 4, 15, 20),
+        duration=datetime.timedelta(hours=20),
+    )
+    session.add_all([admin, hostel, mess, event])
+    await session.flush()
+    for i, university in enumerate(["IIT Delhi", "IIT Bombay", "IIT Delhi"]):
+        user = User(
+            id=str(uuid.uuid4()),
+            email=f"participant{i}@example.com",
+            name=f"participant{i}",
+            role="participant",
+            phone=str(1000 + i),
+            password="x",
+        )
+        session.add(user)
+        await session.flush()
+        session.add(
+            Participant(
+                id=user.id,
+                university=university,
+                accomodation_id=hostel.id,
+                mess_id=mess.id,
+            )
+        )
+        session.add(Registration(event_id=event.id, user_id=user.id))
+    await session.commit()
+
+    token, _, _ = security.create_access_token(admin)
+    headers = {"Authorization": f"Bearer {token}"}
+    url = app.url_path_for("list_participants", event_id=event.id)
+    await client.get(url, headers=headers)
+
+    query_counter.count = 0
+    response = await client.get(
+        url, headers=headers, params={"university": "IIT Delhi"}
+    )
+    assert response.status_code == codes.OK
+    assert query_counter.count == 1
+    participants = response.json()
+    assert [p["name"] for p in participants] == ["participant0", "participant2"]
+    assert participants[0]["accomodation"] == "Accomodation1"
+    assert participants[0]["mess"] == "Mess1"
+
+
+async def create_users(session: AsyncSession, count: int, role: str) -> list[dict]:
+    users = [
+        dict(
+            id=str(uuid.uuid4()),
+            email=f"{role}{i}@example.com",
+            name=f"{role}{i}",
+            role=role,
+            phone=f"{role}-{i}",
+            password="x",
+        )
+        for i in range(count)
+    ]
+    await session.execute(insert(User), users)
+    await session.commit()
+    return users
+
+
+def auth_headers(user: dict) -> dict:
+    token, _, _ = security.create_access_token(User(**user))
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def test_create_participants_concurrently_never_over_allocates(
+    client: AsyncClient, session: AsyncSession, burst_pool
+):
+    session.add_all(
+        [
+            Accomodation(
+                id=str(uuid.uuid4()), name=f"Hall{i}", location="", capacity=100
+            )
+            for i in range(3)
+        ]
+        + [
+            Mess(id=str(uuid.uuid4()), name=f"Mess{i}", location="", capacity=200)
+            for i in range(2)
+        ]
+    )
+    await session.commit()
+    report = await allocation.rebalance(session)
+    await session.commit()
+    assert report["accomodation"]["added"] == 300
+    assert report["mess"]["added"] == 400
+    result = await session.execute(
+        select(AccomodationSlot.accomodation_id, func.count()).group_by(
+            AccomodationSlot.accomodation_id
+        )
+    )
+    assert sorted(count for _, count in result.all()) == [100, 100, 100]
+    users = await create_users(session, 500, "participant")
+
+    url = app.url_path_for("create_participant")
+    responses = await asyncio.gather(
+        *(
+            client.post(
+                url, headers=auth_headers(user), json={"university": "IIT Delhi"}
+            )
+            for user in users
+        )
+    )
+    assert {response.status_code for response in responses} == {codes.CREATED}
+    beds = collections.Counter(
+        response.json()["accomodation"] for response in responses
+    )
+    assert beds == {"Hall0": 100, "Hall1": 100, "Hall2": 100, "No accomodation": 200}
+    seats = collections.Counter(response.json()["mess"] for response in responses)
+    assert seats == {"Mess0": 200, "Mess1": 200, "No mess": 100}
+
+    # the participant rows agree with the ledgers
+    result = await session.execute(
+        select(Participant.accomodation_id, func.count()).group_by(
+            Participant.accomodation_id
+        )
+    )
+    assert sorted(count for _, count in result.tuples()) == [100, 100, 100, 200]
+    held = await session.scalar(
+        select(func.count())
+        .select_from(AccomodationSlot)
+        .join(Participant, Participant.id == AccomodationSlot.participant_id)
+        .where(Participant.accomodation_id == AccomodationSlot.accomodation_id)
+    )
+    assert held == 300
+    held = await session.scalar(
+        select(func.count())
+        .select_from(MessSlot)
+        .where(MessSlot.participant_id.is_not(None))
+    )
+    assert held == 400
+
+
+async def test_import_and_rebalance_participants(
+    client: AsyncClient, session: AsyncSession
+):
+    (admin,) = await create_users(session, 1, "admin")
+    users = await create_users(session, 4, "participant")
+    hostel = Accomodation(id=str(uuid.uuid4()), name="Hall", location="", capacity=2)
+    mess = Mess(id=str(uuid.uuid4()), name="Mess", location="", capacity=1)
+    session.add_all([hostel, mess])
+    await session.commit()
+    headers = auth_headers(admin)
+
+    response = await client.post(
+        app.url_path_for("rebalance_allocations"), headers=headers
+    )
+    assert response.json()["accomodation"]["added"] == 2
+    assert response.json()["mess"]["free"] == 1
+
+    payload = {
+        "participants": [
+            {"user_id": user["id"], "university": "IIT Madras"} for user in users[:3]
+        ]
+    }
+    url = app.url_path_for("import_participants")
+    response = await client.post(url, headers=headers, json=payload)
+    assert response.status_code == codes.CREATED
+    assert response.json() == {"created": 3, "with_accomodation": 2, "with_mess": 1}
+    response = await client.post(url, headers=headers, json=payload)
+    assert response.json()["created"] == 0
+
+    # a participant put into the hall by hand, and one more bed
+    session.add(
+        Participant(
+            id=users[3]["id"], university="IIT Madras", accomodation_id=hostel.id
+        )
+    )
+    await session.execute(
+        update(Accomodation).where(Accomodation.id == hostel.id).values(capacity=3)
+    )
+    await session.commit()
+    response = await client.post(
+        app.url_path_for("rebalance_allocations"), headers=headers
+    )
+    assert response.json()["accomodation"] == {
+        "added": 1,
+        "removed": 0,
+        "adopted": 1,
+        "overbooked": 0,
+        "allocated": 0,
+        "free": 0,
+    }
+    assert response.json()["mess"]["allocated"] == 0
+
+    response = await client.post(
+        app.url_path_for("rebalance_allocations"), headers=auth_headers(users[0])
+    )
+    assert response.status_code == codes.UNAUTHORIZED
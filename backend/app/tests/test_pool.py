@@ -0,0 +1,35 @@
+from app.core.pool import InstrumentedPool, pool_limits
+
+
+class FakeConnection:
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_pool_limits_split_the_budget_between_workers():
+    assert pool_limits(90, 2) == (22, 23)
+    assert pool_limits(90, 4) == (11, 11)
+    assert pool_limits(90, 2, pool_size=10) == (10, 35)
+    assert pool_limits(90, 2, pool_size=10, max_overflow=0) == (10, 0)
+    # never below one connection and one overflow
+    assert pool_limits(4, 8) == (1, 1)
+
+
+def test_instrumented_pool_counts_checkouts_and_gauges():
+    pool = InstrumentedPool(FakeConnection, pool_size=2, max_overflow=1)
+    connections = [pool.connect() for _ in range(3)]
+    assert (pool.checkedout(), pool.checkedin(), pool.overflow()) == (3, 0, 1)
+
+    for connection in connections:
+        connection.close()
+    stats = pool.timings.stats()
+    assert stats["checkouts"] == 3
+    assert stats["waiting"] == 0
+    assert stats["timeouts"] == 0
+    assert (pool.checkedout(), pool.checkedin()) == (0, 2)
+
+    # dispose() replaces the pool, the counters carry over
+    assert pool.recreate().timings.stats()["checkouts"] == 3
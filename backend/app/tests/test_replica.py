@@ -0,0 +1,114 @@
+from app.core.replica import ReadRouter, ReadSession
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSession:
+    def __init__(self, name, reachable=True):
+        self.name = name
+        self.reachable = reachable
+        self.closed = False
+
+    async def connection(self):
+        if not self.reachable:
+            raise ConnectionRefusedError("replica down")
+
+    async def execute(self, statement):
+        return self.name
+
+    async def scalar(self, statement):
+        return self.name
+
+    async def close(self):
+        self.closed = True
+
+
+def sessionmaker(name, reachable=True):
+    return lambda: FakeSession(name, reachable)
+
+
+async def test_read_router_keeps_writers_on_the_primary():
+    clock = FakeClock()
+    router = ReadRouter(
+        sessionmaker("primary"),
+        sessionmaker("replica"),
+        read_your_writes=5,
+        retry_after=10,
+        clock=clock,
+    )
+    assert (await router.open("alice")).name == "replica"
+
+    router.note_write("alice")
+    assert (await router.open("alice")).name == "primary"
+    assert (await router.open("bob")).name == "replica"
+
+    clock.now = 5
+    assert (await router.open("alice")).name == "replica"
+    assert router.stats()["replica_reads"] == 3
+
+
+async def test_read_router_falls_back_while_the_replica_is_down():
+    clock = FakeClock()
+    router = ReadRouter(
+        sessionmaker("primary"),
+        sessionmaker("replica", reachable=False),
+        read_your_writes=5,
+        retry_after=10,
+        clock=clock,
+    )
+    assert (await router.open("alice")).name == "primary"
+    assert router.stats()["replica_down"]
+
+    # not retried before retry_after has passed
+    router.replica = sessionmaker("replica")
+    clock.now = 9
+    assert (await router.open("alice")).name == "primary"
+    clock.now = 10
+    assert (await router.open("alice")).name == "replica"
+    assert router.stats()["fallbacks"] == 1
+
+    # without a replica everything reads from the primary
+    router = ReadRouter(
+        sessionmaker("primary"), None, read_your_writes=5, retry_after=10
+    )
+    assert (await router.open("alice")).name == "primary"
+
+
+async def test_read_session_routes_on_its_first_statement():
+    clock = FakeClock()
+    opened = []
+
+    def sessionmaker(name, reachable=True):
+        def make():
+            session = FakeSession(name, reachable)
+            opened.append(session)
+            return session
+
+        return make
+
+    router = ReadRouter(
+        sessionmaker("primary"),
+        sessionmaker("replica", reachable=False),
+        read_your_writes=5,
+        retry_after=10,
+        clock=clock,
+    )
+    session = ReadSession(router, "alice")
+    # answered from a snapshot, nothing opened
+    await session.close()
+    assert opened == []
+
+    session = ReadSession(router, "alice")
+    assert await session.execute("SELECT 1") == "primary"
+    assert await session.scalar("SELECT 1") == "primary"
+    await session.close()
+    # the replica was tried once, then the same primary session served both
+    assert [s.name for s in opened] == ["replica", "primary"]
+    assert [s.closed for s in opened] == [True, True]
+    assert router.stats()["fallbacks"] == 1
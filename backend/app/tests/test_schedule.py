@@ -0,0 +1,122 @@
+import datetime
+import uuid
+
+from httpx import AsyncClient, codes
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import security
+from app.main import app
+from app.models import Event, User, Venue
+
+
+async def test_read_schedule_filters_day_and_orders_by_start(
+    client: AsyncClient, session: AsyncSession
+):
+    user = User(
+        id=str(uuid.uuid4()),
+        email="student@example.com",
+        name="student",
+        role="student",
+        phone="0",
+        password="x",
+    )
+    session.add_all(
+        [user, Venue(name="Gymkhana", location="Near main building", capacity=20)]
+    )
+    await session.flush()
+    for name, start, hours in [
+        ("Valorant", datetime.datetime(2024, 4, 16, 19), 1.5),
+        ("Maths Olympiad", datetime.datetime(2024, 4, 16, 10), 2),
+        ("Midnight", datetime.datetime(2024, 4, 17, 0), 1),
+        ("Late", datetime.datetime(2024, 4, 15, 23, 59), 1),
+    ]:
+        session.add(
+            Event(
+                id=str(uuid.uuid4()),
+                name=name,
+                type="competition",
+                desc="",
+                date=start,
+                duration=datetime.timedelta(hours=hours),
+                venue="Gymkhana",
+            )
+        )
+    await session.commit()
+    token, _, _ = security.create_access_token(user)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await client.get(
+        app.url_path_for("read_schedule", date="16-04-2024"), headers=headers
+    )
+    assert response.status_code == codes.OK
+    assert response.json() == [
+        {
+            "name": "Maths Olympiad",
+            "start_time": "10:00",
+            "end_time": "12:00",
+            "venue": "Gymkhana",
+        },
+        {
+            "name": "Valorant",
+            "start_time": "19:00",
+            "end_time": "20:30",
+            "venue": "Gymkhana",
+        },
+    ]
+
+    response = await client.get(
+        app.url_path_for("read_schedule_dates"), headers=headers
+    )
+    assert response.json() == ["15-04-2024", "16-04-2024", "17-04-2024"]
+
+
+async def test_read_schedule_conditional_get(
+    client: AsyncClient, session: AsyncSession
+):
+    admin = User(
+        id=str(uuid.uuid4()),
+        email="admin@example.com",
+        name="admin",
+        role="admin",
+        phone="0",
+        password="x",
+    )
+    event = Event(
+        id=str(uuid.uuid4()),
+        name="Guest Lecture",
+        type="seminar",
+        desc="Introductory Seminar",
+        date=datetime.datetime(2024, 4, 15, 10),
+        duration=datetime.timedelta(hours=1),
+        venue="Netaji Auditorium",
+    )
+    session.add_all(
+        [
+            admin,
+            Venue(name="Netaji Auditorium", location="Near main building", capacity=20),
+        ]
+    )
+    await session.flush()
+    session.add(event)
+    await session.commit()
+    token, _, _ = security.create_access_token(admin)
+    headers = {"Authorization": f"Bearer {token}"}
+    url = app.url_path_for("read_schedule", date="15-04-2024")
+
+    response = await client.get(url, headers=headers)
+    assert response.status_code == codes.OK
+    etag = response.headers["ETag"]
+
+    response = await client.get(url, headers=headers | {"If-None-Match": etag})
+    assert response.status_code == codes.NOT_MODIFIED
+
+    # editing an event rebuilds the snapshot, the old ETag no longer matches
+    response = await client.put(
+        app.url_path_for("update_event", id=event.id),
+        headers=headers,
+        json={"duration": "PT2H"},
+    )
+    assert response.status_code == codes.OK
+    response = await client.get(url, headers=headers | {"If-None-Match": etag})
+    assert response.status_code == codes.OK
+    assert response.json()[0]["end_time"] == "12:00"
@@ -0,0 +1,84 @@
+import datetime
+import random
+from collections import defaultdict
+
+from app.core.scheduler import Booking, EventDemand, Grid, VenueSpec, schedule
+
+DAY = datetime.date(2024, 4, 15)
+HOUR = datetime.timedelta(hours=1)
+
+
+def assert_feasible(result, events, venues):
+    capacity = {venue.name: venue.capacity for venue in venues}
+    demand = {event.id: event for event in events}
+    by_venue = defaultdict(list)
+    for placement in result.placements:
+        assert capacity[placement.venue] >= demand[placement.event_id].expected
+        by_venue[placement.venue].append((placement.start, placement.end))
+    for slots in by_venue.values():
+        slots.sort()
+        for (_, end), (start, _) in zip(slots, slots[1:]):
+            assert end <= start
+
+
+def test_schedule_separates_events_sharing_participants():
+    events = [
+        EventDemand("quiz", HOUR, frozenset({"a", "b"})),
+        EventDemand("chess", HOUR, frozenset({"a"})),
+        EventDemand("dance", HOUR, frozenset({"c"})),
+    ]
+    venues = [VenueSpec("hall", 10), VenueSpec("room", 2)]
+    grid = Grid([DAY], datetime.time(9), datetime.time(11), HOUR)
+
+    result = schedule(events, venues, grid, time_budget=1)
+
+    assert result.unassigned == {}
+    assert result.clashes == 0
+    start = {placement.event_id: placement.start for placement in result.placements}
+    assert start["quiz"] != start["chess"]
+    assert_feasible(result, events, venues)
+
+
+def test_schedule_respects_capacity_and_existing_bookings():
+    events = [
+        EventDemand("concert", 2 * HOUR, attendance=300),
+        EventDemand("talk", HOUR, frozenset({"a"})),
+    ]
+    venues = [VenueSpec("hall", 100)]
+    grid = Grid([DAY], datetime.time(9), datetime.time(11), HOUR)
+    booked = Booking(
+        "lecture",
+        "hall",
+        datetime.datetime(2024, 4, 15, 9),
+        datetime.datetime(2024, 4, 15, 10),
+        frozenset({"a"}),
+    )
+
+    result = schedule(events, venues, grid, [booked], time_budget=1)
+
+    assert result.unassigned == {"concert": "no venue large enough"}
+    (talk,) = result.placements
+    assert talk.start == datetime.datetime(2024, 4, 15, 10)
+
+
+def test_schedule_synthetic_catalog():
+    rng = random.Random(7)
+    users = [f"user{i}" for i in range(2000)]
+    events = [
+        EventDemand(
+            f"event{i}",
+            datetime.timedelta(minutes=rng.choice([30, 60, 90, 120])),
+            frozenset(rng.sample(users, rng.randint(5, 60))),
+        )
+        for i in range(600)
+    ]
+    venues = [VenueSpec(f"venue{i}", rng.choice([40, 60, 120])) for i in range(20)]
+    grid = Grid([DAY + datetime.timedelta(days=d) for d in range(5)])
+
+    result = schedule(events, venues, grid, time_budget=2)
+
+    assert len(result.placements) + len(result.unassigned) == len(events)
+    assert len(result.placements) >= 550
+    assert result.clashes <= result.greedy_clashes
+    assert result.elapsed_ms < 5000
+    assert_feasible(result, events, venues)
@@ -0,0 +1,51 @@
+import datetime
+from types import SimpleNamespace
+
+from app.core.search import EventSearchIndex, prefix_tsquery
+
+
+def event(id, name, type, desc, hour=10):
+    return SimpleNamespace(
+        id=id,
+        name=name,
+        type=type,
+        desc=desc,
+        date=datetime.datetime(2024, 4, 15, hour),
+        duration=datetime.timedelta(hours=1),
+        venue="Gymkhana",
+    )
+
+
+INDEX = EventSearchIndex(
+    [
+        event("1", "Valorant", "competition", "Valorant gaming competition"),
+        event("2", "Robowars", "competition", "Battle of bots, Valorant fans welcome"),
+        event("3", "Guest Lecture", "seminar", "Introductory seminar on robotics", 9),
+        event("4", "Robotics Workshop", "workshop", "Build a line follower", 11),
+    ]
+)
+
+
+def test_search_ranks_name_above_description():
+    assert [row.id for row, _ in INDEX.search("valorant", 10)] == ["1", "2"]
+
+
+def test_search_matches_every_term_as_prefix():
+    assert [row.id for row, _ in INDEX.search("robo", 10)] == ["2", "4", "3"]
+    assert [row.id for row, _ in INDEX.search("robo work", 10)] == ["4"]
+    assert INDEX.search("robo quiz", 10) == []
+    assert INDEX.search("  ", 10) == []
+
+
+def test_search_limit_keeps_the_best():
+    assert [row.id for row, _ in INDEX.search("comp", 1)] == ["1"]
+
+
+def test_suggest_names_by_prefix():
+    assert INDEX.suggest("ro", 10) == ["Robotics Workshop", "Robowars"]
+    assert INDEX.suggest("ro", 1) == ["Robotics Workshop"]
+    assert INDEX.suggest("x", 10) == []
+
+
+def test_prefix_tsquery():
+    assert prefix_tsquery("Robo  work_shop!") == "robo:* & work:* & shop:*"
@@ -0,0 +1,64 @@
+import asyncio
+
+import jwt
+
+from app.api import deps
+from app.core import config, security
+from app.models import User
+
+
+async def test_password_hasher_round_trip():
+    hasher = security.PasswordHasher(executor="thread", workers=1, queue_size=4)
+    hashed = await hasher.hash("geralt")
+    assert await hasher.verify("geralt", hashed)
+    assert not await hasher.verify("ciri", hashed)
+    assert hasher.stats()["completed"] == 3
+    hasher.shutdown()
+
+
+async def test_password_hasher_rejects_when_queue_is_full():
+    hasher = security.PasswordHasher(executor="thread", workers=1, queue_size=1)
+    jobs = [asyncio.create_task(hasher.hash("geralt")) for _ in range(3)]
+    results = await asyncio.gather(*jobs, return_exceptions=True)
+    assert sum(isinstance(r, security.PasswordHashingOverloaded) for r in results) == 1
+    assert hasher.stats()["rejected"] == 1
+    hasher.shutdown()
+
+
+def test_access_token_carries_user_claims():
+    user = User(
+        id="b75365d9-7bf9-4f54-add5-aeab333a087b",
+        email="geralt@wiedzmin.pl",
+        name="geralt",
+        role="student",
+        phone="",
+        token_version=3,
+    )
+    token, expires_at, issued_at = security.create_access_token(user)
+    payload = jwt.decode(
+        token, config.settings.SECRET_KEY, algorithms=[security.JWT_ALGORITHM]
+    )
+    token_data = security.JWTTokenPayload(**payload)
+    assert token_data.sub == user.id
+    assert token_data.role == "student"
+    assert token_data.version == 3
+    assert token_data.expires_at == expires_at
+    assert token_data.issued_at == issued_at
+    assert "password" not in payload
+
+
+async def test_current_user_from_claims_skips_database():
+    user = User(
+        id="b75365d9-7bf9-4f54-add5-aeab333a087b",
+        email="geralt@wiedzmin.pl",
+        name="geralt",
+        role="student",
+        phone="",
+        token_version=0,
+    )
+    token, _, _ = security.create_access_token(user)
+    deps.token_versions.set(user.id, 0)
+    # session=None would fail on any query
+    current_user = await deps.get_current_user(token=token, session=None)
+    assert current_user.id == user.id
+    assert current_user.role == "student"
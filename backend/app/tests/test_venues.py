@@ -0,0 +1,182 @@
+import datetime
+import uuid
+
+from httpx import AsyncClient, codes
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import security
+from app.main import app
+from app.models import Event, User, Venue
+
+
+async def create_booked_venue(session: AsyncSession):
+    admin = User(
+        id=str(uuid.uuid4()),
+        email="admin@example.com",
+        name="admin",
+        role="admin",
+        phone="0",
+        password="x",
+    )
+    session.add_all(
+        [admin, Venue(name="Gymkhana", location="Near main building", capacity=20)]
+    )
+    await session.flush()
+    event = Event(
+        id=str(uuid.uuid4()),
+        name="Valorant",
+        type="competition",
+        desc="Valorant gaming competition",
+        date=datetime.datetime(2024, 4, 16, 10),
+        duration=datetime.timedelta(hours=2),
+        venue="Gymkhana",
+    )
+    session.add(event)
+    await session.commit()
+    token, _, _ = security.create_access_token(admin)
+    return event, {"Authorization": f"Bearer {token}"}
+
+
+def event_payload(name: str, start: str, duration: str = "PT1H"):
+    return {
+        "id": str(uuid.uuid4()),
+        "name": name,
+        "type": "workshop",
+        "desc": "",
+        "date": start,
+        "duration": duration,
+        "venue": "Gymkhana",
+    }
+
+
+async def test_create_event_rejects_overlapping_booking(
+    client: AsyncClient, session: AsyncSession
+):
+    _, headers = await create_booked_venue(session)
+    url = app.url_path_for("create_event")
+
+    response = await client.post(
+        url, headers=headers, json=event_payload("Chess", "2024-04-16T11:30")
+    )
+    assert response.status_code == codes.CONFLICT
+    assert "Valorant" in response.json()["detail"]
+
+    # back to back is fine, ranges are half open
+    response = await client.post(
+        url, headers=headers, json=event_payload("Chess", "2024-04-16T12:00")
+    )
+    assert response.status_code == codes.CREATED
+
+
+async def test_update_event_rejects_overlapping_booking(
+    client: AsyncClient, session: AsyncSession
+):
+    event, headers = await create_booked_venue(session)
+    response = await client.post(
+        app.url_path_for("create_event"),
+        headers=headers,
+        json=event_payload("Chess", "2024-04-16T13:00"),
+    )
+    chess_id = response.json()["id"]
+
+    response = await client.put(
+        app.url_path_for("update_event", id=chess_id),
+        headers=headers,
+        json={"date": "2024-04-16T09:30:00"},
+    )
+    assert response.status_code == codes.CONFLICT
+
+    # moving an event within its own slot does not conflict with itself
+    response = await client.put(
+        app.url_path_for("update_event", id=event.id),
+        headers=headers,
+        json={"duration": "PT3H"},
+    )
+    assert response.status_code == codes.OK
+
+
+async def test_read_venue_calendar(client: AsyncClient, session: AsyncSession):
+    _, headers = await create_booked_venue(session)
+    response = await client.get(
+        app.url_path_for("read_venue_calendar", name="Gymkhana"),
+        headers=headers,
+        params={"date_from": "2024-04-16T08:00", "date_to": "2024-04-16T18:00"},
+    )
+    assert response.status_code == codes.OK
+    calendar = response.json()
+    assert calendar["busy"] == [
+        {
+            "start": "2024-04-16T10:00:00",
+            "end": "2024-04-16T12:00:00",
+            "event": "Valorant",
+        }
+    ]
+    assert [(slot["start"], slot["end"]) for slot in calendar["free"]] == [
+        ("2024-04-16T08:00:00", "2024-04-16T10:00:00"),
+        ("2024-04-16T12:00:00", "2024-04-16T18:00:00"),
+    ]
+
+    response = await client.get(
+        app.url_path_for("read_venue_calendar", name="Nowhere"),
+        headers=headers,
+        params={"date_from": "2024-04-16T08:00", "date_to": "2024-04-16T18:00"},
+    )
+    assert response.status_code == codes.NOT_FOUND
+
+
+async def test_date_filters_with_an_offset(client: AsyncClient, session: AsyncSession):
+    event, headers = await create_booked_venue(session)
+    # 08:00 to 18:00 UTC
+    params = {"date_from": "2024-04-16T13:30+05:30", "date_to": "2024-04-16T18:00Z"}
+
+    response = await client.get(
+        app.url_path_for("read_venue_calendar", name="Gymkhana"),
+        headers=headers,
+        params=params,
+    )
+    assert response.status_code == codes.OK
+    calendar = response.json()
+    assert calendar["busy"] == [
+        {
+            "start": "2024-04-16T10:00:00",
+            "end": "2024-04-16T12:00:00",
+            "event": "Valorant",
+        }
+    ]
+    assert calendar["free"][0]["start"] == "2024-04-16T08:00:00"
+
+    response = await client.get(
+        app.url_path_for("list_events"), headers=headers, params=params
+    )
+    assert response.status_code == codes.OK
+    assert [e["id"] for e in response.json()["events"]] == [event.id]
+    response = await client.get(
+        app.url_path_for("list_events"),
+        headers=headers,
+        params={"date_from": "2024-04-16T15:31+05:30"},
+    )
+    assert response.json()["events"] == []
+
+
+async def test_event_dates_with_an_offset(client: AsyncClient, session: AsyncSession):
+    event, headers = await create_booked_venue(session)
+    url = app.url_path_for("create_event")
+
+    # 10:30 UTC, inside Valorant's 10:00 to 12:00
+    response = await client.post(
+        url, headers=headers, json=event_payload("Chess", "2024-04-16T16:00+05:30")
+    )
+    assert response.status_code == codes.CONFLICT
+    response = await client.post(
+        url, headers=headers, json=event_payload("Chess", "2024-04-16T17:30+05:30")
+    )
+    assert response.status_code == codes.CREATED
+    assert response.json()["date"] == "2024-04-16T12:00:00"
+
+    response = await client.put(
+        app.url_path_for("update_event", id=event.id),
+        headers=headers,
+        json={"date": "2024-04-16T08:00:00-01:00"},
+    )
+    assert response.status_code == codes.OK
+    assert response.json()["date"] == "2024-04-16T09:00:00"
@@ -0,0 +1,136 @@
+"""
+Registration stampede with and without admission control.
+
+`--requests` participants hit `PUT /events/register/{id}` for one unlimited
+event while as many `GET /events/all` run alongside, first with the admission
+gates disabled, then with the configured limits. Without the gates the excess
+queues on the database pool until it times out (500s); with them it is turned
+away early with 503 and a queue ticket, and clients retrying with their ticket
+after Retry-After all get in. Seeds throwaway users and an event into the
+configured database and deletes them again.
+
+    python -m benchmarks.admission --requests 2000
+"""
+
+import argparse
+import asyncio
+import collections
+import datetime
+import statistics
+import time
+import uuid
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, insert
+
+from app.api.endpoints.events import catalog_gate, register_gate
+from app.core import security
+from app.core.admission import QUEUE_TICKET_HEADER
+from app.core.session import async_session
+from app.main import app
+from app.models import Event, Registration, User
+
+
+async def stampede(
+    client, url, tokens, retry
+) -> tuple[collections.Counter, list[float]]:
+    statuses = collections.Counter()
+    latencies = []
+
+    async def register(token):
+        headers = {"Authorization": f"Bearer {token}"}
+        start = time.perf_counter()
+        while True:
+            response = await client.put(url, headers=headers)
+            if not (retry and response.status_code == 503):
+                break
+            statuses["503, retried"] += 1
+            headers[QUEUE_TICKET_HEADER] = response.headers[QUEUE_TICKET_HEADER]
+            await asyncio.sleep(int(response.headers["Retry-After"]))
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status_code] += 1
+
+    async def browse(token):
+        response = await client.get(
+            "/events/all", headers={"Authorization": f"Bearer {token}"}
+        )
+        statuses[f"catalog {response.status_code}"] += 1
+
+    await asyncio.gather(*(register(t) for t in tokens), *(browse(t) for t in tokens))
+    return statuses, sorted(latencies)
+
+
+async def main(args):
+    run = uuid.uuid4().hex[:6]
+    event_id = str(uuid.uuid4())
+    users = [
+        dict(
+            id=str(uuid.uuid4()),
+            email=f"bench-{run}-{i}@example.com",
+            name=f"runner{i}",
+            role="participant",
+            password="x",
+        )
+        for i in range(args.requests)
+    ]
+    async with async_session() as session:
+        await session.execute(
+            insert(Event),
+            [
+                dict(
+                    id=event_id,
+                    name=f"bench-{run}",
+                    type="benchmark",
+                    desc="",
+                    date=datetime.datetime(2024, 4, 15, 10),
+                    duration=datetime.timedelta(hours=1),
+                )
+            ],
+        )
+        await session.execute(insert(User), users)
+        await session.commit()
+    tokens = [security.create_access_token(User(**user))[0] for user in users]
+    url = f"/events/register/{event_id}"
+    gates = (catalog_gate, register_gate)
+    limits = [(gate.max_in_flight, gate.max_in_flight_per_key) for gate in gates]
+
+    transport = ASGITransport(app=app, raise_app_exceptions=False)
+    try:
+        async with AsyncClient(
+            transport=transport, base_url="http://test", timeout=300
+        ) as client:
+            for gated in (False, True):
+                for gate, (total, per_key) in zip(gates, limits):
+                    gate.max_in_flight = total if gated else 0
+                    gate.max_in_flight_per_key = per_key if gated else 0
+                start = time.perf_counter()
+                statuses, latencies = await stampede(client, url, tokens, gated)
+                elapsed = time.perf_counter() - start
+                print(f"admission control {'on' if gated else 'off'}: {elapsed:.1f} s")
+                for status, count in sorted(statuses.items(), key=str):
+                    print(f"{count:8} x {status}")
+                print(
+                    f"registration p50 {statistics.median(latencies) * 1000:8.2f} ms, "
+                    f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:8.2f} ms"
+                )
+                async with async_session() as session:
+                    await session.execute(
+                        delete(Registration).where(Registration.event_id == event_id)
+                    )
+                    await session.commit()
+            print(register_gate.stats())
+    finally:
+        for gate, (total, per_key) in zip(gates, limits):
+            gate.max_in_flight, gate.max_in_flight_per_key = total, per_key
+        async with async_session() as session:
+            await session.execute(delete(Event).where(Event.id == event_id))
+            await session.execute(
+                delete(User).where(User.id.in_([user["id"] for user in users]))
+            )
+            await session.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
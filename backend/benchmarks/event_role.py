@@ -0,0 +1,130 @@
+"""
+Registration insert rate under the participant / volunteer guard.
+
+Seeds `--registrations` registrations (over `--events` events) plus some
+volunteers, then inserts `--inserts` more registrations one statement at a
+time, first with the `event_role` triggers, then with the old COUNT based
+`vol_as_par` / `stu_as_vol` triggers swapped in. Everything runs in one
+transaction that is rolled back, the database is left as it was.
+
+    python -m benchmarks.event_role --registrations 100000
+"""
+
+import argparse
+import asyncio
+import datetime
+import time
+import uuid
+
+from sqlalchemy import insert, text
+
+from app.core.session import async_session
+from app.models import Event, Registration, User, Volunteer
+
+EVENT_ROLE_TRIGGERS = [
+    "registration_claim_role ON registration",
+    "registration_release_role ON registration",
+    "volunteer_claim_role ON volunteer",
+    "volunteer_release_role ON volunteer",
+]
+COUNT_TRIGGERS = [
+    """
+    CREATE OR REPLACE FUNCTION vol_as_par_check() RETURNS TRIGGER AS $$
+    DECLARE
+    cnt INTEGER DEFAULT 0;
+    BEGIN
+    SELECT COUNT(id) INTO cnt
+    FROM volunteer
+    WHERE volunteer.event_id = NEW.event_id and volunteer.id = NEW.user_id;
+    IF cnt <> 0 THEN
+        RAISE EXCEPTION 'Already registered as volunteer for this event';
+    END IF;
+    RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "CREATE TRIGGER vol_as_par_trigger BEFORE INSERT ON registration "
+    "FOR EACH ROW EXECUTE FUNCTION vol_as_par_check()",
+]
+
+
+async def insert_rate(session, registrations) -> float:
+    start = time.perf_counter()
+    for event_id, user_id in registrations:
+        await session.execute(
+            insert(Registration).values(event_id=event_id, user_id=user_id)
+        )
+    return len(registrations) / (time.perf_counter() - start)
+
+
+async def main(args):
+    run = uuid.uuid4().hex[:6]
+    events = [
+        dict(
+            id=str(uuid.uuid4()),
+            name=f"bench-{run}-{i}",
+            type="benchmark",
+            desc="",
+            date=datetime.datetime(2024, 4, 15, 10),
+            duration=datetime.timedelta(hours=1),
+        )
+        for i in range(args.events)
+    ]
+    per_event = args.registrations // args.events
+    users = [
+        dict(
+            id=str(uuid.uuid4()),
+            email=f"bench-{run}-{i}@example.com",
+            name=f"runner{i}",
+            role="participant",
+            password="x",
+        )
+        for i in range(per_event + 2 * args.inserts + 10)
+    ]
+    fresh = [user["id"] for user in users[per_event:-10]]
+    volunteers = [user["id"] for user in users[-10:]]
+
+    async with async_session() as session:
+        await session.execute(insert(Event), events)
+        await session.execute(insert(User), users)
+        await session.execute(
+            insert(Registration),
+            [
+                dict(event_id=event["id"], user_id=user["id"])
+                for event in events
+                for user in users[:per_event]
+            ],
+        )
+        # some volunteers for the guard to look at
+        await session.execute(
+            insert(Volunteer),
+            [dict(id=user_id, event_id=events[0]["id"]) for user_id in volunteers],
+        )
+        await session.execute(text("ANALYZE registration"))
+        await session.execute(text("ANALYZE volunteer"))
+        print(f"{per_event * args.events} registrations seeded")
+
+        batch = [(events[i % args.events]["id"], fresh[i]) for i in range(args.inserts)]
+        rate = await insert_rate(session, batch)
+        print(f"event_role triggers: {rate:8.0f} registrations/s")
+
+        for trigger in EVENT_ROLE_TRIGGERS:
+            await session.execute(text(f"DROP TRIGGER {trigger}"))
+        for statement in COUNT_TRIGGERS:
+            await session.execute(text(statement))
+        batch = [
+            (events[i % args.events]["id"], fresh[args.inserts + i])
+            for i in range(args.inserts)
+        ]
+        rate = await insert_rate(session, batch)
+        print(f"COUNT triggers:      {rate:8.0f} registrations/s")
+
+        await session.rollback()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--registrations", type=int, default=100000)
+    parser.add_argument("--events", type=int, default=100)
+    parser.add_argument("--inserts", type=int, default=5000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,116 @@
+"""
+Registration spike with and without group commit.
+
+`--requests` participants register for one of `--events` unlimited events at
+the same moment, first through the per-request commit path, then with
+REGISTRATION_BATCHING on. Reports throughput, p50/p99 latency and the batch
+sizes the group commit produced. Seeds throwaway users and events into the
+configured database and deletes them again.
+
+    python -m benchmarks.registration_batching --requests 2000
+"""
+
+import argparse
+import asyncio
+import datetime
+import statistics
+import time
+import uuid
+
+from httpx import AsyncClient
+from sqlalchemy import delete, insert
+
+from app.api.endpoints.events import registration_batcher
+from app.core import config, security
+from app.core.session import async_session
+from app.main import app
+from app.models import Event, Registration, User
+
+
+async def spike(client, urls, tokens) -> tuple[float, list[float]]:
+    latencies = []
+
+    async def register(url, token):
+        start = time.perf_counter()
+        response = await client.put(url, headers={"Authorization": f"Bearer {token}"})
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 204, response.text
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(register(urls[i % len(urls)], token) for i, token in enumerate(tokens))
+    )
+    return time.perf_counter() - start, sorted(latencies)
+
+
+async def main(args):
+    run = uuid.uuid4().hex[:6]
+    events = [
+        dict(
+            id=str(uuid.uuid4()),
+            name=f"bench-{run}-{i}",
+            type="benchmark",
+            desc="",
+            date=datetime.datetime(2024, 4, 15, 10),
+            duration=datetime.timedelta(hours=1),
+        )
+        for i in range(args.events)
+    ]
+    users = [
+        dict(
+            id=str(uuid.uuid4()),
+            email=f"bench-{run}-{i}@example.com",
+            name=f"runner{i}",
+            role="participant",
+            password="x",
+        )
+        for i in range(args.requests)
+    ]
+    async with async_session() as session:
+        await session.execute(insert(Event), events)
+        await session.execute(insert(User), users)
+        await session.commit()
+    tokens = [security.create_access_token(User(**user))[0] for user in users]
+    urls = [f"/events/register/{event['id']}" for event in events]
+    event_ids = [event["id"] for event in events]
+
+    try:
+        async with AsyncClient(app=app, base_url="http://test", timeout=120) as client:
+            # warm up the token cache so both runs measure registration only
+            await asyncio.gather(
+                *(
+                    client.get("/users/role", headers={"Authorization": f"Bearer {t}"})
+                    for t in tokens
+                )
+            )
+            for batching in (False, True):
+                config.settings.REGISTRATION_BATCHING = batching
+                elapsed, latencies = await spike(client, urls, tokens)
+                print(
+                    f"{'group commit' if batching else 'per request':>12}: "
+                    f"{len(tokens) / elapsed:7.0f} req/s, "
+                    f"p50 {statistics.median(latencies) * 1000:8.2f} ms, "
+                    f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:8.2f} ms"
+                )
+                async with async_session() as session:
+                    await session.execute(
+                        delete(Registration).where(Registration.event_id.in_(event_ids))
+                    )
+                    await session.commit()
+            print(registration_batcher.stats())
+    finally:
+        config.settings.REGISTRATION_BATCHING = False
+        await registration_batcher.close()
+        async with async_session() as session:
+            await session.execute(delete(Event).where(Event.id.in_(event_ids)))
+            await session.execute(
+                delete(User).where(User.id.in_([user["id"] for user in users]))
+            )
+            await session.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
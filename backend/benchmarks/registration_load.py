@@ -0,0 +1,117 @@
+"""
+Load test of capacity limited registration: `--requests` participants click
+register for one event with `--capacity` seats at the same moment.
+
+Checks that exactly `--capacity` registrations succeed, every other request
+lands on the waitlist, and the seat counter ends at zero. Seeds throwaway
+users and an event into the configured database and deletes them again.
+
+    python -m benchmarks.registration_load --requests 1000 --capacity 100
+"""
+
+import argparse
+import asyncio
+import collections
+import datetime
+import statistics
+import sys
+import time
+import uuid
+
+from httpx import AsyncClient
+from sqlalchemy import delete, func, insert, select
+
+from app.core import security
+from app.core.session import async_session
+from app.main import app
+from app.models import Event, EventSeat, Registration, User
+
+
+async def main(args):
+    run = uuid.uuid4().hex[:6]
+    bench_event = Event(
+        id=str(uuid.uuid4()),
+        name=f"bench-{run}",
+        type="benchmark",
+        desc="",
+        date=datetime.datetime(2024, 4, 15, 10),
+        duration=datetime.timedelta(hours=1),
+    )
+    users = [
+        dict(
+            id=str(uuid.uuid4()),
+            email=f"bench-{run}-{i}@example.com",
+            name=f"runner{i}",
+            role="participant",
+            password="x",
+        )
+        for i in range(args.requests)
+    ]
+    async with async_session() as session:
+        session.add(bench_event)
+        await session.execute(insert(User), users)
+        session.add(
+            EventSeat(
+                event_id=bench_event.id,
+                capacity=args.capacity,
+                remaining=args.capacity,
+            )
+        )
+        await session.commit()
+
+    url = f"/events/register/{bench_event.id}"
+    tokens = [security.create_access_token(User(**user))[0] for user in users]
+    latencies = []
+
+    async def register(client, token):
+        start = time.perf_counter()
+        response = await client.put(url, headers={"Authorization": f"Bearer {token}"})
+        latencies.append(time.perf_counter() - start)
+        if response.status_code == 202:
+            return response.status_code, "waitlisted"
+        detail = response.json()["detail"] if response.status_code != 204 else ""
+        return response.status_code, detail
+
+    try:
+        async with AsyncClient(app=app, base_url="http://test", timeout=120) as client:
+            start = time.perf_counter()
+            outcomes = await asyncio.gather(
+                *(register(client, token) for token in tokens)
+            )
+            elapsed = time.perf_counter() - start
+
+        async with async_session() as session:
+            registered = await session.scalar(
+                select(func.count())
+                .select_from(Registration)
+                .where(Registration.event_id == bench_event.id)
+            )
+            remaining = await session.scalar(
+                select(EventSeat.remaining).where(EventSeat.event_id == bench_event.id)
+            )
+    finally:
+        async with async_session() as session:
+            await session.execute(delete(Event).where(Event.id == bench_event.id))
+            await session.execute(
+                delete(User).where(User.id.in_([user["id"] for user in users]))
+            )
+            await session.commit()
+
+    for (code, detail), count in sorted(collections.Counter(outcomes).items()):
+        print(f"{count:6} x {code} {detail}")
+    print(
+        f"{len(outcomes) / elapsed:8.0f} req/s, "
+        f"median {statistics.median(latencies) * 1000:8.2f} ms, "
+        f"max {max(latencies) * 1000:8.2f} ms"
+    )
+    print(f"registered {registered}, remaining {remaining}, capacity {args.capacity}")
+    expected = min(args.capacity, args.requests)
+    if registered != expected or remaining != args.capacity - expected:
+        sys.exit("OVERSOLD or lost seats")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--capacity", type=int, default=100)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,120 @@
+"""
+Throughput of `/schedule/{date}` served from the in-memory snapshot versus
+straight from the database, and of conditional requests answered with 304.
+
+Seeds throwaway events spread over a few days into the configured database,
+measures, then deletes them again.
+
+    python -m benchmarks.schedule --events 300 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import datetime
+import statistics
+import time
+import uuid
+
+from httpx import AsyncClient
+from sqlalchemy import delete
+
+from app.api.endpoints.schedule import schedule_snapshot
+from app.core import security
+from app.core.session import async_session
+from app.main import app
+from app.models import Event, User
+
+DAY = datetime.datetime(2024, 4, 15)
+
+
+async def seed(size: int, run: str) -> list[str]:
+    ids = []
+    async with async_session() as session:
+        for i in range(size):
+            bench_event = Event(
+                id=str(uuid.uuid4()),
+                name=f"bench-{run}-{i}",
+                type="benchmark",
+                desc="",
+                date=DAY + datetime.timedelta(days=i % 3, minutes=10 * i),
+                duration=datetime.timedelta(hours=1),
+            )
+            ids.append(bench_event.id)
+            session.add(bench_event)
+        await session.commit()
+    return ids
+
+
+async def measure(client, url, headers, args) -> tuple[float, float, int]:
+    latencies = []
+    statuses = set()
+
+    async def one():
+        start = time.perf_counter()
+        response = await client.get(url, headers=headers)
+        latencies.append(time.perf_counter() - start)
+        statuses.add(response.status_code)
+
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        await asyncio.gather(*(one() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    (status,) = statuses
+    return len(latencies) / elapsed, statistics.median(latencies), status
+
+
+async def main(args):
+    run = uuid.uuid4().hex[:6]
+    admin = User(
+        id=str(uuid.uuid4()),
+        email=f"bench-admin-{run}@example.com",
+        name="admin",
+        role="admin",
+        password="x",
+    )
+    async with async_session() as session:
+        session.add(admin)
+        await session.commit()
+    token, _, _ = security.create_access_token(admin)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    event_ids = await seed(args.events, run)
+    ttl = schedule_snapshot.ttl
+    url = f"/schedule/{DAY.strftime('%d-%m-%Y')}"
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            schedule_snapshot.ttl = 0
+            rps, median, status = await measure(client, url, headers, args)
+            print(
+                f"database: {rps:8.0f} req/s, median {median * 1000:8.2f} ms ({status})"
+            )
+
+            schedule_snapshot.ttl = ttl or 30
+            schedule_snapshot.invalidate()
+            response = await client.get(url, headers=headers)
+            rps, median, status = await measure(client, url, headers, args)
+            print(
+                f"snapshot: {rps:8.0f} req/s, median {median * 1000:8.2f} ms ({status})"
+            )
+
+            conditional = headers | {"If-None-Match": response.headers["ETag"]}
+            rps, median, status = await measure(client, url, conditional, args)
+            print(
+                f"304:      {rps:8.0f} req/s, median {median * 1000:8.2f} ms ({status})"
+            )
+            print(schedule_snapshot.stats())
+    finally:
+        schedule_snapshot.ttl = ttl
+        schedule_snapshot.invalidate()
+        async with async_session() as session:
+            await session.execute(delete(Event).where(Event.id.in_(event_ids)))
+            await session.execute(delete(User).where(User.id == admin.id))
+            await session.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,124 @@
+"""
+Latency of event search over a synthetic catalog.
+
+`--backend memory` (default) times the in-process index directly and needs no
+database. `--backend postgres` seeds throwaway events into the configured
+database, times `/events/search` end to end, then deletes them again; run the
+migrations first so the GIN indexes exist.
+
+    python -m benchmarks.search --events 10000
+"""
+
+import argparse
+import asyncio
+import datetime
+import random
+import statistics
+import time
+import uuid
+from types import SimpleNamespace
+
+from httpx import AsyncClient
+from sqlalchemy import delete, insert
+
+from app.core import config, security
+from app.core.search import EventSearchIndex
+from app.core.session import async_session
+from app.main import app
+from app.models import Event, User
+
+WORDS = (
+    "robo valorant quiz dance music drama coding hackathon debate lecture "
+    "workshop chess football cricket art photography film startup finance "
+    "design poetry battle bots gaming treasure hunt cultural technical night"
+).split()
+QUERIES = ["robo", "valorant", "qu", "hack night", "photo", "treasure hunt", "c"]
+
+
+def synthetic_events(size: int, run: str) -> list[dict]:
+    rng = random.Random(size)
+    start = datetime.datetime(2024, 4, 15, 9)
+    return [
+        dict(
+            id=str(uuid.uuid4()),
+            name=f"{' '.join(rng.sample(WORDS, 2)).title()} {run}-{i}",
+            type=rng.choice(["competition", "workshop", "seminar", "cultural"]),
+            desc=" ".join(rng.choices(WORDS, k=20)),
+            date=start + datetime.timedelta(minutes=7 * i),
+            duration=datetime.timedelta(hours=1),
+            venue=None,
+        )
+        for i in range(size)
+    ]
+
+
+def report(name: str, latencies: list[float]) -> None:
+    latencies.sort()
+    print(
+        f"{name:>14}: median {statistics.median(latencies) * 1000:7.3f} ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:7.3f} ms"
+    )
+
+
+def bench_memory(args) -> None:
+    rows = [SimpleNamespace(**row) for row in synthetic_events(args.events, "bench")]
+    start = time.perf_counter()
+    index = EventSearchIndex(rows)
+    print(f"built index of {len(index)} events in {time.perf_counter() - start:.2f} s")
+    for query in QUERIES:
+        latencies = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            index.search(query, 20)
+            latencies.append(time.perf_counter() - start)
+        report(query, latencies)
+
+
+async def bench_postgres(args) -> None:
+    run = uuid.uuid4().hex[:6]
+    admin = User(
+        id=str(uuid.uuid4()),
+        email=f"bench-admin-{run}@example.com",
+        name="admin",
+        role="admin",
+        password="x",
+    )
+    events = synthetic_events(args.events, run)
+    async with async_session() as session:
+        session.add(admin)
+        await session.execute(insert(Event), events)
+        await session.commit()
+    token, _, _ = security.create_access_token(admin)
+    headers = {"Authorization": f"Bearer {token}"}
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            for query in QUERIES:
+                latencies = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    response = await client.get(
+                        "/events/search", headers=headers, params={"q": query}
+                    )
+                    latencies.append(time.perf_counter() - start)
+                    response.raise_for_status()
+                report(query, latencies)
+    finally:
+        async with async_session() as session:
+            await session.execute(
+                delete(Event).where(Event.id.in_([event["id"] for event in events]))
+            )
+            await session.execute(delete(User).where(User.id == admin.id))
+            await session.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--backend", choices=["memory", "postgres"], default="memory")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    if args.backend == "memory":
+        bench_memory(args)
+    else:
+        config.settings.EVENT_SEARCH_BACKEND = "postgres"
+        asyncio.run(bench_postgres(args))
@@ -0,0 +1,77 @@
+"""
+Load test comparing token renewal through `/auth/access-token` (password
+login, one bcrypt per renewal) with `/auth/refresh` (HMAC check plus one
+rotation UPDATE).
+
+Runs the app in-process against the configured database, so `.env` must point
+to a migrated database containing the user below.
+
+    python -m benchmarks.token_renewal --email u1@gmail.com --password 1234
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from httpx import AsyncClient
+
+from app.main import app
+
+
+async def run(client: AsyncClient, renew, clients: int, renewals: int):
+    latencies: list[float] = []
+
+    async def worker():
+        state = await renew(None)
+        for _ in range(renewals):
+            start = time.perf_counter()
+            state = await renew(state)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "renewals/s": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main(args):
+    async with AsyncClient(app=app, base_url="http://test") as client:
+
+        async def login(_):
+            response = await client.post(
+                "/auth/access-token",
+                data={"username": args.email, "password": args.password},
+            )
+            response.raise_for_status()
+            return response.json()["refresh_token"]
+
+        async def refresh(refresh_token):
+            if refresh_token is None:
+                return await login(None)
+            response = await client.post(
+                "/auth/refresh", json={"refresh_token": refresh_token}
+            )
+            response.raise_for_status()
+            return response.json()["refresh_token"]
+
+        for name, renew in (("login", login), ("refresh", refresh)):
+            result = await run(client, renew, args.clients, args.renewals)
+            print(
+                f"{name:8} {result['renewals/s']:10.1f} renewals/s  "
+                f"p50 {result['p50_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--renewals", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
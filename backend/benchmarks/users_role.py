@@ -0,0 +1,64 @@
+"""
+Requests/sec on `/users/role` with and without the token version cache.
+
+Runs the app in-process against the configured database, so `.env` must point
+to a migrated database containing the user below.
+
+    python -m benchmarks.users_role --email u1@gmail.com --password 1234
+"""
+
+import argparse
+import asyncio
+import time
+
+from httpx import AsyncClient
+
+from app.api import deps
+from app.main import app
+
+
+async def hammer(client: AsyncClient, token: str, seconds: float, concurrency: int):
+    done = 0
+    deadline = time.perf_counter() + seconds
+
+    async def worker():
+        nonlocal done
+        while time.perf_counter() < deadline:
+            response = await client.get(
+                "/users/role", headers={"Authorization": f"Bearer {token}"}
+            )
+            response.raise_for_status()
+            done += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return done / seconds
+
+
+async def main(args):
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post(
+            "/auth/login", json={"email": args.email, "password": args.password}
+        )
+        response.raise_for_status()
+        token = response.json()["token"]
+
+        maxsize = deps.token_versions.maxsize
+        deps.token_versions.maxsize = 0
+        deps.token_versions.clear()
+        before = await hammer(client, token, args.seconds, args.concurrency)
+
+        deps.token_versions.maxsize = maxsize
+        after = await hammer(client, token, args.seconds, args.concurrency)
+
+    print(f"without cache: {before:10.1f} req/s")
+    print(f"with cache:    {after:10.1f} req/s")
+    print(f"cache stats:   {deps.token_versions.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=16)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,107 @@
+"""
+Cost of the venue conflict check while a venue fills up with bookings.
+
+Creates `--events` events through `POST /events/` in a few throwaway venues,
+every tenth request deliberately overlapping an existing booking, and reports
+the latency of each block of requests. With the GiST index behind
+`ex_event_venue_overlap` the latency stays flat as the table grows. Deletes
+everything again at the end.
+
+    python -m benchmarks.venue_conflicts --events 10000
+"""
+
+import argparse
+import asyncio
+import datetime
+import statistics
+import time
+import uuid
+
+from httpx import AsyncClient
+from sqlalchemy import delete
+
+from app.api.endpoints.events import catalog_snapshot, search_snapshot
+from app.api.endpoints.schedule import schedule_snapshot
+from app.core import security
+from app.core.session import async_session
+from app.main import app
+from app.models import Event, User, Venue
+
+START = datetime.datetime(2024, 4, 15, 8)
+SLOT = datetime.timedelta(minutes=30)
+
+
+async def main(args):
+    run = uuid.uuid4().hex[:6]
+    admin = User(
+        id=str(uuid.uuid4()),
+        email=f"bench-admin-{run}@example.com",
+        name="admin",
+        role="admin",
+        password="x",
+    )
+    venues = [f"bench-{run}-{i}" for i in range(args.venues)]
+    async with async_session() as session:
+        session.add(admin)
+        session.add_all(Venue(name=name, location="", capacity=100) for name in venues)
+        await session.commit()
+    token, _, _ = security.create_access_token(admin)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # measure the check, not the snapshot rebuilds every write triggers
+    snapshots = (catalog_snapshot, schedule_snapshot, search_snapshot)
+    ttls = [snapshot.ttl for snapshot in snapshots]
+    for snapshot in snapshots:
+        snapshot.ttl = 0
+
+    conflicts = 0
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            latencies = []
+            for i in range(args.events):
+                slot = i // args.venues
+                if i % 10 == 9 and slot:
+                    # starts in the middle of an existing booking
+                    slot -= 1
+                    offset = SLOT / 2
+                else:
+                    offset = datetime.timedelta()
+                payload = {
+                    "id": str(uuid.uuid4()),
+                    "name": f"bench-{run}-{i}",
+                    "type": "benchmark",
+                    "desc": "",
+                    "date": (START + slot * SLOT + offset).isoformat(),
+                    "duration": "PT30M",
+                    "venue": venues[i % args.venues],
+                }
+                start = time.perf_counter()
+                response = await client.post("/events/", headers=headers, json=payload)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code == 409:
+                    conflicts += 1
+                else:
+                    response.raise_for_status()
+                if len(latencies) == args.block:
+                    print(
+                        f"events {i + 1 - args.block:6}-{i + 1:6}: "
+                        f"median {statistics.median(latencies) * 1000:7.2f} ms"
+                    )
+                    latencies = []
+        print(f"{conflicts} conflicting bookings rejected")
+    finally:
+        for snapshot, ttl in zip(snapshots, ttls):
+            snapshot.ttl = ttl
+        async with async_session() as session:
+            await session.execute(delete(Event).where(Event.venue.in_(venues)))
+            await session.execute(delete(Venue).where(Venue.name.in_(venues)))
+            await session.execute(delete(User).where(User.id == admin.id))
+            await session.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--venues", type=int, default=5)
+    parser.add_argument("--block", type=int, default=1000)
+    asyncio.run(main(parser.parse_args()))
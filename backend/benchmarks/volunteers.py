@@ -0,0 +1,120 @@
+"""
+Query count and latency of `/volunteers/all/{event_id}` for events with a few
+hundred volunteers each.
+
+Seeds throwaway users, students and events into the configured database,
+measures, then deletes them again.
+
+    python -m benchmarks.volunteers --sizes 100 300 500
+"""
+
+import argparse
+import asyncio
+import datetime
+import statistics
+import time
+import uuid
+
+from httpx import AsyncClient
+from sqlalchemy import delete, event
+
+from app.core import security
+from app.core.session import async_engine, async_session
+from app.main import app
+from app.models import Event, Student, User, Volunteer
+
+
+async def seed(size: int, run: str) -> tuple[Event, list[str]]:
+    user_ids = []
+    async with async_session() as session:
+        bench_event = Event(
+            id=str(uuid.uuid4()),
+            name=f"bench-{run}-{size}",
+            type="benchmark",
+            desc="",
+            date=datetime.datetime(2024, 4, 15, 10),
+            duration=datetime.timedelta(hours=1),
+        )
+        session.add(bench_event)
+        for i in range(size):
+            user = User(
+                id=str(uuid.uuid4()),
+                email=f"bench-{run}-{size}-{i}@example.com",
+                name=f"volunteer{i}",
+                role="student",
+                password="x",
+            )
+            user_ids.append(user.id)
+            session.add(user)
+        await session.flush()
+        for i, user_id in enumerate(user_ids):
+            session.add(
+                Student(id=user_id, roll=f"B{run}{size}-{i:05}", dept=f"Dept{i % 7}")
+            )
+        await session.flush()
+        for user_id in user_ids:
+            session.add(Volunteer(id=user_id, event_id=bench_event.id))
+        await session.commit()
+    return bench_event, user_ids
+
+
+async def main(args):
+    run = uuid.uuid4().hex[:6]
+    admin = User(
+        id=str(uuid.uuid4()),
+        email=f"bench-admin-{run}@example.com",
+        name="admin",
+        role="admin",
+        password="x",
+    )
+    async with async_session() as session:
+        session.add(admin)
+        await session.commit()
+    token, _, _ = security.create_access_token(admin)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    statements = 0
+
+    def count(*_):
+        nonlocal statements
+        statements += 1
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count)
+    seeded = []
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            for size in args.sizes:
+                bench_event, user_ids = await seed(size, run)
+                seeded.append((bench_event, user_ids))
+                url = f"/volunteers/all/{bench_event.id}"
+                await client.get(url, headers=headers, params={"sort": args.sort})
+
+                latencies = []
+                statements = 0
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    response = await client.get(
+                        url, headers=headers, params={"sort": args.sort}
+                    )
+                    latencies.append(time.perf_counter() - start)
+                    response.raise_for_status()
+                print(
+                    f"{size:5} volunteers: {statements / args.repeat:5.1f} queries/request, "
+                    f"median {statistics.median(latencies) * 1000:8.2f} ms"
+                )
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", count)
+        async with async_session() as session:
+            for bench_event, user_ids in seeded:
+                await session.execute(delete(Event).where(Event.id == bench_event.id))
+                await session.execute(delete(User).where(User.id.in_(user_ids)))
+            await session.execute(delete(User).where(User.id == admin.id))
+            await session.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300, 500])
+    parser.add_argument("--sort", choices=["roll", "dept"], default="roll")
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,4 @@
+#!/bin/sh
+# Lets replica_database stream WAL from this server. Runs once, when the
+# postgres image initializes an empty data volume.
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"